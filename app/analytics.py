@@ -0,0 +1,266 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import (Transaction, TransactionType, Category, Group, TransactionTombstone, TransactionArchive,
+                        transaction_group_association)
+from app.schemas import TransactionFilters
+import numpy as np
+import os
+import time
+
+ANALYTICS_CACHE_MAX_SCOPES = int(os.getenv("ANALYTICS_CACHE_MAX_SCOPES", "128"))
+ANALYTICS_CACHE_MAX_ROWS = int(os.getenv("ANALYTICS_CACHE_MAX_ROWS", "2000000"))
+ANALYTICS_CACHE_TTL_SECONDS = int(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "300"))
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+TYPE_CODES = {TransactionType.income: 0, TransactionType.expense: 1}
+TYPE_NAMES = {code: transaction_type.value for transaction_type, code in TYPE_CODES.items()}
+PERIOD_UNITS = {"year": "Y", "month": "M", "day": "D"}
+SUPPORTED_FILTERS = {
+    "type", "types", "category", "categories", "amount", "amount_min", "amount_max",
+    "transaction_datetime", "date_from", "date_to",
+}
+
+
+def to_microseconds(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+def to_minor_units(amount) -> int:
+    return int(Decimal(amount) * 100)
+
+def period_label(value: np.datetime64) -> str:
+    return value.astype("datetime64[us]").item().replace(tzinfo=timezone.utc).isoformat()
+
+
+class ScopeData:
+    def __init__(self, rows, category_names: dict, version: tuple = ()):
+        size = len(rows)
+        capacity = max(16, size)
+        self.size = size
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.amounts = np.zeros(capacity, dtype=np.int64)
+        self.types = np.zeros(capacity, dtype=np.int8)
+        self.categories = np.zeros(capacity, dtype=np.int32)
+        self.users = np.zeros(capacity, dtype=np.int64)
+        self.category_names = dict(category_names)
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+        self.ids[:size] = np.fromiter((row.id for row in rows), np.int64, size)
+        self.timestamps[:size] = np.fromiter(
+            (to_microseconds(row.transaction_datetime) for row in rows), np.int64, size
+        )
+        self.amounts[:size] = np.fromiter((to_minor_units(row.amount) for row in rows), np.int64, size)
+        self.types[:size] = np.fromiter((TYPE_CODES[row.type] for row in rows), np.int8, size)
+        self.categories[:size] = np.fromiter((row.category_id for row in rows), np.int32, size)
+        self.users[:size] = np.fromiter((row.user_id for row in rows), np.int64, size)
+
+    def category_ids(self, names) -> list[int]:
+        return [category_id for category_id, name in self.category_names.items() if name in names]
+
+    def mask(self, filters: TransactionFilters) -> np.ndarray:
+        mask = np.ones(self.size, dtype=bool)
+        timestamps = self.timestamps[:self.size]
+        amounts = self.amounts[:self.size]
+        types = self.types[:self.size]
+        categories = self.categories[:self.size]
+
+        if filters.type:
+            mask &= types == TYPE_CODES[filters.type]
+        if filters.types:
+            mask &= np.isin(types, [TYPE_CODES[value] for value in filters.types])
+        if filters.category:
+            mask &= np.isin(categories, self.category_ids([filters.category]))
+        if filters.categories:
+            mask &= np.isin(categories, self.category_ids(filters.categories))
+        for value in (filters.amount, filters.amount_min):
+            if value:
+                mask &= amounts >= to_minor_units(value)
+        if filters.amount_max is not None:
+            mask &= amounts <= to_minor_units(filters.amount_max)
+        for value in (filters.transaction_datetime, filters.date_from):
+            if value:
+                mask &= timestamps >= to_microseconds(value)
+        if filters.date_to:
+            mask &= timestamps < to_microseconds(filters.date_to)
+
+        return mask
+
+    def member_rows(self, keys: list, amounts: np.ndarray) -> list[tuple]:
+        if not len(amounts):
+            return []
+        unique, inverse = np.unique(np.stack(keys), axis=1, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        sums = np.bincount(inverse, weights=amounts)
+        counts = np.bincount(inverse)
+        return [
+            (int(user_id), TYPE_NAMES[int(type_code)], key, Decimal(int(amount)) / 100, int(count))
+            for (user_id, type_code, key), amount, count in zip(unique.T.tolist(), sums, counts)
+        ]
+
+    def statistics(self, filters: TransactionFilters, period: str, by_member: bool = False) -> dict:
+        mask = self.mask(filters)
+        amounts = self.amounts[:self.size][mask]
+        types = self.types[:self.size][mask]
+        categories = self.categories[:self.size][mask]
+        timestamps = self.timestamps[:self.size][mask]
+        truncated = timestamps.astype("datetime64[us]").astype(f"datetime64[{PERIOD_UNITS[period]}]")
+
+        is_expense = types == TYPE_CODES[TransactionType.expense]
+        total_income = Decimal(int(amounts[~is_expense].sum())) / 100
+        total_expense = Decimal(int(amounts[is_expense].sum())) / 100
+
+        by_category = {}
+        category_ids, inverse = np.unique(categories[is_expense], return_inverse=True)
+        for category_id, amount in zip(category_ids, np.bincount(inverse, weights=amounts[is_expense])):
+            name = self.category_names.get(int(category_id))
+            by_category[name] = by_category.get(name, 0) + amount / 100
+
+        periods, inverse = np.unique(truncated[is_expense], return_inverse=True)
+        by_period = [
+            {"period": period_label(periods[index]), "amount": float(amount / 100)}
+            for index, amount in enumerate(np.bincount(inverse, weights=amounts[is_expense]))
+        ]
+
+        stats = {
+            "total_income": total_income,
+            "total_expense": total_expense,
+            "total_count": int(mask.sum()),
+            "grouped_by_category_expense": [
+                {"category": name, "amount": float(amount)} for name, amount in by_category.items()
+            ],
+            "grouped_by_period_expense": by_period,
+        }
+        if by_member:
+            users = self.users[:self.size][mask]
+            stats["member_category_rows"] = [
+                (user_id, transaction_type, self.category_names.get(category_id), amount, count)
+                for user_id, transaction_type, category_id, amount, count
+                in self.member_rows([users, types, categories], amounts)
+            ]
+            stats["member_period_rows"] = [
+                (user_id, transaction_type, period_label(np.datetime64(value, PERIOD_UNITS[period])), amount, count)
+                for user_id, transaction_type, value, amount, count
+                in self.member_rows([users, types, truncated.astype(np.int64)], amounts)
+            ]
+        return stats
+
+
+class AnalyticsCache:
+    def __init__(self, max_scopes: int = ANALYTICS_CACHE_MAX_SCOPES,
+                 max_rows: int = ANALYTICS_CACHE_MAX_ROWS, ttl: int = ANALYTICS_CACHE_TTL_SECONDS):
+        self.max_scopes = max_scopes
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.scopes: OrderedDict[tuple, ScopeData] = OrderedDict()
+
+    def get(self, scope: tuple, version: tuple) -> ScopeData | None:
+        data = self.scopes.get(scope)
+        if data is None:
+            return None
+        if data.version != version or time.monotonic() - data.loaded_at > self.ttl:
+            del self.scopes[scope]
+            return None
+        self.scopes.move_to_end(scope)
+        return data
+
+    def put(self, scope: tuple, data: ScopeData):
+        self.scopes[scope] = data
+        self.scopes.move_to_end(scope)
+        while len(self.scopes) > self.max_scopes:
+            self.scopes.popitem(last=False)
+
+    async def scope_version(self, db: AsyncSession, scope: tuple) -> tuple:
+        kind, scope_id = scope
+        if kind == "user":
+            versions = [
+                select(func.max(Transaction.version)).where(Transaction.user_id == scope_id),
+                select(func.max(TransactionTombstone.version)).where(TransactionTombstone.user_id == scope_id),
+                select(func.max(TransactionArchive.id)).where(TransactionArchive.user_id == scope_id),
+            ]
+        else:
+            versions = [
+                select(Group.version).where(Group.id == scope_id),
+                select(func.max(TransactionArchive.id)).where(TransactionArchive.group_ids.contains([scope_id])),
+            ]
+        result = await db.execute(select(*[version.scalar_subquery() for version in versions]))
+        return tuple(result.one())
+
+    async def load(self, db: AsyncSession, scope: tuple, version: tuple) -> ScopeData | None:
+        kind, scope_id = scope
+        query = select(
+            Transaction.id, Transaction.transaction_datetime, Transaction.amount,
+            Transaction.type, Transaction.category_id, Transaction.user_id
+        )
+        if kind == "user":
+            query = query.where(Transaction.user_id == scope_id)
+        else:
+            query = query.join(
+                transaction_group_association,
+                transaction_group_association.c.transaction_id == Transaction.id
+            ).where(transaction_group_association.c.group_id == scope_id)
+
+        result = await db.execute(query.limit(self.max_rows + 1))
+        rows = result.all()
+        if len(rows) > self.max_rows:
+            return None
+
+        category_ids = {row.category_id for row in rows}
+        names_result = await db.execute(
+            select(Category.id, Category.name).where(Category.id.in_(category_ids))
+        )
+        data = ScopeData(rows, dict(names_result.all()), version)
+        self.put(scope, data)
+        return data
+
+    async def statistics(self, db: AsyncSession, scope: tuple, filters: TransactionFilters,
+                         period: str, by_member: bool = False) -> dict | None:
+        if set(filters.model_dump(exclude_none=True)) - SUPPORTED_FILTERS:
+            return None
+
+        version = await self.scope_version(db, scope)
+        data = self.get(scope, version) or await self.load(db, scope, version)
+        if data is None:
+            return None
+        return data.statistics(filters, period, by_member)
+
+    def scopes_of(self, transaction: Transaction, group_ids=None) -> list[tuple]:
+        if group_ids is None:
+            group_ids = [group.id for group in transaction.groups]
+        return [("user", transaction.user_id)] + [("group", group_id) for group_id in group_ids]
+
+    def transaction_created(self, transaction: Transaction):
+        self.invalidate(*self.scopes_of(transaction))
+
+    def transaction_updated(self, transaction: Transaction, old_group_ids: list[int]):
+        self.invalidate(*self.scopes_of(transaction, old_group_ids), *self.scopes_of(transaction))
+
+    def transaction_deleted(self, transaction_id: int, user_id: int, group_ids: list[int]):
+        self.invalidate(("user", user_id), *[("group", group_id) for group_id in group_ids])
+
+    def invalidate(self, *scopes: tuple):
+        for scope in scopes:
+            self.scopes.pop(scope, None)
+
+    def invalidate_groups(self):
+        for scope in [scope for scope in self.scopes if scope[0] == "group"]:
+            del self.scopes[scope]
+
+    def change_events_dispatched(self, events):
+        scopes = set()
+        for change_event in events:
+            if change_event.entity == "transaction":
+                scopes.add(("user", change_event.user_id))
+            scopes.update(("group", group_id) for group_id in change_event.group_ids or [])
+        self.invalidate(*scopes)
+
+    def clear(self):
+        self.scopes.clear()
+
+
+analytics_cache = AnalyticsCache()
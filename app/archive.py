@@ -0,0 +1,360 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import (Transaction, TransactionArchive, TransactionListEntry, Category, Group,
+                        transaction_group_association, delete_transaction_list)
+from app.schemas import TransactionFilters
+from functools import lru_cache
+from typing import TYPE_CHECKING
+import heapq
+import os
+import uuid
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+ARCHIVE_DIR = os.getenv("TRANSACTION_ARCHIVE_DIR", "archive")
+ARCHIVE_AFTER_DAYS = int(os.getenv("TRANSACTION_ARCHIVE_AFTER_DAYS", "730"))
+ARCHIVE_DELETE_CHUNK_SIZE = 5000
+
+
+@lru_cache
+def archive_schema() -> "pa.Schema":
+    import pyarrow as pa
+    return pa.schema([
+        ("id", pa.int64()),
+        ("name", pa.string()),
+        ("type", pa.string()),
+        ("category", pa.string()),
+        ("amount", pa.decimal128(10, 2)),
+        ("transaction_datetime", pa.timestamp("us", tz="UTC")),
+        ("description", pa.string()),
+        ("user_id", pa.int64()),
+        ("group_ids", pa.list_(pa.int64())),
+        ("group_names", pa.list_(pa.string())),
+    ])
+
+
+def as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def write_archive_file(path: str, table: "pa.Table"):
+    import pyarrow as pa
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, archive_schema(), options=options) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+def read_archive_file(path: str) -> "pa.Table":
+    import pyarrow as pa
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+async def archive_user_transactions(db: AsyncSession, user_id: int, cutoff: datetime) -> int:
+    group_ids = (
+        select(func.array_agg(transaction_group_association.c.group_id))
+        .where(transaction_group_association.c.transaction_id == Transaction.id)
+        .scalar_subquery()
+    )
+    group_names = (
+        select(func.array_agg(Group.name))
+        .join(transaction_group_association, transaction_group_association.c.group_id == Group.id)
+        .where(transaction_group_association.c.transaction_id == Transaction.id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(
+            Transaction.id, Transaction.name, Transaction.type, Category.name.label("category"),
+            Transaction.amount, Transaction.transaction_datetime, Transaction.description,
+            Transaction.user_id, group_ids.label("group_ids"), group_names.label("group_names")
+        )
+        .join(Category, Category.id == Transaction.category_id)
+        .where(
+            Transaction.user_id == user_id,
+            Transaction.transaction_datetime < cutoff,
+            Transaction.is_recurring == False
+        )
+        .order_by(Transaction.transaction_datetime)
+    )
+    rows = result.all()
+    if not rows:
+        return 0
+
+    import pyarrow as pa
+    table = pa.Table.from_pydict({
+        "id": [row.id for row in rows],
+        "name": [row.name for row in rows],
+        "type": [row.type.value for row in rows],
+        "category": [row.category for row in rows],
+        "amount": [row.amount for row in rows],
+        "transaction_datetime": [as_utc(row.transaction_datetime) for row in rows],
+        "description": [row.description for row in rows],
+        "user_id": [row.user_id for row in rows],
+        "group_ids": [row.group_ids or [] for row in rows],
+        "group_names": [row.group_names or [] for row in rows],
+    }, schema=archive_schema())
+
+    path = os.path.join(ARCHIVE_DIR, f"user_{user_id}", f"transactions_{cutoff:%Y%m%d}_{uuid.uuid4().hex}.arrow")
+    write_archive_file(path, table)
+
+    try:
+        db.add(TransactionArchive(
+            user_id=user_id,
+            path=path,
+            archived_before=cutoff,
+            min_datetime=rows[0].transaction_datetime,
+            max_datetime=rows[-1].transaction_datetime,
+            row_count=len(rows),
+            group_ids=sorted({group_id for row in rows for group_id in row.group_ids or []}),
+        ))
+
+        ids = [row.id for row in rows]
+        for start in range(0, len(ids), ARCHIVE_DELETE_CHUNK_SIZE):
+            chunk = ids[start:start + ARCHIVE_DELETE_CHUNK_SIZE]
+            await db.execute(
+                delete(transaction_group_association)
+                .where(transaction_group_association.c.transaction_id.in_(chunk))
+            )
+            await db.execute(
+                delete(Transaction)
+                .where(Transaction.id.in_(chunk))
+                .execution_options(synchronize_session=False)
+            )
+            await db.execute(delete_transaction_list(chunk))
+
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        os.remove(path)
+        raise
+
+    return len(rows)
+
+async def get_users_to_archive(db: AsyncSession, cutoff: datetime) -> list[int]:
+    result = await db.execute(
+        select(Transaction.user_id)
+        .where(Transaction.transaction_datetime < cutoff, Transaction.is_recurring == False)
+        .distinct()
+    )
+    return result.scalars().all()
+
+def archive_cutoff(now: datetime) -> datetime:
+    return as_utc(now) - timedelta(days=ARCHIVE_AFTER_DAYS)
+
+def filters_lower_bound(filters: TransactionFilters) -> datetime | None:
+    bounds = [as_utc(value) for value in (filters.date_from, filters.transaction_datetime) if value]
+    return max(bounds) if bounds else None
+
+async def archived_files(
+    db: AsyncSession, user_ids: list[int], filters: TransactionFilters, group_id: int | None = None
+) -> list:
+    query = select(TransactionArchive.path, TransactionArchive.max_datetime, TransactionArchive.row_count)
+    if group_id is None:
+        query = query.where(TransactionArchive.user_id.in_(user_ids))
+    else:
+        query = query.where(TransactionArchive.group_ids.contains([group_id]))
+
+    lower_bound = filters_lower_bound(filters)
+    if lower_bound:
+        query = query.where(TransactionArchive.max_datetime >= lower_bound)
+    if filters.date_to:
+        query = query.where(TransactionArchive.min_datetime < as_utc(filters.date_to))
+
+    result = await db.execute(query.order_by(TransactionArchive.max_datetime.desc(), TransactionArchive.id))
+    return result.all()
+
+def read_archived(files: list, filters: TransactionFilters, group_id: int | None = None,
+                  limit: int | None = None) -> "pa.Table | None":
+    import pyarrow as pa
+    table = None
+    for file in files:
+        if limit is not None and table is not None and table.num_rows >= limit:
+            if as_utc(file.max_datetime) < table.column("transaction_datetime")[limit - 1].as_py():
+                break
+
+        archived = filter_archived(read_archive_file(file.path), filters, group_id)
+        table = archived if table is None else pa.concat_tables([table, archived])
+        table = table.sort_by([("transaction_datetime", "descending")])
+        if limit is not None:
+            table = table.slice(0, limit)
+    return table
+
+async def load_archived_transactions(
+    db: AsyncSession, user_ids: list[int], filters: TransactionFilters, group_id: int | None = None,
+    limit: int | None = None
+) -> "pa.Table | None":
+    files = await archived_files(db, user_ids, filters, group_id)
+    return read_archived(files, filters, group_id, limit)
+
+def filter_archived(table: "pa.Table", filters: TransactionFilters, group_id: int | None = None) -> "pa.Table":
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    timestamp_type = archive_schema().field("transaction_datetime").type
+    conditions = []
+    if filters.name:
+        conditions.append(pc.field("name") == filters.name)
+    if filters.type:
+        conditions.append(pc.field("type") == filters.type.value)
+    if filters.types:
+        conditions.append(pc.field("type").isin([value.value for value in filters.types]))
+    if filters.category:
+        conditions.append(pc.field("category") == filters.category)
+    if filters.categories:
+        conditions.append(pc.field("category").isin(filters.categories))
+    for value in (filters.amount, filters.amount_min):
+        if value is not None:
+            conditions.append(pc.field("amount") >= pa.scalar(Decimal(value)))
+    if filters.amount_max is not None:
+        conditions.append(pc.field("amount") <= pa.scalar(Decimal(filters.amount_max)))
+    lower_bound = filters_lower_bound(filters)
+    if lower_bound:
+        conditions.append(pc.field("transaction_datetime") >= pa.scalar(lower_bound, timestamp_type))
+    if filters.date_to:
+        conditions.append(pc.field("transaction_datetime") < pa.scalar(as_utc(filters.date_to), timestamp_type))
+    if filters.user_id:
+        conditions.append(pc.field("user_id") == filters.user_id)
+
+    for condition in conditions:
+        table = table.filter(condition)
+
+    if filters.group_ids:
+        requested = set(filters.group_ids)
+        mask = [bool(requested.intersection(ids)) for ids in table.column("group_ids").to_pylist()]
+        table = table.filter(pa.array(mask, type=pa.bool_()))
+    if group_id is not None:
+        mask = [group_id in ids for ids in table.column("group_ids").to_pylist()]
+        table = table.filter(pa.array(mask, type=pa.bool_()))
+
+    return table
+
+def archived_items(table: "pa.Table", offset: int, limit: int) -> list[dict]:
+    items = []
+    for row in table.slice(offset, limit).to_pylist():
+        items.append({
+            "id": row["id"],
+            "name": row["name"],
+            "type": row["type"],
+            "category": row["category"],
+            "amount": row["amount"],
+            "description": row["description"],
+            "is_recurring": False,
+            "recurring_period_days": None,
+            "transaction_datetime": row["transaction_datetime"],
+            "user_id": row["user_id"],
+            "groups": [
+                {"id": group_id, "name": group_name, "users": []}
+                for group_id, group_name in zip(row["group_ids"], row["group_names"])
+            ],
+        })
+    return items
+
+def item_datetime(item) -> datetime:
+    return item["transaction_datetime"] if isinstance(item, dict) else item.transaction_datetime
+
+async def merge_archived_page(db: AsyncSession, page: dict, query, count_query, pagination: dict,
+                              user_ids: list[int], filters: TransactionFilters, group_id: int | None = None) -> dict:
+    files = await archived_files(db, user_ids, filters, group_id)
+    if not files:
+        return page
+
+    size = pagination["size"]
+    skip = (pagination["page"] - 1) * size
+    count = pagination.get("count", "exact")
+    archived_max = as_utc(files[0].max_datetime)
+    items = list(page["items"])
+
+    if len(items) == size and as_utc(items[-1].transaction_datetime) > archived_max:
+        more = page["has_more"] or bool(read_archived(files, filters, group_id, limit=1).num_rows)
+    else:
+        entry_datetime = TransactionListEntry.transaction_datetime
+        live_before = await db.scalar(count_query.where(entry_datetime > archived_max))
+        head = items[:max(0, live_before - skip)]
+        tail_offset = max(0, skip - live_before)
+        tail_size = size - len(head)
+
+        result = await db.execute(
+            query.where(entry_datetime <= archived_max).limit(tail_offset + tail_size + 1)
+        )
+        archived = read_archived(files, filters, group_id, limit=tail_offset + tail_size + 1)
+        merged = list(heapq.merge(
+            result.scalars().all(), archived_items(archived, 0, archived.num_rows),
+            key=lambda item: as_utc(item_datetime(item)), reverse=True
+        ))
+        items = head + merged[tail_offset:tail_offset + tail_size]
+        more = len(merged) > tail_offset + tail_size
+
+    if count == "none":
+        return {**page, "items": items, "has_more": more}
+
+    if count == "exact":
+        archived = read_archived(files, filters, group_id)
+        total = page["total"] + archived.num_rows
+    else:
+        total = max(page["total"] + sum(file.row_count for file in files), skip + len(items) + int(more))
+    pages = (total + size - 1) // size if total > 0 else 0
+    return {**page, "items": items, "total": total, "pages": pages, "has_more": more}
+
+def truncate_period(value: datetime, period: str) -> datetime:
+    value = as_utc(value)
+    if period == "year":
+        return datetime(value.year, 1, 1, tzinfo=timezone.utc)
+    if period == "month":
+        return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+    return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+
+def archived_statistics(table: "pa.Table", period: str) -> dict:
+    stats = {
+        "total_income": Decimal(0),
+        "total_expense": Decimal(0),
+        "total_count": table.num_rows,
+        "by_category": {},
+        "by_period": {},
+    }
+    if not table.num_rows:
+        return stats
+
+    import pyarrow.compute as pc
+    for row in table.group_by("type").aggregate([("amount", "sum")]).to_pylist():
+        stats[f"total_{row['type']}"] = row["amount_sum"]
+
+    expenses = table.filter(pc.field("type") == "expense")
+    for row in expenses.group_by("category").aggregate([("amount", "sum")]).to_pylist():
+        stats["by_category"][row["category"]] = row["amount_sum"]
+
+    for value, amount in zip(expenses.column("transaction_datetime").to_pylist(),
+                             expenses.column("amount").to_pylist()):
+        key = truncate_period(value, period).isoformat()
+        stats["by_period"][key] = stats["by_period"].get(key, Decimal(0)) + amount
+
+    return stats
+
+def archived_member_rows(table: "pa.Table", period: str) -> tuple[list, list]:
+    category_rows = [
+        (row["user_id"], row["type"], row["category"], row["amount_sum"], row["amount_count"])
+        for row in table.group_by(["user_id", "type", "category"])
+        .aggregate([("amount", "sum"), ("amount", "count")]).to_pylist()
+    ]
+
+    periods = {}
+    for user_id, transaction_type, value, amount in zip(table.column("user_id").to_pylist(),
+                                                        table.column("type").to_pylist(),
+                                                        table.column("transaction_datetime").to_pylist(),
+                                                        table.column("amount").to_pylist()):
+        key = (user_id, transaction_type, truncate_period(value, period).isoformat())
+        total, count = periods.get(key, (Decimal(0), 0))
+        periods[key] = (total + amount, count + 1)
+    period_rows = [key + value for key, value in periods.items()]
+
+    return category_rows, period_rows
+
+def merge_grouped(items: list[dict], key: str, archived: dict) -> list[dict]:
+    merged = {item[key]: item["amount"] for item in items}
+    for value, amount in archived.items():
+        merged[value] = merged.get(value, 0) + float(amount)
+    return [{key: value, "amount": amount} for value, amount in merged.items()]
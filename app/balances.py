@@ -0,0 +1,123 @@
+from decimal import Decimal
+from sqlalchemy import select, func, case, literal, union_all, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Balance, Group, Transaction, TransactionType, TransactionArchive, transaction_group_association
+from app.archive import read_archive_file
+from app.database import AsyncSessionLocal
+from typing import TYPE_CHECKING
+import argparse
+import asyncio
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+BALANCE_FIELDS = ("total_income", "total_expense", "transaction_count")
+
+
+def empty_balance() -> dict:
+    return {"total_income": Decimal(0), "total_expense": Decimal(0), "transaction_count": 0}
+
+def balance_response(kind: str, owner_id: int, balance: Balance | None) -> dict:
+    values = empty_balance() if balance is None else {field: getattr(balance, field) for field in BALANCE_FIELDS}
+    return {
+        f"{kind}_id": owner_id,
+        "balance": values["total_income"] - values["total_expense"],
+        **values,
+    }
+
+async def get_balance(db: AsyncSession, kind: str, owner_id: int) -> dict:
+    balance = await db.get(Balance, (kind, owner_id))
+    return balance_response(kind, owner_id, balance)
+
+async def recompute_live_balances(db: AsyncSession) -> dict:
+    links = transaction_group_association
+    income = func.sum(case((Transaction.type == TransactionType.income, Transaction.amount), else_=0))
+    expense = func.sum(case((Transaction.type == TransactionType.expense, Transaction.amount), else_=0))
+    result = await db.execute(union_all(
+        select(literal("user"), Transaction.user_id, income, expense, func.count(Transaction.id))
+        .group_by(Transaction.user_id),
+        select(literal("group"), links.c.group_id, income, expense, func.count(Transaction.id))
+        .join(links, links.c.transaction_id == Transaction.id)
+        .group_by(links.c.group_id),
+    ))
+    return {
+        (kind, owner_id): {"total_income": total_income, "total_expense": total_expense, "transaction_count": count}
+        for kind, owner_id, total_income, total_expense, count in result.all()
+    }
+
+def add_archived_balances(balances: dict, table: "pa.Table"):
+    import pyarrow.compute as pc
+    group_ids = pc.list_flatten(table.column("group_ids"))
+    parents = pc.list_parent_indices(table.column("group_ids"))
+    owners = [("user", table.column("user_id")), ("group", group_ids)]
+
+    for kind, owner_ids in owners:
+        rows = table if kind == "user" else table.take(parents)
+        for owner_id, transaction_type, amount in zip(owner_ids.to_pylist(),
+                                                      rows.column("type").to_pylist(),
+                                                      rows.column("amount").to_pylist()):
+            balance = balances.setdefault((kind, owner_id), empty_balance())
+            balance[f"total_{transaction_type}"] += amount
+            balance["transaction_count"] += 1
+
+async def recompute_balances(db: AsyncSession) -> dict:
+    balances = await recompute_live_balances(db)
+    result = await db.execute(select(TransactionArchive.path))
+    for path in result.scalars().all():
+        add_archived_balances(balances, read_archive_file(path))
+
+    result = await db.execute(select(Group.id))
+    group_ids = set(result.scalars().all())
+    return {key: value for key, value in balances.items() if key[0] != "group" or key[1] in group_ids}
+
+async def find_balance_drift(db: AsyncSession) -> list[dict]:
+    expected = await recompute_balances(db)
+    result = await db.execute(select(Balance))
+    stored = {
+        (balance.kind, balance.owner_id): {field: getattr(balance, field) for field in BALANCE_FIELDS}
+        for balance in result.scalars().all()
+    }
+
+    drift = []
+    for key in sorted(expected.keys() | stored.keys()):
+        expected_values = expected.get(key, empty_balance())
+        stored_values = stored.get(key, empty_balance())
+        if expected_values != stored_values:
+            drift.append({"kind": key[0], "owner_id": key[1], "stored": stored_values, "expected": expected_values})
+    return drift
+
+async def fix_balance_drift(db: AsyncSession, drift: list[dict]):
+    for item in drift:
+        if item["expected"] == empty_balance():
+            await db.execute(delete(Balance).where(Balance.kind == item["kind"], Balance.owner_id == item["owner_id"]))
+            continue
+
+        statement = pg_insert(Balance).values(kind=item["kind"], owner_id=item["owner_id"], **item["expected"])
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=["kind", "owner_id"], set_=item["expected"]
+        ))
+    await db.commit()
+
+async def verify_balances(fix: bool = False) -> int:
+    async with AsyncSessionLocal() as db:
+        await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        drift = await find_balance_drift(db)
+        for item in drift:
+            print(f"Расхождение баланса {item['kind']} {item['owner_id']}: "
+                  f"сохранено {item['stored']}, ожидается {item['expected']}")
+
+        if drift and fix:
+            await fix_balance_drift(db, drift)
+            print(f"Исправлено балансов: {len(drift)}")
+        elif not drift:
+            print("Расхождений балансов не найдено")
+
+    return 1 if drift and not fix else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Проверка материализованных балансов")
+    parser.add_argument("--fix", action="store_true", help="Перезаписать расходящиеся балансы")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(verify_balances(args.fix)))
@@ -0,0 +1,196 @@
+from starlette.datastructures import Headers, MutableHeaders
+from datetime import datetime, timedelta, timezone
+import argparse
+import brotli
+import json
+import os
+import statistics
+import time
+import zlib
+
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "5"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html", "text/csv")
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int):
+        self.compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+def accepted_encodings(header: str) -> dict[str, float]:
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            encodings[name.strip().lower()] = quality
+    return encodings
+
+def choose_encoding(header: str) -> str | None:
+    encodings = accepted_encodings(header)
+    default = encodings.get("*", 0.0)
+    candidates = [(encodings.get(name, default), name) for name in ("br", "gzip")]
+    quality, name = max(candidates, key=lambda candidate: candidate[0])
+    return name if quality > 0 else None
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+                 gzip_level: int = COMPRESSION_GZIP_LEVEL, brotli_quality: int = COMPRESSION_BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def compressor(self, encoding: str):
+        if encoding == "br":
+            return BrotliCompressor(self.brotli_quality)
+        return GzipCompressor(self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                content_type = headers.get("content-type", "")
+                if ("content-encoding" in headers
+                        or not content_type.startswith(COMPRESSIBLE_TYPES)
+                        or (not more_body and len(body) < self.minimum_size)):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = self.compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                del headers["Content-Length"]
+                if not more_body:
+                    body = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start_message)
+
+            body = compressor.compress(body)
+            if not more_body:
+                body += compressor.finish()
+            if body or not more_body:
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def sample_page(items: int) -> bytes:
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    page = {
+        "items": [
+            {
+                "id": index,
+                "name": f"Покупка {index}",
+                "type": "expense" if index % 5 else "income",
+                "category": ["Food", "Transport", "Rent", "Fun", "Health"][index % 5],
+                "amount": f"{(index * 37) % 5000 + 0.5:.2f}",
+                "description": "Совместные расходы" if index % 3 == 0 else None,
+                "is_recurring": False,
+                "recurring_period_days": None,
+                "transaction_datetime": (now - timedelta(hours=index)).isoformat(),
+                "user_id": index % 7 + 1,
+                "groups": [{"id": 1, "name": "Поездка", "users": []}],
+                "updated_at": now.isoformat(),
+                "version": index,
+            }
+            for index in range(items)
+        ],
+        "total": items, "page": 1, "size": items, "pages": 1, "has_more": False,
+    }
+    return json.dumps(page, ensure_ascii=False).encode()
+
+def benchmark(items: int, bandwidth_mbit: float, repeats: int) -> list[dict]:
+    payload = sample_page(items)
+    settings = [("identity", 0)] + [("gzip", level) for level in (1, 5, 9)] + [("br", quality) for quality in (1, 4, 6, 11)]
+
+    results = []
+    for encoding, level in settings:
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            if encoding == "identity":
+                body = payload
+            else:
+                compressor = BrotliCompressor(level) if encoding == "br" else GzipCompressor(level)
+                body = compressor.compress(payload) + compressor.finish()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        compress_ms = statistics.median(timings)
+        transfer_ms = len(body) * 8 / (bandwidth_mbit * 1000)
+        results.append({
+            "encoding": encoding,
+            "level": level,
+            "bytes": len(body),
+            "ratio": len(payload) / len(body),
+            "compress_ms": compress_ms,
+            "total_ms": compress_ms + transfer_ms,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сравнение сжатия ответов API")
+    parser.add_argument("--items", type=int, default=100, help="Количество транзакций в ответе")
+    parser.add_argument("--bandwidth", type=float, default=10.0, help="Пропускная способность канала, Мбит/с")
+    parser.add_argument("--repeats", type=int, default=20, help="Количество повторов замера")
+    args = parser.parse_args()
+
+    print(f"{'Сжатие':<10}{'Уровень':>8}{'Байт':>10}{'Степень':>9}{'Сжатие, мс':>12}{'Итого, мс':>11}")
+    for row in benchmark(args.items, args.bandwidth, args.repeats):
+        print(f"{row['encoding']:<10}{row['level']:>8}{row['bytes']:>10}{row['ratio']:>9.1f}"
+              f"{row['compress_ms']:>12.2f}{row['total_ms']:>11.2f}")
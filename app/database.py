@@ -1,31 +1,49 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+from contextvars import ContextVar
+from functools import lru_cache
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import declarative_base, Session
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL environment variable is not set")
+request_statement_timeout: ContextVar[int | None] = ContextVar("request_statement_timeout", default=None)
 
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,
-    future=True
-)
+@lru_cache
+def get_engine() -> AsyncEngine:
+    if not DATABASE_URL:
+        raise ValueError("DATABASE_URL environment variable is not set")
 
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False
-)
+    return create_async_engine(
+        DATABASE_URL,
+        echo=True,
+        future=True
+    )
+
+@lru_cache
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        get_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False
+    )
+
+def AsyncSessionLocal() -> AsyncSession:
+    return get_sessionmaker()()
 
 Base = declarative_base()
 
+@event.listens_for(Session, "after_begin")
+def set_statement_timeout(session, transaction, connection):
+    timeout = session.info.get("statement_timeout")
+    if timeout:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
 async def get_db():
     async with AsyncSessionLocal() as session:
+        session.info["statement_timeout"] = request_statement_timeout.get()
         yield session
 
 async def init_db():
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-
@@ -0,0 +1,206 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, delete, update, func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import (User, Group, Transaction, Balance, ChangeEvent, DeletionJob, TransactionArchive,
+                        TransactionTombstone, transaction_group_association, balance_rows, upsert_balances,
+                        transaction_event_rows, insert_change_events, delete_transaction_list,
+                        refresh_transaction_list)
+import os
+
+GROUP_DELETE_SYNC_LIMIT = int(os.getenv("GROUP_DELETE_SYNC_LIMIT", "10000"))
+DELETION_CHUNK_SIZE = int(os.getenv("DELETION_CHUNK_SIZE", "5000"))
+DELETION_JOBS_POLL_SECONDS = int(os.getenv("DELETION_JOBS_POLL_SECONDS", "10"))
+DELETION_JOBS_STALE = timedelta(seconds=int(os.getenv("DELETION_JOBS_STALE_SECONDS", "600")))
+DELETION_JOB_MAX_ATTEMPTS = int(os.getenv("DELETION_JOB_MAX_ATTEMPTS", "5"))
+DELETION_JOB_RETRY_SECONDS = int(os.getenv("DELETION_JOB_RETRY_SECONDS", "60"))
+
+
+async def is_large_group(db: AsyncSession, group_id: int) -> bool:
+    links = (
+        select(transaction_group_association.c.transaction_id)
+        .where(transaction_group_association.c.group_id == group_id)
+        .limit(GROUP_DELETE_SYNC_LIMIT + 1)
+        .subquery()
+    )
+    return await db.scalar(select(func.count()).select_from(links)) > GROUP_DELETE_SYNC_LIMIT
+
+async def refresh_group_transactions(db: AsyncSession, transaction_ids: list[int]):
+    if transaction_ids:
+        await db.run_sync(lambda session: refresh_transaction_list(session.connection(), transaction_ids))
+
+async def unlink_group_transactions(db: AsyncSession, condition) -> list[int]:
+    deleted_links = (
+        delete(transaction_group_association)
+        .where(condition)
+        .returning(transaction_group_association.c.transaction_id)
+        .cte("deleted_links")
+    )
+    unlinked_ids = select(deleted_links.c.transaction_id)
+    result = await db.execute(
+        update(Transaction)
+        .where(Transaction.id.in_(unlinked_ids))
+        .values(updated_at=func.now())
+        .add_cte(insert_change_events(transaction_event_rows("updated", unlinked_ids)).cte("events"))
+        .returning(Transaction.id)
+        .execution_options(synchronize_session=False)
+    )
+    transaction_ids = result.scalars().all()
+    await refresh_group_transactions(db, transaction_ids)
+    return transaction_ids
+
+async def delete_group_rows(db: AsyncSession, group_id: int):
+    await unlink_group_transactions(db, transaction_group_association.c.group_id == group_id)
+    await db.execute(delete(Group).where(Group.id == group_id))
+    await db.execute(delete(Balance).where(Balance.kind == "group", Balance.owner_id == group_id))
+
+async def delete_group_links_chunk(db: AsyncSession, group_id: int, chunk_size: int = DELETION_CHUNK_SIZE) -> int:
+    chunk = (
+        select(transaction_group_association.c.transaction_id)
+        .where(transaction_group_association.c.group_id == group_id)
+        .limit(chunk_size)
+        .scalar_subquery()
+    )
+    transaction_ids = await unlink_group_transactions(db, and_(
+        transaction_group_association.c.group_id == group_id,
+        transaction_group_association.c.transaction_id.in_(chunk)
+    ))
+    return len(transaction_ids)
+
+async def delete_user_transactions_chunk(db: AsyncSession, user_id: int,
+                                         chunk_size: int = DELETION_CHUNK_SIZE) -> int:
+    selected = select(Transaction.id).where(Transaction.user_id == user_id).limit(chunk_size).cte("selected")
+    deleted_links = (
+        delete(transaction_group_association)
+        .where(transaction_group_association.c.transaction_id.in_(select(selected.c.id)))
+        .returning(transaction_group_association.c.transaction_id)
+        .cte("deleted_links")
+    )
+    result = await db.execute(
+        delete(Transaction)
+        .where(Transaction.id.in_(select(selected.c.id)))
+        .add_cte(deleted_links)
+        .add_cte(upsert_balances(balance_rows(select(selected.c.id), -1)).cte("balances"))
+        .add_cte(insert_change_events(transaction_event_rows("deleted", select(selected.c.id))).cte("events"))
+        .add_cte(delete_transaction_list(select(selected.c.id)).cte("list_entries"))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+async def delete_user_tombstones_chunk(db: AsyncSession, user_id: int, chunk_size: int = DELETION_CHUNK_SIZE) -> int:
+    chunk = (
+        select(TransactionTombstone.transaction_id)
+        .where(TransactionTombstone.user_id == user_id)
+        .limit(chunk_size)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        delete(TransactionTombstone)
+        .where(TransactionTombstone.transaction_id.in_(chunk))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+async def delete_user_archives(db: AsyncSession, user_id: int):
+    result = await db.execute(
+        delete(TransactionArchive)
+        .where(TransactionArchive.user_id == user_id)
+        .returning(TransactionArchive.path)
+        .execution_options(synchronize_session=False)
+    )
+    paths = result.scalars().all()
+    await db.commit()
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+async def delete_in_chunks(db: AsyncSession, job: DeletionJob, delete_chunk, target_id: int, chunk_size: int):
+    while True:
+        deleted = await delete_chunk(db, target_id, chunk_size)
+        job.deleted_rows += deleted
+        job.updated_at = datetime.now(timezone.utc)
+        await db.commit()
+        if deleted < chunk_size:
+            break
+
+async def claim_deletion_job(db: AsyncSession) -> DeletionJob | None:
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(DeletionJob)
+        .where(or_(
+            and_(DeletionJob.status == "pending",
+                 or_(DeletionJob.run_after.is_(None), DeletionJob.run_after <= now)),
+            and_(DeletionJob.status == "running", DeletionJob.updated_at < now - DELETION_JOBS_STALE)
+        ))
+        .order_by(DeletionJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = result.scalars().first()
+    if job is None:
+        await db.rollback()
+        return None
+
+    job.status = "running"
+    job.updated_at = now
+    await db.commit()
+    return job
+
+async def run_group_deletion(db: AsyncSession, job: DeletionJob, chunk_size: int = DELETION_CHUNK_SIZE):
+    await delete_in_chunks(db, job, delete_group_links_chunk, job.target_id, chunk_size)
+    await delete_group_rows(db, job.target_id)
+
+async def run_user_purge(db: AsyncSession, job: DeletionJob, chunk_size: int = DELETION_CHUNK_SIZE):
+    user_id = job.target_id
+    result = await db.execute(select(Group.id).where(Group.owner_id == user_id).order_by(Group.id))
+    for group_id in result.scalars().all():
+        db.add(ChangeEvent(entity="group", entity_id=group_id, action="deleted", user_id=user_id, group_ids=[group_id]))
+        await db.commit()
+        await delete_in_chunks(db, job, delete_group_links_chunk, group_id, chunk_size)
+        await delete_group_rows(db, group_id)
+        await db.commit()
+
+    await delete_in_chunks(db, job, delete_user_transactions_chunk, user_id, chunk_size)
+    await delete_in_chunks(db, job, delete_user_tombstones_chunk, user_id, chunk_size)
+    await delete_user_archives(db, user_id)
+
+    await db.execute(delete(Balance).where(Balance.kind == "user", Balance.owner_id == user_id))
+    await db.execute(delete(User).where(User.id == user_id))
+
+DELETION_RUNNERS = {
+    "group": run_group_deletion,
+    "user": run_user_purge,
+}
+
+async def run_deletion_job(db: AsyncSession, job: DeletionJob, chunk_size: int = DELETION_CHUNK_SIZE):
+    try:
+        await DELETION_RUNNERS[job.kind](db, job, chunk_size)
+        job.status = "done"
+        job.error = None
+        job.finished_at = datetime.now(timezone.utc)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        await db.refresh(job)
+        now = datetime.now(timezone.utc)
+        job.attempts += 1
+        job.error = str(e)
+        job.updated_at = now
+        if job.attempts >= DELETION_JOB_MAX_ATTEMPTS:
+            job.status = "failed"
+            job.finished_at = now
+        else:
+            job.status = "pending"
+            job.run_after = now + timedelta(seconds=DELETION_JOB_RETRY_SECONDS * 2 ** (job.attempts - 1))
+        await db.commit()
+        raise
+
+async def process_deletion_jobs(db: AsyncSession, chunk_size: int = DELETION_CHUNK_SIZE) -> int:
+    processed = 0
+    while (job := await claim_deletion_job(db)) is not None:
+        try:
+            await run_deletion_job(db, job, chunk_size)
+        except Exception as e:
+            print(f"Ошибка задачи удаления {job.id} (попытка {job.attempts}): {e}")
+            continue
+        processed += 1
+    return processed
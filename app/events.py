@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Awaitable, Callable
+from app.models import ChangeEvent
+import inspect
+import os
+
+CHANGE_EVENTS_DISPATCH_SECONDS = int(os.getenv("CHANGE_EVENTS_DISPATCH_SECONDS", "5"))
+CHANGE_EVENTS_BATCH_SIZE = int(os.getenv("CHANGE_EVENTS_BATCH_SIZE", "500"))
+CHANGE_EVENTS_RETENTION = timedelta(days=int(os.getenv("CHANGE_EVENTS_RETENTION_DAYS", "7")))
+
+Subscriber = Callable[[list[ChangeEvent]], Awaitable[None] | None]
+
+subscribers: list[Subscriber] = []
+
+
+def subscribe(handler: Subscriber) -> Subscriber:
+    if handler not in subscribers:
+        subscribers.append(handler)
+    return handler
+
+def unsubscribe(handler: Subscriber):
+    if handler in subscribers:
+        subscribers.remove(handler)
+
+async def notify_subscribers(events: list[ChangeEvent]):
+    for handler in list(subscribers):
+        try:
+            result = handler(events)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"Ошибка обработчика событий {getattr(handler, '__name__', handler)}: {e}")
+
+async def dispatch_change_events(db: AsyncSession, batch_size: int = CHANGE_EVENTS_BATCH_SIZE) -> int:
+    result = await db.execute(
+        select(ChangeEvent)
+        .where(ChangeEvent.dispatched_at.is_(None))
+        .order_by(ChangeEvent.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    events = result.scalars().all()
+    if not events:
+        await db.rollback()
+        return 0
+
+    await notify_subscribers(events)
+    await db.execute(
+        update(ChangeEvent)
+        .where(ChangeEvent.id.in_([change_event.id for change_event in events]))
+        .values(dispatched_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return len(events)
+
+async def delete_dispatched_events(db: AsyncSession, batch_size: int = CHANGE_EVENTS_BATCH_SIZE) -> int:
+    dispatched_ids = (
+        select(ChangeEvent.id)
+        .where(ChangeEvent.dispatched_at <= datetime.now(timezone.utc) - CHANGE_EVENTS_RETENTION)
+        .limit(batch_size)
+    )
+    result = await db.execute(
+        delete(ChangeEvent)
+        .where(ChangeEvent.id.in_(dispatched_ids))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,134 @@
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.models import ChangeEvent, GROUP_EVENTS_CHANNEL
+import asyncio
+import asyncpg
+import json
+import os
+
+GROUP_EVENTS_QUEUE_SIZE = int(os.getenv("GROUP_EVENTS_QUEUE_SIZE", "100"))
+GROUP_EVENTS_KEEPALIVE_SECONDS = int(os.getenv("GROUP_EVENTS_KEEPALIVE_SECONDS", "15"))
+GROUP_EVENTS_REPLAY_LIMIT = 1000
+GROUP_EVENTS_RETRY_MS = 3000
+
+
+def listener_dsn(database_url: str) -> str:
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+def change_event_payload(change_event: ChangeEvent) -> dict:
+    return {
+        "id": change_event.id,
+        "entity": change_event.entity,
+        "entity_id": change_event.entity_id,
+        "action": change_event.action,
+        "user_id": change_event.user_id,
+        "group_ids": change_event.group_ids,
+    }
+
+def format_sse(payload: dict) -> str:
+    return (
+        f"id: {payload['id']}\n"
+        f"event: {payload['entity']}.{payload['action']}\n"
+        f"data: {json.dumps(payload, separators=(',', ':'))}\n\n"
+    )
+
+async def get_missed_events(db: AsyncSession, group_id: int, last_event_id: int) -> list[dict]:
+    result = await db.execute(
+        select(ChangeEvent)
+        .where(ChangeEvent.id > last_event_id, ChangeEvent.group_ids.any(group_id))
+        .order_by(ChangeEvent.id)
+        .limit(GROUP_EVENTS_REPLAY_LIMIT)
+    )
+    return [change_event_payload(change_event) for change_event in result.scalars().all()]
+
+
+class GroupEventHub:
+    def __init__(self, database_url: Optional[str] = None, queue_size: int = GROUP_EVENTS_QUEUE_SIZE):
+        self.database_url = database_url or os.getenv("DATABASE_URL")
+        self.queue_size = queue_size
+        self.connection: asyncpg.Connection | None = None
+        self.lock = asyncio.Lock()
+        self.queues: dict[int, set[asyncio.Queue]] = {}
+
+    async def listen(self):
+        async with self.lock:
+            if self.connection is not None and not self.connection.is_closed():
+                return
+            self.connection = await asyncpg.connect(listener_dsn(self.database_url))
+            self.connection.add_termination_listener(self.connection_lost)
+            await self.connection.add_listener(GROUP_EVENTS_CHANNEL, self.notified)
+
+    async def subscribe(self, group_id: int) -> asyncio.Queue:
+        await self.listen()
+        queue = asyncio.Queue(self.queue_size)
+        self.queues.setdefault(group_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, group_id: int, queue: asyncio.Queue):
+        queues = self.queues.get(group_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self.queues[group_id]
+
+    def notified(self, connection, pid, channel, payload: str):
+        self.publish(json.loads(payload))
+
+    def publish(self, payload: dict):
+        for group_id in payload["group_ids"] or []:
+            for queue in list(self.queues.get(group_id, ())):
+                try:
+                    queue.put_nowait(payload)
+                except asyncio.QueueFull:
+                    self.unsubscribe(group_id, queue)
+                    self.close_queue(queue)
+
+    def close_queue(self, queue: asyncio.Queue):
+        while True:
+            try:
+                queue.put_nowait(None)
+                return
+            except asyncio.QueueFull:
+                queue.get_nowait()
+
+    def connection_lost(self, connection):
+        self.connection = None
+        for queues in self.queues.values():
+            for queue in queues:
+                self.close_queue(queue)
+        self.queues.clear()
+
+    async def close(self):
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            await connection.close()
+        self.connection_lost(None)
+
+    async def stream(self, request, group_id: int, queue: asyncio.Queue, missed: list[dict],
+                     keepalive: int = GROUP_EVENTS_KEEPALIVE_SECONDS):
+        try:
+            yield f"retry: {GROUP_EVENTS_RETRY_MS}\n\n"
+            last_event_id = 0
+            for payload in missed:
+                last_event_id = payload["id"]
+                yield format_sse(payload)
+
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if payload is None:
+                    break
+                if payload["id"] > last_event_id:
+                    yield format_sse(payload)
+        finally:
+            self.unsubscribe(group_id, queue)
+
+
+group_event_hub = GroupEventHub()
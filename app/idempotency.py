@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import Header, HTTPException, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.models import IdempotencyKey
+import hashlib
+import json
+
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+IDEMPOTENCY_PURGE_BATCH_SIZE = 1000
+
+
+def idempotency_key_header(
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255)
+) -> Optional[str]:
+    return idempotency_key
+
+def request_fingerprint(payload: BaseModel) -> str:
+    body = json.dumps(payload.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+async def get_stored_response(
+    db: AsyncSession, user_id: int, key: str, fingerprint: str
+) -> Optional[JSONResponse]:
+    result = await db.execute(
+        select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+    )
+    stored = result.scalars().first()
+
+    if not stored:
+        return None
+
+    if stored.expires_at <= datetime.now(timezone.utc):
+        await db.delete(stored)
+        await db.flush()
+        return None
+
+    if stored.request_hash != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key уже использован для другого запроса"
+        )
+
+    return JSONResponse(status_code=stored.status_code, content=stored.response_body)
+
+async def commit_with_key(
+    db: AsyncSession, user_id: int, key: str, fingerprint: str, status_code: int, content
+) -> Optional[JSONResponse]:
+    db.add(IdempotencyKey(
+        user_id=user_id,
+        key=key,
+        request_hash=fingerprint,
+        status_code=status_code,
+        response_body=content,
+        expires_at=datetime.now(timezone.utc) + IDEMPOTENCY_KEY_TTL,
+    ))
+
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        stored_response = await get_stored_response(db, user_id, key, fingerprint)
+        if not stored_response:
+            raise
+        return stored_response
+
+    return None
+
+async def delete_expired_keys(db: AsyncSession, batch_size: int = IDEMPOTENCY_PURGE_BATCH_SIZE) -> int:
+    expired_ids = (
+        select(IdempotencyKey.id)
+        .where(IdempotencyKey.expires_at <= datetime.now(timezone.utc))
+        .limit(batch_size)
+    )
+    result = await db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.id.in_(expired_ids))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
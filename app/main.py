@@ -1,19 +1,43 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from app.routes import users, groups, transactions
-from app.scheduler import start_scheduler, shutdown_scheduler, check_reminders
+from app.routes import users, groups, transactions, budgets
+from app.database import get_engine
+from app.utils import get_secret_key
+from app.group_events import group_event_hub
+from app.compression import CompressionMiddleware
+from app.rate_limit import RateLimitMiddleware
+from app.query_limits import CancelOnDisconnectMiddleware, statement_timeout_handler, metrics
+from app.analytics import analytics_cache
+from app.events import subscribe, unsubscribe
+from sqlalchemy.exc import DBAPIError
+import os
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    start_scheduler()
+    get_secret_key()
+    get_engine()
+    subscribe(analytics_cache.change_events_dispatched)
+    if SCHEDULER_ENABLED:
+        from app.scheduler import start_scheduler, shutdown_scheduler
+        start_scheduler()
     yield
-    shutdown_scheduler()
+    if SCHEDULER_ENABLED:
+        shutdown_scheduler()
+    unsubscribe(analytics_cache.change_events_dispatched)
+    await group_event_hub.close()
 
 app = FastAPI(title="Finance Tracker API", lifespan=lifespan)
+app.add_middleware(CancelOnDisconnectMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(RateLimitMiddleware)
+app.add_exception_handler(DBAPIError, statement_timeout_handler)
 
 app.include_router(users.router)
 app.include_router(groups.router)
 app.include_router(transactions.router)
+app.include_router(budgets.router)
 
 @app.get("/api")
 async def read_root():
@@ -23,8 +47,13 @@ async def read_root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def get_metrics():
+    return metrics()
+
 @app.get("/reminders")
 async def call_reminders():
+    from app.scheduler import check_reminders
     await check_reminders()
     return
 
@@ -1,6 +1,9 @@
 from sqlalchemy import (Column, Integer, String, Numeric, DateTime, ForeignKey, Enum as SQLEnum,
-                        Table, text, Boolean)
-from sqlalchemy.orm import relationship
+                        Table, text, Boolean, Index, JSON, select, tuple_, event, func, literal_column, inspect,
+                        case, literal, union_all, insert, update, delete, BigInteger, DDL, Sequence, cast)
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY, aggregate_order_by
+from sqlalchemy.orm import relationship, Session
+from sqlalchemy.orm.attributes import flag_dirty
 from app.database import Base
 import enum
 
@@ -11,15 +14,16 @@ class TransactionType(str, enum.Enum):
 user_group_association = Table(
     'user_group_association',
     Base.metadata,
-    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
-    Column('group_id', Integer, ForeignKey('groups.id'), primary_key=True)
+    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    Column('group_id', Integer, ForeignKey('groups.id', ondelete='CASCADE'), primary_key=True)
 )
 
 transaction_group_association = Table(
     'transaction_group_association',
     Base.metadata,
-    Column('transaction_id', Integer, ForeignKey('transactions.id'), primary_key=True),
-    Column('group_id', Integer, ForeignKey('groups.id'), primary_key=True)
+    Column('transaction_id', Integer, primary_key=True),
+    Column('group_id', Integer, ForeignKey('groups.id', ondelete='CASCADE'), primary_key=True),
+    Index('ix_transaction_group_association_group_id', 'group_id', 'transaction_id')
 )
 
 class User(Base):
@@ -30,6 +34,8 @@ class User(Base):
     last_name = Column(String, nullable=False)
     login = Column(String, unique=True, nullable=False, index=True)
     password = Column(String, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+    tombstones_purged_xact_id = Column(BigInteger, nullable=True)
 
     groups = relationship(
         "Group",
@@ -45,27 +51,55 @@ class Group(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    version = Column(BigInteger, nullable=False, server_default=text("1"))
 
     users = relationship(
         "User",
         secondary=user_group_association,
         back_populates="groups",
-        lazy="selectin"
+        lazy="selectin",
+        passive_deletes=True
     )
     owner = relationship("User", back_populates="owned_groups")
     transactions = relationship("Transaction",
                                 secondary=transaction_group_association,
+                                primaryjoin="Group.id == foreign(transaction_group_association.c.group_id)",
+                                secondaryjoin="Transaction.id == foreign(transaction_group_association.c.transaction_id)",
                                 back_populates="groups",
-                                lazy="selectin"
+                                lazy="raise",
+                                passive_deletes=True
                                 )
 
+class Category(Base):
+    __tablename__ = "categories"
+    __table_args__ = (
+        Index("ix_categories_user_id_name", "user_id", "name", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String(50), nullable=False)
+
+transaction_version_seq = Sequence("transaction_version_seq", metadata=Base.metadata)
+CURRENT_XACT_ID = "pg_current_xact_id()::text::bigint"
+
+def current_xact_id():
+    return cast(cast(func.pg_current_xact_id(), String), BigInteger)
+
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_user_id_transaction_datetime", "user_id", "transaction_datetime"),
+        Index("ix_transactions_user_id_category_id", "user_id", "category_id"),
+        Index("ix_transactions_user_id_version", "user_id", "version"),
+        Index("ix_transactions_user_id_xact_id_version", "user_id", "xact_id", "version"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     type = Column(SQLEnum(TransactionType), nullable=False)
-    category = Column(String, nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     amount = Column(Numeric(10, 2), nullable=False)
     transaction_datetime = Column(DateTime(timezone=True), nullable=False,
                                   server_default=text("CURRENT_TIMESTAMP"))
@@ -74,10 +108,522 @@ class Transaction(Base):
     is_recurring = Column(Boolean, nullable=False, default=False)
     recurring_period_days = Column(Integer, nullable=True)
     next_run = Column(DateTime(timezone=True), nullable=True, server_default=text("CURRENT_TIMESTAMP"))
+    updated_at = Column(DateTime(timezone=True), nullable=False,
+                        server_default=text("CURRENT_TIMESTAMP"), onupdate=func.now())
+    version = Column(BigInteger, nullable=False, server_default=transaction_version_seq.next_value(),
+                     onupdate=transaction_version_seq.next_value())
+    xact_id = Column(BigInteger, nullable=False, server_default=text(CURRENT_XACT_ID), onupdate=current_xact_id())
     user = relationship("User", back_populates="transactions")
+    category_ref = relationship("Category", lazy="joined", innerjoin=True)
     groups = relationship("Group",
                           secondary=transaction_group_association,
+                          primaryjoin="Transaction.id == foreign(transaction_group_association.c.transaction_id)",
+                          secondaryjoin="Group.id == foreign(transaction_group_association.c.group_id)",
                           back_populates="transactions",
                           lazy="selectin"
                           )
 
+    @property
+    def category(self) -> str | None:
+        if getattr(self, "_category_name", None) is not None:
+            return self._category_name
+        return self.category_ref.name if self.category_ref else None
+
+    @category.setter
+    def category(self, name: str):
+        self._category_name = name
+        self._category_pending = True
+        flag_dirty(self)
+
+# transactions is partitioned in the migrated schema, so links have no foreign key to it.
+event.listen(Transaction.__table__, "after_create", DDL("""
+    CREATE OR REPLACE FUNCTION delete_transaction_group_links() RETURNS trigger AS $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM transactions WHERE id = OLD.id) THEN
+            DELETE FROM transaction_group_association WHERE transaction_id = OLD.id;
+        END IF;
+        RETURN OLD;
+    END
+    $$ LANGUAGE plpgsql
+"""))
+event.listen(Transaction.__table__, "after_create", DDL(
+    "CREATE TRIGGER transactions_delete_group_links AFTER DELETE ON transactions "
+    "FOR EACH ROW EXECUTE FUNCTION delete_transaction_group_links()"
+))
+event.listen(Transaction.__table__, "before_drop", DDL("DROP FUNCTION IF EXISTS delete_transaction_group_links() CASCADE"))
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_user_id_key", "user_id", "key", unique=True),
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+class TransactionArchive(Base):
+    __tablename__ = "transaction_archives"
+    __table_args__ = (
+        Index("ix_transaction_archives_user_id_max_datetime", "user_id", "max_datetime"),
+        Index("ix_transaction_archives_group_ids", "group_ids", postgresql_using="gin"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    path = Column(String, nullable=False)
+    archived_before = Column(DateTime(timezone=True), nullable=False)
+    min_datetime = Column(DateTime(timezone=True), nullable=False)
+    max_datetime = Column(DateTime(timezone=True), nullable=False)
+    row_count = Column(Integer, nullable=False)
+    group_ids = Column(ARRAY(Integer), nullable=False, server_default=text("'{}'"))
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+
+class Budget(Base):
+    __tablename__ = "budgets"
+    __table_args__ = (
+        Index("ix_budgets_user_id_category_id", "user_id", "category_id", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
+    amount = Column(Numeric(10, 2), nullable=False)
+
+class BudgetUsage(Base):
+    __tablename__ = "budget_usage"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(DateTime(timezone=True), primary_key=True)
+    amount = Column(Numeric(12, 2), nullable=False, server_default=text("0"))
+
+class Balance(Base):
+    __tablename__ = "balances"
+
+    kind = Column(String(10), primary_key=True)
+    owner_id = Column(Integer, primary_key=True)
+    total_income = Column(Numeric(14, 2), nullable=False, server_default=text("0"))
+    total_expense = Column(Numeric(14, 2), nullable=False, server_default=text("0"))
+    transaction_count = Column(Integer, nullable=False, server_default=text("0"))
+
+class DeletionJob(Base):
+    __tablename__ = "deletion_jobs"
+    __table_args__ = (
+        Index("ix_deletion_jobs_active", "id", postgresql_where=text("status IN ('pending', 'running')")),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(20), nullable=False)
+    target_id = Column(Integer, nullable=False)
+    requested_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    status = Column(String(20), nullable=False, server_default=text("'pending'"))
+    deleted_rows = Column(BigInteger, nullable=False, server_default=text("0"))
+    attempts = Column(Integer, nullable=False, server_default=text("0"))
+    run_after = Column(DateTime(timezone=True), nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class TransactionTombstone(Base):
+    __tablename__ = "transaction_tombstones"
+    __table_args__ = (
+        Index("ix_transaction_tombstones_user_id_version", "user_id", "version"),
+        Index("ix_transaction_tombstones_user_id_xact_id_version", "user_id", "xact_id", "version"),
+        Index("ix_transaction_tombstones_deleted_at", "deleted_at"),
+    )
+
+    transaction_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    version = Column(BigInteger, nullable=False, server_default=transaction_version_seq.next_value())
+    xact_id = Column(BigInteger, nullable=False, server_default=text(CURRENT_XACT_ID))
+    deleted_at = Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+
+class TransactionListEntry(Base):
+    __tablename__ = "transaction_list_entries"
+    __table_args__ = (
+        Index("ix_transaction_list_entries_scope", "kind", "owner_id", "transaction_datetime"),
+        Index("ix_transaction_list_entries_transaction_id", "transaction_id"),
+    )
+
+    kind = Column(String(10), primary_key=True)
+    owner_id = Column(Integer, primary_key=True)
+    transaction_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    name = Column(String, nullable=False)
+    type = Column(SQLEnum(TransactionType), nullable=False)
+    category = Column(String(50), nullable=False)
+    amount = Column(Numeric(10, 2), nullable=False)
+    description = Column(String, nullable=True)
+    is_recurring = Column(Boolean, nullable=False)
+    recurring_period_days = Column(Integer, nullable=True)
+    transaction_datetime = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+    version = Column(BigInteger, nullable=False)
+    group_ids = Column(ARRAY(Integer), nullable=False, server_default=text("'{}'"))
+    group_names = Column(ARRAY(String), nullable=False, server_default=text("'{}'"))
+
+    @property
+    def id(self) -> int:
+        return self.transaction_id
+
+    @property
+    def groups(self) -> list[dict]:
+        return [
+            {"id": group_id, "name": group_name, "users": []}
+            for group_id, group_name in zip(self.group_ids, self.group_names)
+        ]
+
+class ChangeEvent(Base):
+    __tablename__ = "change_events"
+    __table_args__ = (
+        Index("ix_change_events_pending", "id", postgresql_where=text("dispatched_at IS NULL")),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    entity = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    action = Column(String(20), nullable=False)
+    user_id = Column(Integer, nullable=True)
+    group_ids = Column(ARRAY(Integer), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+    dispatched_at = Column(DateTime(timezone=True), nullable=True)
+
+GROUP_EVENTS_CHANNEL = "group_events"
+
+event.listen(ChangeEvent.__table__, "after_create", DDL(f"""
+    CREATE OR REPLACE FUNCTION notify_group_events() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{GROUP_EVENTS_CHANNEL}', json_build_object(
+            'id', NEW.id, 'entity', NEW.entity, 'entity_id', NEW.entity_id,
+            'action', NEW.action, 'user_id', NEW.user_id, 'group_ids', NEW.group_ids
+        )::text);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""))
+event.listen(ChangeEvent.__table__, "after_create", DDL("""
+    CREATE TRIGGER change_events_notify_groups
+    AFTER INSERT ON change_events
+    FOR EACH ROW WHEN (cardinality(NEW.group_ids) > 0)
+    EXECUTE FUNCTION notify_group_events()
+"""))
+event.listen(ChangeEvent.__table__, "before_drop", DDL("DROP FUNCTION IF EXISTS notify_group_events() CASCADE"))
+event.listen(ChangeEvent.__table__, "after_create", DDL("""
+    CREATE OR REPLACE FUNCTION bump_group_versions() RETURNS trigger AS $$
+    BEGIN
+        UPDATE groups SET version = groups.version + 1
+        FROM (
+            SELECT id FROM groups
+            WHERE id IN (SELECT unnest(group_ids) FROM inserted_events)
+            ORDER BY id
+            FOR UPDATE
+        ) locked
+        WHERE groups.id = locked.id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""))
+event.listen(ChangeEvent.__table__, "after_create", DDL("""
+    CREATE TRIGGER change_events_bump_group_versions
+    AFTER INSERT ON change_events
+    REFERENCING NEW TABLE AS inserted_events
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_group_versions()
+"""))
+event.listen(ChangeEvent.__table__, "before_drop", DDL("DROP FUNCTION IF EXISTS bump_group_versions() CASCADE"))
+
+def get_category_ids(connection, pairs) -> dict:
+    pairs = list(dict.fromkeys(pairs))
+    if not pairs:
+        return {}
+
+    categories = Category.__table__
+    connection.execute(
+        pg_insert(categories)
+        .values([{"user_id": user_id, "name": name} for user_id, name in pairs])
+        .on_conflict_do_nothing(index_elements=["user_id", "name"])
+    )
+    result = connection.execute(
+        select(categories.c.id, categories.c.user_id, categories.c.name)
+        .where(tuple_(categories.c.user_id, categories.c.name).in_(pairs))
+    )
+    return {(row.user_id, row.name): row.id for row in result}
+
+@event.listens_for(Session, "before_flush")
+def resolve_transaction_categories(session, flush_context, instances):
+    pending = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Transaction) and getattr(obj, "_category_pending", False)
+    ]
+    if not pending:
+        return
+
+    category_ids = get_category_ids(
+        session.connection(),
+        [(obj.user_id, obj._category_name) for obj in pending]
+    )
+    for obj in pending:
+        obj.category_id = category_ids[(obj.user_id, obj._category_name)]
+        obj._category_pending = False
+
+AGGREGATED_COLUMNS = ("amount", "type", "category_id", "transaction_datetime", "user_id", "groups")
+
+def budget_usage_rows(transaction_ids, sign: int = 1, source=None):
+    source = Transaction.__table__ if source is None else source
+    amount = source.c.amount if sign > 0 else -source.c.amount
+    return select(
+        source.c.user_id, source.c.category_id, source.c.transaction_datetime, amount.label("amount")
+    ).where(source.c.id.in_(transaction_ids), source.c.type == TransactionType.expense)
+
+def upsert_budget_usage(rows):
+    rows = rows.subquery("usage_rows")
+    usage = BudgetUsage.__table__
+    month = func.date_trunc(literal_column("'month'"), rows.c.transaction_datetime, literal_column("'UTC'"))
+    statement = pg_insert(usage).from_select(
+        ["user_id", "category_id", "month", "amount"],
+        select(rows.c.user_id, rows.c.category_id, month, func.sum(rows.c.amount))
+        .group_by(rows.c.user_id, rows.c.category_id, month)
+    )
+    return statement.on_conflict_do_update(
+        index_elements=["user_id", "category_id", "month"],
+        set_={"amount": usage.c.amount + statement.excluded.amount}
+    )
+
+def balance_rows(transaction_ids, sign: int = 1, source=None):
+    source = Transaction.__table__ if source is None else source
+    columns = [
+        case((source.c.type == TransactionType.income, source.c.amount), else_=0) * sign,
+        case((source.c.type == TransactionType.expense, source.c.amount), else_=0) * sign,
+        literal(sign),
+    ]
+    links = transaction_group_association
+    return union_all(
+        select(literal("user").label("kind"), source.c.user_id, *columns)
+        .where(source.c.id.in_(transaction_ids)),
+        select(literal("group"), links.c.group_id, *columns)
+        .join(links, links.c.transaction_id == source.c.id)
+        .where(source.c.id.in_(transaction_ids)),
+    )
+
+def upsert_balances(rows):
+    rows = rows.subquery("balance_rows")
+    kind, owner_id, income, expense, count = rows.c
+    balances = Balance.__table__
+    statement = pg_insert(balances).from_select(
+        ["kind", "owner_id", "total_income", "total_expense", "transaction_count"],
+        select(kind, owner_id, func.sum(income), func.sum(expense), func.sum(count))
+        .group_by(kind, owner_id)
+    )
+    return statement.on_conflict_do_update(
+        index_elements=["kind", "owner_id"],
+        set_={
+            "total_income": balances.c.total_income + statement.excluded.total_income,
+            "total_expense": balances.c.total_expense + statement.excluded.total_expense,
+            "transaction_count": balances.c.transaction_count + statement.excluded.transaction_count,
+        }
+    )
+
+def changes_aggregates(obj) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[key].history.has_changes() for key in AGGREGATED_COLUMNS)
+
+def update_aggregates(connection, transaction_ids, sign: int):
+    connection.execute(upsert_budget_usage(budget_usage_rows(transaction_ids, sign)))
+    connection.execute(upsert_balances(balance_rows(transaction_ids, sign)))
+
+@event.listens_for(Session, "before_flush")
+def subtract_transaction_aggregates(session, flush_context, instances):
+    changed = [
+        obj for obj in session.dirty
+        if isinstance(obj, Transaction) and changes_aggregates(obj)
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Transaction)]
+    session.info["aggregates_changed"] = changed
+
+    transaction_ids = [obj.id for obj in changed + deleted]
+    if transaction_ids:
+        update_aggregates(session.connection(), transaction_ids, -1)
+
+@event.listens_for(Session, "after_flush")
+def add_transaction_aggregates(session, flush_context):
+    transaction_ids = [obj.id for obj in session.new if isinstance(obj, Transaction)]
+    transaction_ids += [obj.id for obj in session.info.pop("aggregates_changed", [])]
+    if transaction_ids:
+        update_aggregates(session.connection(), transaction_ids, 1)
+
+def insert_tombstones(transaction_ids):
+    return insert(TransactionTombstone.__table__).from_select(
+        ["transaction_id", "user_id"],
+        select(Transaction.id, Transaction.user_id).where(Transaction.id.in_(transaction_ids))
+    )
+
+@event.listens_for(Session, "before_flush")
+def record_transaction_versions(session, flush_context, instances):
+    for obj in session.dirty:
+        if isinstance(obj, Transaction) and inspect(obj).attrs.groups.history.has_changes():
+            obj.updated_at = func.now()
+
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Transaction)]
+    if deleted:
+        session.connection().execute(insert_tombstones(deleted))
+
+def transaction_event_rows(action: str, transaction_ids, source=None):
+    source = Transaction.__table__ if source is None else source
+    links = transaction_group_association
+    group_ids = (
+        select(func.array_agg(links.c.group_id))
+        .where(links.c.transaction_id == source.c.id)
+        .scalar_subquery()
+    )
+    return select(
+        literal("transaction"), source.c.id, literal(action), source.c.user_id, group_ids
+    ).where(source.c.id.in_(transaction_ids))
+
+def insert_change_events(rows):
+    return insert(ChangeEvent.__table__).from_select(
+        ["entity", "entity_id", "action", "user_id", "group_ids"], rows
+    )
+
+def transaction_group_ids(connection, transaction_ids) -> dict:
+    links = transaction_group_association
+    result = connection.execute(
+        select(links.c.transaction_id, links.c.group_id).where(links.c.transaction_id.in_(transaction_ids))
+    )
+    group_ids = {}
+    for transaction_id, group_id in result.all():
+        group_ids.setdefault(transaction_id, []).append(group_id)
+    return group_ids
+
+@event.listens_for(Session, "before_flush")
+def collect_transaction_events(session, flush_context, instances):
+    updated = [
+        obj for obj in session.dirty
+        if isinstance(obj, Transaction) and session.is_modified(obj)
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Transaction)]
+    session.info["events_updated"] = updated
+
+    transaction_ids = [obj.id for obj in updated + deleted]
+    if transaction_ids:
+        session.info["events_group_ids"] = transaction_group_ids(session.connection(), transaction_ids)
+    if deleted:
+        session.connection().execute(insert_change_events(
+            transaction_event_rows("deleted", [obj.id for obj in deleted])
+        ))
+
+@event.listens_for(Session, "after_flush")
+def write_transaction_events(session, flush_context):
+    created = [obj.id for obj in session.new if isinstance(obj, Transaction)]
+    if created:
+        session.connection().execute(insert_change_events(transaction_event_rows("created", created)))
+
+    updated = session.info.pop("events_updated", [])
+    old_group_ids = session.info.pop("events_group_ids", {})
+    if updated:
+        new_group_ids = transaction_group_ids(session.connection(), [obj.id for obj in updated])
+        session.connection().execute(insert(ChangeEvent.__table__), [
+            {"entity": "transaction", "entity_id": obj.id, "action": "updated", "user_id": obj.user_id,
+             "group_ids": sorted(set(old_group_ids.get(obj.id, []) + new_group_ids.get(obj.id, [])))}
+            for obj in updated
+        ])
+
+TRANSACTION_LIST_COLUMNS = (
+    "transaction_id", "user_id", "name", "type", "category", "amount", "description", "is_recurring",
+    "recurring_period_days", "transaction_datetime", "updated_at", "version", "group_ids", "group_names",
+)
+
+def transaction_list_rows(transaction_ids):
+    source = Transaction.__table__
+    links = transaction_group_association
+    groups = (
+        select(
+            links.c.transaction_id,
+            func.array_agg(aggregate_order_by(links.c.group_id, links.c.group_id)).label("group_ids"),
+            func.array_agg(aggregate_order_by(Group.name, links.c.group_id)).label("group_names"),
+        )
+        .join(Group, Group.id == links.c.group_id)
+        .where(links.c.transaction_id.in_(transaction_ids))
+        .group_by(links.c.transaction_id)
+        .subquery("entry_groups")
+    )
+    transactions = (
+        select(
+            source.c.id.label("transaction_id"), source.c.user_id, source.c.name, source.c.type,
+            Category.name.label("category"), source.c.amount, source.c.description, source.c.is_recurring,
+            source.c.recurring_period_days, source.c.transaction_datetime, source.c.updated_at, source.c.version,
+            func.coalesce(groups.c.group_ids, literal_column("'{}'")).label("group_ids"),
+            func.coalesce(groups.c.group_names, literal_column("'{}'")).label("group_names"),
+        )
+        .join(Category, Category.id == source.c.category_id)
+        .outerjoin(groups, groups.c.transaction_id == source.c.id)
+        .where(source.c.id.in_(transaction_ids))
+        .cte("entry_transactions")
+    )
+    columns = [transactions.c[name] for name in TRANSACTION_LIST_COLUMNS]
+    return union_all(
+        select(literal("user").label("kind"), transactions.c.user_id.label("owner_id"), *columns),
+        select(literal("group"), func.unnest(transactions.c.group_ids), *columns),
+    )
+
+def insert_transaction_list(transaction_ids):
+    return insert(TransactionListEntry.__table__).from_select(
+        ["kind", "owner_id", *TRANSACTION_LIST_COLUMNS], transaction_list_rows(transaction_ids)
+    )
+
+def delete_transaction_list(transaction_ids):
+    entries = TransactionListEntry.__table__
+    return delete(entries).where(entries.c.transaction_id.in_(transaction_ids))
+
+def update_transaction_list(source):
+    entries = TransactionListEntry.__table__
+    return update(entries).where(entries.c.transaction_id == source.c.id).values(
+        name=source.c.name,
+        type=source.c.type,
+        category=select(Category.name).where(Category.id == source.c.category_id).scalar_subquery(),
+        amount=source.c.amount,
+        description=source.c.description,
+        updated_at=source.c.updated_at,
+        version=source.c.version,
+    )
+
+def refresh_transaction_list(connection, transaction_ids):
+    connection.execute(delete_transaction_list(transaction_ids))
+    connection.execute(insert_transaction_list(transaction_ids))
+
+def rename_transaction_list_group(group_id: int, name: str):
+    entries = TransactionListEntry.__table__
+    return update(entries).where(
+        entries.c.transaction_id.in_(
+            select(entries.c.transaction_id).where(entries.c.kind == "group", entries.c.owner_id == group_id)
+        )
+    ).values({entries.c.group_names[func.array_position(entries.c.group_ids, group_id)]: name})
+
+@event.listens_for(Session, "before_flush")
+def collect_transaction_list_changes(session, flush_context, instances):
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Transaction)]
+    if deleted:
+        session.connection().execute(delete_transaction_list(deleted))
+    session.info["list_updated"] = [
+        obj.id for obj in session.dirty
+        if isinstance(obj, Transaction) and session.is_modified(obj)
+    ]
+
+    for obj in session.dirty:
+        if isinstance(obj, Group) and inspect(obj).attrs.name.history.has_changes():
+            session.connection().execute(rename_transaction_list_group(obj.id, obj.name))
+
+@event.listens_for(Session, "after_flush")
+def refresh_transaction_list_entries(session, flush_context):
+    transaction_ids = [obj.id for obj in session.new if isinstance(obj, Transaction)]
+    transaction_ids += session.info.pop("list_updated", [])
+    if transaction_ids:
+        refresh_transaction_list(session.connection(), transaction_ids)
@@ -0,0 +1,106 @@
+from datetime import datetime, timezone
+from sqlalchemy import text, delete, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import (Transaction, transaction_group_association, balance_rows, upsert_balances,
+                        budget_usage_rows, upsert_budget_usage, transaction_event_rows, insert_change_events,
+                        insert_tombstones, delete_transaction_list)
+import os
+import re
+
+PARTITIONED_TABLE = "transactions"
+PARTITIONS_AHEAD = int(os.getenv("TRANSACTION_PARTITIONS_AHEAD", "3"))
+PARTITIONS_RETENTION_MONTHS = os.getenv("TRANSACTION_PARTITIONS_RETENTION_MONTHS")
+
+PARTITION_NAME_RE = re.compile(rf"^{PARTITIONED_TABLE}_(\d{{4}})_(\d{{2}})$")
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+def add_months(value: datetime, months: int) -> datetime:
+    month_index = value.year * 12 + value.month - 1 + months
+    return datetime(month_index // 12, month_index % 12 + 1, 1, tzinfo=timezone.utc)
+
+def partition_name(month: datetime) -> str:
+    return f"{PARTITIONED_TABLE}_{month:%Y_%m}"
+
+def partition_month(name: str) -> datetime | None:
+    match = PARTITION_NAME_RE.match(name)
+    if not match:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+
+async def is_partitioned(db: AsyncSession) -> bool:
+    result = await db.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": PARTITIONED_TABLE}
+    )
+    return bool(result.scalar())
+
+async def get_partitions(db: AsyncSession) -> list[str]:
+    result = await db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table)"
+        ),
+        {"table": PARTITIONED_TABLE}
+    )
+    return sorted(result.scalars().all())
+
+async def create_future_partitions(db: AsyncSession, now: datetime, months_ahead: int = PARTITIONS_AHEAD) -> list[str]:
+    existing = set(await get_partitions(db))
+    created = []
+
+    for offset in range(months_ahead + 1):
+        start = add_months(month_start(now), offset)
+        name = partition_name(start)
+        if name in existing:
+            continue
+
+        try:
+            async with db.begin_nested():
+                await db.execute(text(
+                    f'CREATE TABLE "{name}" PARTITION OF {PARTITIONED_TABLE} '
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+                ))
+        except DBAPIError as e:
+            print(f"Не удалось создать секцию {name}: {e}")
+            continue
+        created.append(name)
+
+    await db.commit()
+    return created
+
+async def retire_partition_rows(db: AsyncSession, month: datetime):
+    selected = (
+        select(Transaction.id)
+        .where(Transaction.transaction_datetime >= month, Transaction.transaction_datetime < add_months(month, 1))
+        .cte("selected")
+    )
+    await db.execute(
+        delete(transaction_group_association)
+        .where(transaction_group_association.c.transaction_id.in_(select(selected.c.id)))
+        .add_cte(upsert_budget_usage(budget_usage_rows(select(selected.c.id), -1)).cte("usage"))
+        .add_cte(upsert_balances(balance_rows(select(selected.c.id), -1)).cte("balances"))
+        .add_cte(insert_change_events(transaction_event_rows("deleted", select(selected.c.id))).cte("events"))
+        .add_cte(insert_tombstones(select(selected.c.id)).cte("tombstones"))
+        .add_cte(delete_transaction_list(select(selected.c.id)).cte("list_entries"))
+    )
+
+async def detach_old_partitions(db: AsyncSession, now: datetime, retention_months: int) -> list[str]:
+    cutoff = add_months(month_start(now), -retention_months)
+    detached = []
+
+    for name in await get_partitions(db):
+        month = partition_month(name)
+        if month is None or month >= cutoff:
+            continue
+
+        await retire_partition_rows(db, month)
+        await db.execute(text(f'ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION "{name}"'))
+        detached.append(name)
+
+    await db.commit()
+    return detached
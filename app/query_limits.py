@@ -0,0 +1,84 @@
+from collections import Counter
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import DBAPIError
+from app.route_classes import route_class, statement_timeout
+from app.database import request_statement_timeout
+import asyncio
+
+QUERY_CANCELED = "57014"
+
+query_metrics = {
+    "statement_timeouts": Counter(),
+    "cancelled_on_disconnect": Counter(),
+}
+
+
+def is_statement_timeout(exc: DBAPIError) -> bool:
+    return getattr(exc.orig, "sqlstate", None) == QUERY_CANCELED
+
+async def statement_timeout_handler(request: Request, exc: DBAPIError):
+    if not is_statement_timeout(exc):
+        raise exc
+
+    name = route_class(request.method, request.url.path) or "other"
+    query_metrics["statement_timeouts"][name] += 1
+    print(f"Превышено время выполнения запроса {request.method} {request.url.path}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Превышено время выполнения запроса, повторите позже"},
+        headers={"Retry-After": "5"},
+    )
+
+def metrics() -> dict:
+    return {name: dict(counter) for name, counter in query_metrics.items()}
+
+def reset_metrics():
+    for counter in query_metrics.values():
+        counter.clear()
+
+
+class CancelOnDisconnectMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_statement_timeout.set(statement_timeout(scope["method"], scope["path"]))
+        messages = asyncio.Queue()
+        response_complete = False
+
+        async def receive_message():
+            return await messages.get()
+
+        async def send_message(message):
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        async def watch_disconnect():
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    return
+
+        handler = asyncio.ensure_future(self.app(scope, receive_message, send_message))
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await asyncio.wait([handler, watcher], return_when=asyncio.FIRST_COMPLETED)
+            if not handler.done() and not response_complete:
+                handler.cancel()
+                await asyncio.wait([handler])
+                name = route_class(scope["method"], scope["path"]) or "other"
+                query_metrics["cancelled_on_disconnect"][name] += 1
+                return
+            await handler
+        finally:
+            watcher.cancel()
+            if not handler.done():
+                handler.cancel()
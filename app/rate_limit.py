@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from app.utils import decode_access_token
+from app.route_classes import route_class
+import math
+import os
+import time
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_MAX_IN_FLIGHT = int(os.getenv("RATE_LIMIT_MAX_IN_FLIGHT", "30"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+
+
+@dataclass
+class RouteLimit:
+    per_minute: float
+    burst: int
+    concurrency: int
+
+    @classmethod
+    def from_env(cls, route_class: str, per_minute: float, burst: int, concurrency: int) -> "RouteLimit":
+        prefix = f"RATE_LIMIT_{route_class.upper()}"
+        return cls(
+            per_minute=float(os.getenv(f"{prefix}_PER_MINUTE", per_minute)),
+            burst=int(os.getenv(f"{prefix}_BURST", burst)),
+            concurrency=int(os.getenv(f"{prefix}_CONCURRENCY", concurrency)),
+        )
+
+
+ROUTE_LIMITS = {
+    "auth": RouteLimit.from_env("auth", 20, 10, 2),
+    "reads": RouteLimit.from_env("reads", 600, 120, 8),
+    "statistics": RouteLimit.from_env("statistics", 60, 20, 2),
+    "writes": RouteLimit.from_env("writes", 600, 120, 4),
+}
+
+
+def is_stream(path: str) -> bool:
+    return path.endswith("/events")
+
+def client_key(scope) -> str:
+    authorization = Headers(scope=scope).get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        token_data = decode_access_token(token)
+        if token_data:
+            return f"user:{token_data['user_id']}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimiter:
+    def __init__(self, limits: dict[str, RouteLimit] = ROUTE_LIMITS, max_in_flight: int = RATE_LIMIT_MAX_IN_FLIGHT,
+                 max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.limits = limits
+        self.max_in_flight = max_in_flight
+        self.max_keys = max_keys
+        self.buckets: OrderedDict[tuple, tuple[float, float]] = OrderedDict()
+        self.active: dict[tuple, int] = {}
+        self.in_flight = 0
+
+    def take_token(self, bucket: tuple, limit: RouteLimit) -> float:
+        now = time.monotonic()
+        rate = limit.per_minute / 60
+        tokens, updated = self.buckets.get(bucket, (limit.burst, now))
+        tokens = min(limit.burst, tokens + (now - updated) * rate)
+
+        if tokens < 1:
+            self.buckets[bucket] = (tokens, now)
+            return (1 - tokens) / rate if rate > 0 else 60.0
+
+        self.buckets[bucket] = (tokens - 1, now)
+        self.buckets.move_to_end(bucket)
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return 0.0
+
+    def acquire(self, bucket: tuple, limit: RouteLimit, stream: bool) -> tuple[int, float] | None:
+        if self.in_flight >= self.max_in_flight:
+            return 503, 1.0
+        if not stream and self.active.get(bucket, 0) >= limit.concurrency:
+            return 429, 1.0
+
+        retry_after = self.take_token(bucket, limit)
+        if retry_after:
+            return 429, retry_after
+
+        if not stream:
+            self.active[bucket] = self.active.get(bucket, 0) + 1
+            self.in_flight += 1
+        return None
+
+    def release(self, bucket: tuple):
+        self.in_flight -= 1
+        if self.active[bucket] <= 1:
+            del self.active[bucket]
+        else:
+            self.active[bucket] -= 1
+
+    def reset(self):
+        self.buckets.clear()
+        self.active.clear()
+        self.in_flight = 0
+
+
+rate_limiter = RateLimiter()
+
+
+def rejection(status_code: int, retry_after: float) -> JSONResponse:
+    detail = "Слишком много запросов, повторите позже" if status_code == 429 else "Сервер перегружен, повторите позже"
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, limiter: RateLimiter = rate_limiter, enabled: bool = RATE_LIMIT_ENABLED):
+        self.app = app
+        self.limiter = limiter
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        name = route_class(scope.get("method", ""), scope.get("path", "")) if scope["type"] == "http" else None
+        if not self.enabled or name is None:
+            await self.app(scope, receive, send)
+            return
+
+        bucket = (name, client_key(scope))
+        stream = is_stream(scope["path"])
+        rejected = self.limiter.acquire(bucket, self.limiter.limits[name], stream)
+        if rejected is not None:
+            await rejection(*rejected)(scope, receive, send)
+            return
+
+        if stream:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release(bucket)
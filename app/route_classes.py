@@ -0,0 +1,25 @@
+import os
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+UNCLASSIFIED_PATHS = {"/health", "/metrics", "/api"}
+
+STATEMENT_TIMEOUTS_MS = {
+    route: int(os.getenv(f"STATEMENT_TIMEOUT_{route.upper()}_MS", default))
+    for route, default in {"auth": 5000, "reads": 5000, "statistics": 15000, "writes": 10000}.items()
+}
+
+
+def route_class(method: str, path: str) -> str | None:
+    if path in UNCLASSIFIED_PATHS or not path.startswith("/api"):
+        return None
+    if path.startswith("/api/auth") and not path.startswith("/api/auth/me"):
+        return "auth"
+    if "/statistics" in path or path.endswith("/settlement"):
+        return "statistics"
+    if method in WRITE_METHODS:
+        return "writes"
+    return "reads"
+
+def statement_timeout(method: str, path: str) -> int | None:
+    name = route_class(method, path)
+    return STATEMENT_TIMEOUTS_MS.get(name) or None if name else None
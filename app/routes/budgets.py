@@ -0,0 +1,142 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+from sqlalchemy.exc import IntegrityError
+from typing import List
+from datetime import datetime, timezone
+from app.database import get_db
+from app.models import User, Budget, BudgetUsage, Category
+from app.schemas import BudgetCreate, BudgetUpdate, BudgetResponse, BudgetStatus
+from app.routes.users import get_current_user
+from app.utils import resolve_category_ids
+from app.archive import as_utc
+from app.partitions import month_start
+
+router = APIRouter(prefix="/api/budgets", tags=["budgets"])
+
+
+def budget_status_query(month: datetime):
+    return (
+        select(Budget.id, Category.name, Budget.amount, BudgetUsage.amount.label("spent"))
+        .join(Category, Category.id == Budget.category_id)
+        .outerjoin(BudgetUsage, and_(
+            BudgetUsage.user_id == Budget.user_id,
+            BudgetUsage.category_id == Budget.category_id,
+            BudgetUsage.month == month
+        ))
+    )
+
+def budget_status(row, month: datetime) -> dict:
+    spent = row.spent or 0
+    return {
+        "id": row.id,
+        "category": row.name,
+        "month": month,
+        "amount": row.amount,
+        "spent": spent,
+        "remaining": row.amount - spent,
+        "exceeded": spent > row.amount,
+    }
+
+async def get_budget_status(db: AsyncSession, user_id: int, category_id: int, when: datetime) -> BudgetStatus | None:
+    month = month_start(as_utc(when))
+    result = await db.execute(
+        budget_status_query(month).where(Budget.user_id == user_id, Budget.category_id == category_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return BudgetStatus(**budget_status(row, month))
+
+async def get_budget_status_response(db: AsyncSession, budget: Budget) -> dict:
+    month = month_start(datetime.now(timezone.utc))
+    result = await db.execute(budget_status_query(month).where(Budget.id == budget.id))
+    return budget_status(result.one(), month)
+
+async def get_user_budget(db: AsyncSession, budget_id: int, user: User) -> Budget:
+    budget = await db.get(Budget, budget_id)
+    if not budget:
+        raise HTTPException(status_code=404, detail="Бюджет не найден")
+
+    if budget.user_id != user.id:
+        raise HTTPException(status_code=403, detail="Недостаточно прав для доступа к бюджету")
+
+    return budget
+
+
+@router.get("", response_model=List[BudgetResponse],
+            summary="Бюджеты пользователя",
+            description="Получить бюджеты пользователя с расходами за текущий месяц")
+async def get_budgets(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    month = month_start(datetime.now(timezone.utc))
+    result = await db.execute(
+        budget_status_query(month).where(Budget.user_id == current_user.id).order_by(Category.name)
+    )
+    return [budget_status(row, month) for row in result.all()]
+
+
+@router.post("", response_model=BudgetResponse, status_code=status.HTTP_201_CREATED,
+             summary="Создание бюджета",
+             description="Установить месячный лимит расходов по категории")
+async def create_budget(
+    budget_data: BudgetCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    category_ids = await resolve_category_ids(db, current_user.id, [budget_data.category])
+    budget = Budget(
+        user_id=current_user.id,
+        category_id=category_ids[budget_data.category],
+        amount=budget_data.amount
+    )
+    db.add(budget)
+
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Бюджет для этой категории уже существует"
+        )
+
+    return await get_budget_status_response(db, budget)
+
+
+@router.put("/{budget_id}", response_model=BudgetResponse,
+            summary="Изменение бюджета",
+            description="Изменить месячный лимит расходов по категории")
+async def update_budget(
+    budget_id: int,
+    budget_data: BudgetUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    budget = await get_user_budget(db, budget_id, current_user)
+    budget.amount = budget_data.amount
+    await db.commit()
+
+    return await get_budget_status_response(db, budget)
+
+
+@router.delete("/{budget_id}", response_class=JSONResponse,
+               summary="Удаление бюджета",
+               description="Удалить бюджет категории")
+async def delete_budget(
+    budget_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    budget = await get_user_budget(db, budget_id, current_user)
+    await db.delete(budget)
+    await db.commit()
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"message": f"Бюджет с id {budget_id} успешно удален"},
+    )
+
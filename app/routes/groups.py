@@ -1,18 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, delete, exists
 from sqlalchemy.orm import selectinload
-from typing import List
+from typing import List, Literal, Optional
+import asyncpg
 from app.database import get_db
-from app.models import User, Group, Transaction, user_group_association
+from app.models import User, Group, Transaction, ChangeEvent, DeletionJob, user_group_association
 from app.schemas import GroupCreate, GroupUpdate, GroupResponse, UserResponse, TransactionFilters, get_transaction_filters, PeriodForGroupBy
 from app.routes.users import get_current_user
 from app.utils import apply_filters
+from app.archive import load_archived_transactions, archived_statistics, archived_member_rows, merge_grouped
+from app.analytics import analytics_cache
+from app.balances import get_balance
+from app.settlement import settlement_cache
+from app.deletions import is_large_group, delete_group_rows
+from app.group_events import group_event_hub, get_missed_events
+from app.statistics import (distribution_query, distribution_result, ROLLING_WINDOW_DAYS,
+                            comparison_windows, comparison_query, compare_statistics,
+                            member_statistics_query, member_statistics_rows, totals_from_member_rows,
+                            member_statistics)
 
 router = APIRouter(prefix="/api/groups", tags=["groups"])
 
 
+def group_event(group_id: int, action: str, user_id: int) -> ChangeEvent:
+    return ChangeEvent(entity="group", entity_id=group_id, action=action, user_id=user_id, group_ids=[group_id])
+
+
 @router.get("", response_model=List[GroupResponse])
 async def get_groups(
     current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
@@ -37,6 +52,8 @@ async def create_group(
     new_group.users.append(current_user)
 
     db.add(new_group)
+    await db.flush()
+    db.add(group_event(new_group.id, "created", current_user.id))
     await db.commit()
     await db.refresh(new_group)
 
@@ -65,6 +82,7 @@ async def update_group(
         )
 
     group.name = group_data.name
+    db.add(group_event(group.id, "updated", current_user.id))
     await db.commit()
     await db.refresh(group)
 
@@ -77,10 +95,7 @@ async def delete_group(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Group).options(selectinload(Group.users)).where(Group.id == group_id)
-    )
-    group = result.scalars().first()
+    group = await db.get(Group, group_id)
     if not group:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Группа не найдена"
@@ -91,8 +106,29 @@ async def delete_group(
             detail="Недостаточно прав для удаления этой группы",
         )
 
-    await db.delete(group)
+    if await is_large_group(db, group_id):
+        job = DeletionJob(kind="group", target_id=group_id, requested_by=current_user.id)
+        db.add(job)
+        group.users.clear()
+        db.add(group_event(group_id, "deleted", current_user.id))
+        await db.commit()
+        analytics_cache.invalidate(("group", group_id))
+
+        status_url = f"/api/groups/deletions/{job.id}"
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "message": f"Удаление группы с id {group_id} запущено",
+                "job_id": job.id,
+                "status_url": status_url,
+            },
+            headers={"Location": status_url},
+        )
+
+    await delete_group_rows(db, group_id)
+    db.add(group_event(group_id, "deleted", current_user.id))
     await db.commit()
+    analytics_cache.invalidate(("group", group_id))
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
@@ -100,6 +136,32 @@ async def delete_group(
     )
 
 
+@router.get("/deletions/{job_id}")
+async def get_group_deletion(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    job = await db.get(DeletionJob, job_id)
+    if not job or job.kind != "group":
+        raise HTTPException(status_code=404, detail="Задача удаления не найдена")
+
+    if job.requested_by != current_user.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Недостаточно прав для просмотра задачи удаления"
+        )
+
+    return {
+        "job_id": job.id,
+        "group_id": job.target_id,
+        "status": job.status,
+        "deleted_links": job.deleted_rows,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+
 @router.get("/{group_id}", response_model=GroupResponse)
 async def get_group(
     group_id: int,
@@ -134,7 +196,7 @@ async def add_user_to_group(
     if not group:
         raise HTTPException(status_code=404, detail="Группа не найдена")
     user = await db.get(User, user_id)
-    if not user:
+    if not user or user.deleted_at:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
 
     if current_user not in group.users:
@@ -144,6 +206,7 @@ async def add_user_to_group(
 
     if user not in group.users:
         group.users.append(user)
+        db.add(group_event(group.id, "member_added", user.id))
         await db.commit()
 
     return {
@@ -172,6 +235,7 @@ async def remove_user_from_group(
 
     if user in group.users:
         group.users.remove(user)
+        db.add(group_event(group.id, "member_removed", user.id))
         await db.commit()
         return {
             "message": f"Пользователь с id {user_id} успешно удален из группы с id {group_id}"
@@ -199,14 +263,95 @@ async def get_group_users(
     return group.users
 
 
+@router.get("/{group_id}/balance")
+async def get_group_balance(
+    group_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    group = await db.get(Group, group_id)
+    if not group:
+        raise HTTPException(status_code=404, detail="Группа не найдена")
+
+    if current_user not in group.users:
+        raise HTTPException(
+            status_code=403,
+            detail="Недостаточно прав для просмотра баланса группы"
+        )
+
+    return await get_balance(db, "group", group_id)
+
+
+@router.get("/{group_id}/settlement")
+async def get_group_settlement(
+    group_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    version = await db.scalar(select(Group.version).where(Group.id == group_id))
+    if version is None:
+        raise HTTPException(status_code=404, detail="Группа не найдена")
+
+    is_member = await db.scalar(select(exists().where(
+        user_group_association.c.group_id == group_id,
+        user_group_association.c.user_id == current_user.id
+    )))
+    if not is_member:
+        raise HTTPException(
+            status_code=403,
+            detail="Недостаточно прав для просмотра взаиморасчетов группы"
+        )
+
+    return await settlement_cache.settlement(db, group_id, version)
+
+
+@router.get("/{group_id}/events")
+async def get_group_events(
+    group_id: int,
+    request: Request,
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID", ge=0),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    group = await db.get(Group, group_id)
+    if not group:
+        raise HTTPException(status_code=404, detail="Группа не найдена")
+
+    if current_user not in group.users:
+        raise HTTPException(
+            status_code=403,
+            detail="Недостаточно прав для просмотра событий группы"
+        )
+
+    try:
+        queue = await group_event_hub.subscribe(group_id)
+    except (OSError, asyncpg.PostgresError):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Поток событий временно недоступен"
+        )
+
+    missed = await get_missed_events(db, group_id, last_event_id) if last_event_id is not None else []
+    await db.close()
+
+    return StreamingResponse(
+        group_event_hub.stream(request, group_id, queue, missed),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{group_id}/statistics")
 async def get_group_statistics(
     group_id: int,
     period: PeriodForGroupBy = "month",
+    compare: Optional[Literal["previous", "year_ago"]] = Query(None, description="Сравнение с предыдущим периодом или годом ранее"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     filters: TransactionFilters = Depends(get_transaction_filters),
 ):
+    windows = comparison_windows(filters, compare) if compare else None
+
     target_group = await db.execute(
         select(Group).where(Group.id == group_id)
         )
@@ -231,48 +376,41 @@ async def get_group_statistics(
     )
     total_members = count_members_stats.scalar() or 0
 
-    income_query = select(func.sum(Transaction.amount)).join(Transaction.groups).where(Group.id == group_id, 
-        Transaction.type == "income")
-    income_query = apply_filters(income_query, filters)
-    income_stats = await db.execute(income_query)
-    total_income = income_stats.scalar() or 0
-
-    expense_query = select(func.sum(Transaction.amount)).join(Transaction.groups).where(Group.id == group_id, 
-        Transaction.type == "expense")
-    expense_query = apply_filters(expense_query, filters)
-    expense_stats = await db.execute(expense_query)
-    total_expense = expense_stats.scalar() or 0
-
+    stats = await analytics_cache.statistics(db, ("group", group_id), filters, period, by_member=True)
+    if stats is None:
+        query = member_statistics_query(period).join(Transaction.groups).where(Group.id == group_id)
+        query = apply_filters(query, filters)
+        result = await db.execute(query)
+        member_category_rows, member_period_rows = member_statistics_rows(result.all())
+        stats = totals_from_member_rows(member_category_rows, member_period_rows)
+    else:
+        member_category_rows, member_period_rows = stats["member_category_rows"], stats["member_period_rows"]
+
+    total_income = stats["total_income"]
+    total_expense = stats["total_expense"]
     balance = total_income - total_expense
+    total_count = stats["total_count"]
+    grouped_by_category_expense = stats["grouped_by_category_expense"]
+    grouped_by_period_expense = stats["grouped_by_period_expense"]
+
+    archived = await load_archived_transactions(db, [user.id for user in group.users], filters, group_id)
+    if archived is not None:
+        archived_stats = archived_statistics(archived, period)
+        total_income += archived_stats["total_income"]
+        total_expense += archived_stats["total_expense"]
+        total_count += archived_stats["total_count"]
+        balance = total_income - total_expense
+        grouped_by_category_expense = merge_grouped(
+            grouped_by_category_expense, "category", archived_stats["by_category"]
+        )
+        grouped_by_period_expense = merge_grouped(
+            grouped_by_period_expense, "period", archived_stats["by_period"]
+        )
+        archived_category_rows, archived_period_rows = archived_member_rows(archived, period)
+        member_category_rows = member_category_rows + archived_category_rows
+        member_period_rows = member_period_rows + archived_period_rows
 
-    count_query = select(func.count(Transaction.id)).join(Transaction.groups).where(Group.id == group_id)
-    count_query = apply_filters(count_query, filters)
-    count_stats = await db.execute(count_query)
-    total_count = count_stats.scalar() or 0
-
-    grouped_by_category_query = select(Transaction.category,
-        func.sum(Transaction.amount).label("amount")).join(Transaction.groups).where(Group.id == group_id,
-        Transaction.type == "expense")
-    grouped_by_category_query = apply_filters(grouped_by_category_query, filters)
-    grouped_by_category_query = grouped_by_category_query.group_by(Transaction.category)
-    grouped_by_category_stats = await db.execute(grouped_by_category_query)
-    grouped_by_category_expense = [
-        {"category": row.category, "amount": float(row.amount)}
-        for row in grouped_by_category_stats.all()
-    ]
-
-    period_truncated = func.date_trunc(period, Transaction.transaction_datetime).label("period")
-    grouped_by_period_query = select(period_truncated, func.sum(Transaction.amount).label("amount")).join(Transaction.groups).where(Group.id == group_id,
-        Transaction.type == "expense")
-    grouped_by_period_query = apply_filters(grouped_by_period_query, filters)
-    grouped_by_period_query = grouped_by_period_query.group_by(period_truncated)
-    grouped_by_period_stats = await db.execute(grouped_by_period_query)
-    grouped_by_period_expense = [
-        {"period": row.period.isoformat() if row.period else None, "amount": float(row.amount)}
-        for row in grouped_by_period_stats.all()
-    ]
-
-    return {
+    response = {
         "group_id": group_id,
         "name": group_name,
         "total_members": total_members,
@@ -281,6 +419,43 @@ async def get_group_statistics(
         "total_expense": total_expense,
         "total_transactions": total_count,
         "grouped_by_category_expense": grouped_by_category_expense,
-        "grouped_by_period_expense": grouped_by_period_expense
+        "grouped_by_period_expense": grouped_by_period_expense,
+        "by_member": member_statistics(member_category_rows, member_period_rows, group.users),
     }
 
+    if compare:
+        query = comparison_query(windows).join(Transaction.groups).where(Group.id == group_id)
+        response["comparison"] = await compare_statistics(
+            db, query, compare, windows, filters, [user.id for user in group.users], group_id
+        )
+
+    return response
+
+
+@router.get("/{group_id}/statistics/distribution")
+async def get_group_statistics_distribution(
+    group_id: int,
+    period: Literal["year", "month", "day"] = "month",
+    window_days: int = Query(ROLLING_WINDOW_DAYS, ge=1, le=366, description="Размер скользящего окна в днях"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    filters: TransactionFilters = Depends(get_transaction_filters),
+):
+    group = await db.get(Group, group_id)
+    if not group:
+        raise HTTPException(status_code=404, detail="Группа не найдена")
+
+    if current_user not in group.users:
+        raise HTTPException(
+            status_code=403,
+            detail="Недостаточно прав для просмотра статистики группы"
+        )
+
+    query = distribution_query(period, window_days).join(Transaction.groups).where(Group.id == group_id)
+    query = apply_filters(query, filters)
+    result = await db.execute(query)
+
+    return {
+        "group_id": group_id,
+        **distribution_result(result.all(), window_days)
+    }
@@ -1,14 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, insert, update, delete, and_, union_all, tuple_
+from typing import List, Optional
 from datetime import datetime, timedelta
-from app.utils import pagination_params, apply_filters
+from app.utils import (pagination_params, apply_filters, apply_list_filters, paginate, resolve_category_ids,
+                       stream_json_list)
 from app.database import get_db
-from app.models import User, Group, Transaction
+from app.models import (User, Group, Transaction, user_group_association,
+                        transaction_group_association, budget_usage_rows, upsert_budget_usage,
+                        balance_rows, upsert_balances, transaction_event_rows, insert_change_events,
+                        insert_tombstones, TransactionTombstone, TransactionListEntry, insert_transaction_list,
+                        delete_transaction_list, update_transaction_list)
 from app.schemas import (TransactionCreate, TransactionUpdate, TransactionResponse, Page,
-                         TransactionFilters, get_transaction_filters)
+                         TransactionFilters, get_transaction_filters, TransactionBatchCreate,
+                         TransactionBulkUpdate, TransactionCreateResponse, TransactionChanges)
 from app.routes.users import get_current_user
+from app.routes.budgets import get_budget_status
+from app.archive import merge_archived_page
+from app.analytics import analytics_cache
+from app.idempotency import idempotency_key_header, request_fingerprint, get_stored_response, commit_with_key
+from app.sync import parse_sync_token, sync_token, check_sync_token, finished_xact_horizon
 
 router = APIRouter(prefix="/api/transactions", tags=["transactions"])
 
@@ -22,29 +34,19 @@ async def get_transactions_by_user(
     db: AsyncSession = Depends(get_db)
 ):
 
-    page = pagination["page"]
-    size = pagination["size"]
-    skip = (page - 1) * size
+    scope = (TransactionListEntry.kind == "user", TransactionListEntry.owner_id == current_user.id)
+    query = select(TransactionListEntry).where(*scope)
+    query = apply_list_filters(query, filters)
+    query = query.order_by(TransactionListEntry.transaction_datetime.desc())
 
-    query = select(Transaction).where(Transaction.user_id == current_user.id)
-    query = apply_filters(query, filters)
-    query = query.order_by(Transaction.transaction_datetime.desc()).offset(skip).limit(size)
+    count_query = select(func.count()).select_from(TransactionListEntry).where(*scope)
+    count_query = apply_list_filters(count_query, filters)
 
-    result = await db.execute(query)
-    transactions = result.scalars().all()
+    page = await paginate(db, query, count_query, pagination)
 
-    count_query = select(func.count(Transaction.id)).where(Transaction.user_id == current_user.id)
-    count_query = apply_filters(count_query, filters)
-    count_result = await db.execute(count_query)
-    total = count_result.scalar() or 0
-
-    return Page(
-        items=transactions,
-        total=total,
-        page=page,
-        size=size,
-        pages=(total + size - 1) // size if total > 0 else 0,
-    )
+    page = await merge_archived_page(db, page, query, count_query, pagination, [current_user.id], filters)
+
+    return Page(**page)
 
 @router.get("/upcoming",
             summary="Предстоящие регулярные платежи",
@@ -117,30 +119,85 @@ async def get_transactions_by_group(
             detail="Недостаточно прав для просмотра этой группы"
         )
 
-    page = pagination["page"]
-    size = pagination["size"]
-    skip = (page - 1) * size
+    scope = (TransactionListEntry.kind == "group", TransactionListEntry.owner_id == group_id)
+    query = select(TransactionListEntry).where(*scope)
+    query = apply_list_filters(query, filters)
+    query = query.order_by(TransactionListEntry.transaction_datetime.desc())
 
-    query = select(Transaction).join(Transaction.groups).where(Group.id == group_id)
-    query = apply_filters(query, filters)
-    query = query.order_by(Transaction.transaction_datetime.desc()).offset(skip).limit(size)
+    count_query = select(func.count()).select_from(TransactionListEntry).where(*scope)
+    count_query = apply_list_filters(count_query, filters)
 
-    result = await db.execute(query)
-    transactions = result.scalars().all()
+    page = await paginate(db, query, count_query, pagination)
+
+    page = await merge_archived_page(
+        db, page, query, count_query, pagination, [user.id for user in group.users], filters, group_id
+    )
+
+    return Page(**page)
+
+
+@router.get("/changes", response_model=TransactionChanges,
+            summary="Изменения транзакций",
+            description="Получить транзакции, созданные, измененные или удаленные после токена since")
+async def get_transaction_changes(
+        since: str = Query("0", description="Токен из next_token предыдущего запроса, 0 для полной выгрузки"),
+        limit: int = Query(500, ge=1, le=1000, description="Максимум изменений в ответе"),
+        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+
+    position = parse_sync_token(since)
+    check_sync_token(current_user, position)
+    horizon = await finished_xact_horizon(db)
+
+    result = await db.execute(
+        select(Transaction)
+        .where(
+            Transaction.user_id == current_user.id,
+            tuple_(Transaction.xact_id, Transaction.version) > position,
+            Transaction.xact_id < horizon
+        )
+        .order_by(Transaction.xact_id, Transaction.version)
+        .limit(limit + 1)
+    )
+    changes = [((transaction.xact_id, transaction.version), transaction) for transaction in result.scalars().all()]
 
-    count_query = select(func.count(Transaction.id)
-                         ).join(Transaction.groups).where(Group.id == group_id)
-    count_query = apply_filters(count_query, filters)
-    count_result = await db.execute(count_query)
-    total = count_result.scalar() or 0
-
-    return Page(
-        items=transactions,
-        total=total,
-        page=page,
-        size=size,
-        pages=(total + size - 1) // size if total > 0 else 0,
+    result = await db.execute(
+        select(TransactionTombstone.xact_id, TransactionTombstone.version, TransactionTombstone.transaction_id)
+        .where(
+            TransactionTombstone.user_id == current_user.id,
+            tuple_(TransactionTombstone.xact_id, TransactionTombstone.version) > position,
+            TransactionTombstone.xact_id < horizon
+        )
+        .order_by(TransactionTombstone.xact_id, TransactionTombstone.version)
+        .limit(limit + 1)
     )
+    deleted = [((xact_id, version), transaction_id) for xact_id, version, transaction_id in result.all()]
+
+    merged = sorted(changes + deleted, key=lambda item: item[0])
+    page = merged[:limit]
+
+    return {
+        "changes": [item for _, item in page if isinstance(item, Transaction)],
+        "deleted": [item for _, item in page if not isinstance(item, Transaction)],
+        "next_token": sync_token(*page[-1][0]) if page else since,
+        "has_more": len(merged) > limit,
+    }
+
+
+@router.get("/recurring", response_model=list[TransactionResponse],
+            summary="Просмотр регулярных транзакций",
+            description="Получить список регулярных транзакций"
+            )
+async def get_recurring_transactions(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = select(Transaction).where(
+        Transaction.user_id == current_user.id,
+        Transaction.is_recurring == True
+    ).order_by(Transaction.id)
+    return StreamingResponse(stream_json_list(db, query, TransactionResponse), media_type="application/json")
 
 
 @router.get("/{transaction_id}", response_model=TransactionResponse,
@@ -169,31 +226,22 @@ async def get_transaction(
     return transaction
 
 
-@router.get("/recurring", response_model=list[TransactionResponse],
-            summary="Просмотр регулярных транзакций",
-            description="Получить список регулярных транзакций"
-            )
-async def get_recurring_transactions(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    query = select(Transaction).where(
-        Transaction.user_id == current_user.id,
-        Transaction.is_recurring == True
-    )
-    result = await db.execute(query)
-    return result.scalars().all()
-
-
-@router.post("", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED,
+@router.post("", response_model=TransactionCreateResponse, status_code=status.HTTP_201_CREATED,
              summary="Создание новой транзакции",
              description="Записать транзакцию в БД")
 async def create_transaction(
         transaction_data: TransactionCreate,
+        idempotency_key: Optional[str] = Depends(idempotency_key_header),
         current_user: User = Depends(get_current_user),
         db: AsyncSession = Depends(get_db)
 ):
 
+    if idempotency_key:
+        fingerprint = request_fingerprint(transaction_data)
+        stored_response = await get_stored_response(db, current_user.id, idempotency_key, fingerprint)
+        if stored_response:
+            return stored_response
+
     groups = []
 
     if transaction_data.group_ids:
@@ -228,10 +276,246 @@ async def create_transaction(
     )
 
     db.add(new_transaction)
-    await db.commit()
+    await db.flush()
     await db.refresh(new_transaction)
 
-    return new_transaction
+    budget = await get_budget_status(
+        db, current_user.id, new_transaction.category_id, new_transaction.transaction_datetime
+    )
+    response = TransactionCreateResponse.model_validate(new_transaction).model_copy(update={"budget": budget})
+
+    if idempotency_key:
+        content = response.model_dump(mode="json")
+        stored_response = await commit_with_key(
+            db, current_user.id, idempotency_key, fingerprint, status.HTTP_201_CREATED, content
+        )
+        if stored_response:
+            return stored_response
+        analytics_cache.transaction_created(new_transaction)
+        return response
+
+    await db.commit()
+    analytics_cache.transaction_created(new_transaction)
+
+    return response
+
+
+@router.post("/batch", response_model=list[TransactionResponse], status_code=status.HTTP_201_CREATED,
+             summary="Пакетное создание транзакций",
+             description="Записать несколько транзакций в БД одной операцией")
+async def create_transactions_batch(
+        batch_data: TransactionBatchCreate,
+        idempotency_key: Optional[str] = Depends(idempotency_key_header),
+        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+
+    if idempotency_key:
+        fingerprint = request_fingerprint(batch_data)
+        stored_response = await get_stored_response(db, current_user.id, idempotency_key, fingerprint)
+        if stored_response:
+            return stored_response
+
+    for index, item in enumerate(batch_data.items):
+        if item.is_recurring and not item.recurring_period_days:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Для регулярной транзакции {index} необходимо указать recurring_period_days"
+            )
+
+    requested_group_ids = {group_id for item in batch_data.items for group_id in item.group_ids}
+    existing_group_ids = set()
+
+    if requested_group_ids:
+        groups_result = await db.execute(
+            select(Group.id, user_group_association.c.user_id)
+            .outerjoin(user_group_association, and_(
+                user_group_association.c.group_id == Group.id,
+                user_group_association.c.user_id == current_user.id
+            ))
+            .where(Group.id.in_(requested_group_ids))
+        )
+
+        for group_id, member_id in groups_result.all():
+            if member_id is None:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"Недостаточно прав для добавления транзакции в группу {group_id}"
+                )
+            existing_group_ids.add(group_id)
+
+    category_ids = await resolve_category_ids(
+        db, current_user.id, {item.category for item in batch_data.items}
+    )
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            **item.model_dump(exclude={"group_ids", "category"}),
+            "category_id": category_ids[item.category],
+            "user_id": current_user.id,
+            "next_run": now + timedelta(days=item.recurring_period_days) if item.is_recurring else None,
+        }
+        for item in batch_data.items
+    ]
+
+    insert_result = await db.execute(
+        insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+        rows
+    )
+    transaction_ids = insert_result.scalars().all()
+
+    links = [
+        {"transaction_id": transaction_id, "group_id": group_id}
+        for transaction_id, item in zip(transaction_ids, batch_data.items)
+        for group_id in dict.fromkeys(item.group_ids)
+        if group_id in existing_group_ids
+    ]
+    if links:
+        await db.execute(insert(transaction_group_association), links)
+    await db.execute(insert_transaction_list(transaction_ids))
+    await db.execute(upsert_budget_usage(budget_usage_rows(transaction_ids)))
+    await db.execute(upsert_balances(balance_rows(transaction_ids)))
+    await db.execute(insert_change_events(transaction_event_rows("created", transaction_ids)))
+
+    scopes = [("user", current_user.id), *[("group", group_id) for group_id in existing_group_ids]]
+    if not idempotency_key:
+        await db.commit()
+        analytics_cache.invalidate(*scopes)
+
+    result = await db.execute(select(Transaction).where(Transaction.id.in_(transaction_ids)))
+    transactions_by_id = {transaction.id: transaction for transaction in result.scalars().all()}
+    transactions = [transactions_by_id[transaction_id] for transaction_id in transaction_ids]
+
+    if idempotency_key:
+        content = [
+            TransactionResponse.model_validate(transaction).model_dump(mode="json")
+            for transaction in transactions
+        ]
+        stored_response = await commit_with_key(
+            db, current_user.id, idempotency_key, fingerprint, status.HTTP_201_CREATED, content
+        )
+        if stored_response:
+            return stored_response
+        analytics_cache.invalidate(*scopes)
+
+    return transactions
+
+
+def bulk_conditions(
+        statement,
+        user_id: int,
+        filters: TransactionFilters,
+        ids: Optional[List[int]]
+):
+    if not ids and not filters.model_dump(exclude_none=True):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Необходимо указать фильтры или список ids"
+        )
+
+    statement = statement.where(Transaction.user_id == user_id)
+    if ids:
+        statement = statement.where(Transaction.id.in_(ids))
+
+    return apply_filters(statement, filters)
+
+
+@router.patch("/bulk",
+              summary="Массовое обновление транзакций",
+              description="Изменить все транзакции пользователя, подходящие под фильтры или список ids")
+async def bulk_update_transactions(
+        update_data: TransactionBulkUpdate,
+        ids: Optional[List[int]] = Query(None, description="Список ID транзакций"),
+        filters: TransactionFilters = Depends(get_transaction_filters),
+        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+
+    values = update_data.model_dump(exclude_unset=True)
+    if not values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Не указаны поля для обновления"
+        )
+
+    if "category" in values:
+        category = values.pop("category")
+        category_ids = await resolve_category_ids(db, current_user.id, [category])
+        values["category_id"] = category_ids[category]
+
+    statement = bulk_conditions(update(Transaction), current_user.id, filters, ids)
+    updated = (
+        statement.values(**values)
+        .returning(Transaction.id, Transaction.user_id, Transaction.category_id, Transaction.type,
+                   Transaction.amount, Transaction.transaction_datetime, Transaction.name,
+                   Transaction.description, Transaction.updated_at, Transaction.version)
+        .cte("updated")
+    )
+    updated_ids = select(updated.c.id)
+    usage_rows = union_all(
+        budget_usage_rows(updated_ids, -1),
+        budget_usage_rows(updated_ids, source=updated)
+    )
+    balance_changes = union_all(
+        balance_rows(updated_ids, -1),
+        balance_rows(updated_ids, source=updated)
+    )
+    result = await db.execute(
+        select(func.count())
+        .select_from(updated)
+        .add_cte(upsert_budget_usage(usage_rows).cte("usage"))
+        .add_cte(upsert_balances(balance_changes).cte("balances"))
+        .add_cte(insert_change_events(transaction_event_rows("updated", updated_ids, source=updated)).cte("events"))
+        .add_cte(update_transaction_list(updated).cte("list_entries"))
+    )
+    affected = result.scalar()
+    await db.commit()
+    analytics_cache.invalidate(("user", current_user.id))
+    analytics_cache.invalidate_groups()
+
+    return {
+        "message": f"Обновлено транзакций: {affected}",
+        "affected": affected
+    }
+
+
+@router.delete("/bulk",
+               summary="Массовое удаление транзакций",
+               description="Удалить все транзакции пользователя, подходящие под фильтры или список ids")
+async def bulk_delete_transactions(
+        ids: Optional[List[int]] = Query(None, description="Список ID транзакций"),
+        filters: TransactionFilters = Depends(get_transaction_filters),
+        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+
+    selected = bulk_conditions(select(Transaction.id), current_user.id, filters, ids).cte("selected")
+    deleted_links = (
+        delete(transaction_group_association)
+        .where(transaction_group_association.c.transaction_id.in_(select(selected.c.id)))
+        .returning(transaction_group_association.c.transaction_id)
+        .cte("deleted_links")
+    )
+    result = await db.execute(
+        delete(Transaction)
+        .where(Transaction.id.in_(select(selected.c.id)))
+        .add_cte(deleted_links)
+        .add_cte(upsert_budget_usage(budget_usage_rows(select(selected.c.id), -1)).cte("usage"))
+        .add_cte(upsert_balances(balance_rows(select(selected.c.id), -1)).cte("balances"))
+        .add_cte(insert_change_events(transaction_event_rows("deleted", select(selected.c.id))).cte("events"))
+        .add_cte(insert_tombstones(select(selected.c.id)).cte("tombstones"))
+        .add_cte(delete_transaction_list(select(selected.c.id)).cte("list_entries"))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    analytics_cache.invalidate(("user", current_user.id))
+    analytics_cache.invalidate_groups()
+
+    return {
+        "message": f"Удалено транзакций: {result.rowcount}",
+        "affected": result.rowcount
+    }
 
 
 @router.put("/{transaction_id}", response_model=TransactionResponse,
@@ -256,6 +540,7 @@ async def update_transaction(
             detail="Транзакция не найдена"
         )
 
+    old_group_ids = [group.id for group in transaction.groups]
     update_data = transaction_data.model_dump(exclude_unset=True)
 
     if 'group_ids' in update_data:
@@ -298,6 +583,7 @@ async def update_transaction(
 
     await db.commit()
     await db.refresh(transaction)
+    analytics_cache.transaction_updated(transaction, old_group_ids)
 
     return transaction
 
@@ -324,8 +610,10 @@ async def delete_transaction(
             detail="Транзакция не найдена"
         )
 
+    group_ids = [group.id for group in transaction.groups]
     await db.delete(transaction)
     await db.commit()
+    analytics_cache.transaction_deleted(transaction_id, current_user.id, group_ids)
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import Optional
+from sqlalchemy import select, func, delete
+from datetime import datetime, timezone
+from typing import Optional, Literal
 from app.database import get_db
-from app.models import User, Transaction
+from app.models import User, Transaction, Category, ChangeEvent, DeletionJob, user_group_association
 from app.schemas import UserCreate, UserResponse, UserLogin, Token, ChangePassword, TransactionFilters, get_transaction_filters, PeriodForGroupBy
 from app.utils import hash_password, verify_password, create_access_token, decode_access_token, apply_filters
+from app.archive import load_archived_transactions, archived_statistics, merge_grouped
+from app.analytics import analytics_cache
+from app.balances import get_balance
+from app.statistics import (distribution_query, distribution_result, ROLLING_WINDOW_DAYS,
+                            comparison_windows, comparison_query, compare_statistics)
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 security = HTTPBearer()
@@ -36,7 +42,7 @@ async def get_current_user(
     result = await db.execute(select(User).where(User.id == token_data["user_id"]))
     user = result.scalars().first()
     
-    if not user:
+    if not user or user.deleted_at:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Пользователь не найден"
@@ -74,7 +80,7 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.login == credentials.login))
     user = result.scalars().first()
     
-    if not user or not verify_password(credentials.password, user.password):
+    if not user or user.deleted_at or not verify_password(credentials.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неправильный логин или пароль"
@@ -121,55 +127,111 @@ async def refresh_token(
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     return current_user
 
+@router.delete("/me", status_code=status.HTTP_202_ACCEPTED)
+async def delete_current_user(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    current_user.deleted_at = datetime.now(timezone.utc)
+    result = await db.execute(
+        delete(user_group_association)
+        .where(user_group_association.c.user_id == current_user.id)
+        .returning(user_group_association.c.group_id)
+    )
+    for group_id in result.scalars().all():
+        db.add(ChangeEvent(entity="group", entity_id=group_id, action="member_removed",
+                           user_id=current_user.id, group_ids=[group_id]))
+    db.add(DeletionJob(kind="user", target_id=current_user.id, requested_by=current_user.id))
+    await db.commit()
+    analytics_cache.invalidate(("user", current_user.id))
+
+    return {"message": "Аккаунт удален, данные будут удалены в фоновом режиме"}
+
+@router.get("/me/balance")
+async def get_user_balance(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await get_balance(db, "user", current_user.id)
+
 @router.get("/me/statistics")
 async def get_group_statistics(
     period: PeriodForGroupBy = "month",
+    compare: Optional[Literal["previous", "year_ago"]] = Query(None, description="Сравнение с предыдущим периодом или годом ранее"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     filters: TransactionFilters = Depends(get_transaction_filters),
 ):
-    income_query = select(func.sum(Transaction.amount)).where(Transaction.user_id == current_user.id, 
-        Transaction.type == "income")
-    income_query = apply_filters(income_query, filters)
-    income_stats = await db.execute(income_query)
-    total_income = income_stats.scalar() or 0
-
-    expense_query = select(func.sum(Transaction.amount)).where(Transaction.user_id == current_user.id, 
-        Transaction.type == "expense")
-    expense_query = apply_filters(expense_query, filters)
-    expense_stats = await db.execute(expense_query)
-    total_expense = expense_stats.scalar() or 0
-
-    balance = total_income - total_expense
-
-    count_query = select(func.count(Transaction.id)).where(Transaction.user_id == current_user.id)
-    count_query = apply_filters(count_query, filters)
-    count_stats = await db.execute(count_query)
-    total_count = count_stats.scalar() or 0
-
-    grouped_by_category_query = select(Transaction.category,
-        func.sum(Transaction.amount).label("amount")).where(Transaction.user_id == current_user.id,
-        Transaction.type == "expense")
-    grouped_by_category_query = apply_filters(grouped_by_category_query, filters)
-    grouped_by_category_query = grouped_by_category_query.group_by(Transaction.category)
-    grouped_by_category_stats = await db.execute(grouped_by_category_query)
-    grouped_by_category_expense = [
-        {"category": row.category, "amount": float(row.amount)}
-        for row in grouped_by_category_stats.all()
-    ]
-
-    period_truncated = func.date_trunc(period, Transaction.transaction_datetime).label("period")
-    grouped_by_period_query = select(period_truncated, func.sum(Transaction.amount).label("amount")).where(Transaction.user_id == current_user.id,
-        Transaction.type == "expense")
-    grouped_by_period_query = apply_filters(grouped_by_period_query, filters)
-    grouped_by_period_query = grouped_by_period_query.group_by(period_truncated)
-    grouped_by_period_stats = await db.execute(grouped_by_period_query)
-    grouped_by_period_expense = [
-        {"period": row.period.isoformat() if row.period else None, "amount": float(row.amount)}
-        for row in grouped_by_period_stats.all()
-    ]
+    windows = comparison_windows(filters, compare) if compare else None
 
-    return {
+    stats = await analytics_cache.statistics(db, ("user", current_user.id), filters, period)
+    if stats is not None:
+        total_income = stats["total_income"]
+        total_expense = stats["total_expense"]
+        balance = total_income - total_expense
+        total_count = stats["total_count"]
+        grouped_by_category_expense = stats["grouped_by_category_expense"]
+        grouped_by_period_expense = stats["grouped_by_period_expense"]
+    else:
+        income_query = select(func.sum(Transaction.amount)).where(Transaction.user_id == current_user.id, 
+            Transaction.type == "income")
+        income_query = apply_filters(income_query, filters)
+        income_stats = await db.execute(income_query)
+        total_income = income_stats.scalar() or 0
+
+        expense_query = select(func.sum(Transaction.amount)).where(Transaction.user_id == current_user.id, 
+            Transaction.type == "expense")
+        expense_query = apply_filters(expense_query, filters)
+        expense_stats = await db.execute(expense_query)
+        total_expense = expense_stats.scalar() or 0
+
+        balance = total_income - total_expense
+
+        count_query = select(func.count(Transaction.id)).where(Transaction.user_id == current_user.id)
+        count_query = apply_filters(count_query, filters)
+        count_stats = await db.execute(count_query)
+        total_count = count_stats.scalar() or 0
+
+        grouped_by_category_query = select(Transaction.category_id,
+            func.sum(Transaction.amount).label("amount")).where(Transaction.user_id == current_user.id,
+            Transaction.type == "expense")
+        grouped_by_category_query = apply_filters(grouped_by_category_query, filters)
+        grouped_by_category_query = grouped_by_category_query.group_by(Transaction.category_id).subquery()
+        grouped_by_category_stats = await db.execute(
+            select(Category.name.label("category"), grouped_by_category_query.c.amount)
+            .join(grouped_by_category_query, Category.id == grouped_by_category_query.c.category_id)
+        )
+        grouped_by_category_expense = [
+            {"category": row.category, "amount": float(row.amount)}
+            for row in grouped_by_category_stats.all()
+        ]
+
+        period_truncated = func.date_trunc(period, Transaction.transaction_datetime).label("period")
+        grouped_by_period_query = select(period_truncated, func.sum(Transaction.amount).label("amount")).where(Transaction.user_id == current_user.id,
+            Transaction.type == "expense")
+        grouped_by_period_query = apply_filters(grouped_by_period_query, filters)
+        grouped_by_period_query = grouped_by_period_query.group_by(period_truncated)
+        grouped_by_period_stats = await db.execute(grouped_by_period_query)
+        grouped_by_period_expense = [
+            {"period": row.period.isoformat() if row.period else None, "amount": float(row.amount)}
+            for row in grouped_by_period_stats.all()
+        ]
+
+    archived = await load_archived_transactions(db, [current_user.id], filters)
+    if archived is not None:
+        archived_stats = archived_statistics(archived, period)
+        total_income += archived_stats["total_income"]
+        total_expense += archived_stats["total_expense"]
+        total_count += archived_stats["total_count"]
+        balance = total_income - total_expense
+        grouped_by_category_expense = merge_grouped(
+            grouped_by_category_expense, "category", archived_stats["by_category"]
+        )
+        grouped_by_period_expense = merge_grouped(
+            grouped_by_period_expense, "period", archived_stats["by_period"]
+        )
+
+    response = {
         "first_name": current_user.first_name,
         "last_name": current_user.last_name,
         "user_id": current_user.id,
@@ -181,3 +243,25 @@ async def get_group_statistics(
         "grouped_by_period_expense": grouped_by_period_expense
     }
 
+    if compare:
+        query = comparison_query(windows).where(Transaction.user_id == current_user.id)
+        response["comparison"] = await compare_statistics(db, query, compare, windows, filters, [current_user.id])
+
+    return response
+
+@router.get("/me/statistics/distribution")
+async def get_statistics_distribution(
+    period: Literal["year", "month", "day"] = "month",
+    window_days: int = Query(ROLLING_WINDOW_DAYS, ge=1, le=366, description="Размер скользящего окна в днях"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    filters: TransactionFilters = Depends(get_transaction_filters),
+):
+    query = distribution_query(period, window_days).where(Transaction.user_id == current_user.id)
+    query = apply_filters(query, filters)
+    result = await db.execute(query)
+
+    return {
+        "user_id": current_user.id,
+        **distribution_result(result.all(), window_days)
+    }
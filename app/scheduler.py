@@ -3,6 +3,15 @@ from sqlalchemy import select
 from datetime import datetime, timedelta
 from app.models import Transaction
 from app.database import AsyncSessionLocal
+from app.idempotency import delete_expired_keys, IDEMPOTENCY_PURGE_BATCH_SIZE
+from app.sync import delete_expired_tombstones, TOMBSTONE_PURGE_BATCH_SIZE
+from app.archive import get_users_to_archive, archive_user_transactions, archive_cutoff
+from app.analytics import analytics_cache
+from app.events import (dispatch_change_events, delete_dispatched_events,
+                        CHANGE_EVENTS_BATCH_SIZE, CHANGE_EVENTS_DISPATCH_SECONDS)
+from app.deletions import process_deletion_jobs, DELETION_JOBS_POLL_SECONDS
+from app.partitions import (is_partitioned, create_future_partitions, detach_old_partitions,
+                            PARTITIONS_RETENTION_MONTHS)
 
 scheduler = AsyncIOScheduler()
 
@@ -97,6 +106,115 @@ async def check_reminders():
         except Exception as e:
             print(f"❌ Ошибка при проверке напоминаний: {e}")
 
+async def purge_expired_idempotency_keys():
+    async with AsyncSessionLocal() as db:
+        try:
+            total = 0
+            while True:
+                deleted = await delete_expired_keys(db, IDEMPOTENCY_PURGE_BATCH_SIZE)
+                total += deleted
+                if deleted < IDEMPOTENCY_PURGE_BATCH_SIZE:
+                    break
+
+            if total:
+                print(f"Удалено устаревших ключей идемпотентности: {total}")
+
+        except Exception as e:
+            await db.rollback()
+            print(f"Ошибка при удалении ключей идемпотентности: {e}")
+
+async def purge_expired_tombstones():
+    async with AsyncSessionLocal() as db:
+        try:
+            total = 0
+            while True:
+                deleted = await delete_expired_tombstones(db, TOMBSTONE_PURGE_BATCH_SIZE)
+                total += deleted
+                if deleted < TOMBSTONE_PURGE_BATCH_SIZE:
+                    break
+
+            if total:
+                print(f"Удалено устаревших отметок удаления: {total}")
+
+        except Exception as e:
+            await db.rollback()
+            print(f"Ошибка при удалении отметок удаления: {e}")
+
+async def maintain_transaction_partitions():
+    async with AsyncSessionLocal() as db:
+        try:
+            if not await is_partitioned(db):
+                return
+
+            now = datetime.utcnow()
+            created = await create_future_partitions(db, now)
+            if created:
+                print(f"Созданы секции транзакций: {', '.join(created)}")
+
+            if PARTITIONS_RETENTION_MONTHS:
+                detached = await detach_old_partitions(db, now, int(PARTITIONS_RETENTION_MONTHS))
+                if detached:
+                    print(f"Отсоединены секции транзакций: {', '.join(detached)}")
+
+        except Exception as e:
+            await db.rollback()
+            print(f"Ошибка при обслуживании секций транзакций: {e}")
+
+async def archive_old_transactions():
+    async with AsyncSessionLocal() as db:
+        try:
+            cutoff = archive_cutoff(datetime.utcnow())
+            total = 0
+            for user_id in await get_users_to_archive(db, cutoff):
+                total += await archive_user_transactions(db, user_id, cutoff)
+                analytics_cache.invalidate(("user", user_id))
+                analytics_cache.invalidate_groups()
+
+            if total:
+                print(f"Перенесено в архив транзакций: {total}")
+
+        except Exception as e:
+            await db.rollback()
+            print(f"Ошибка при архивации транзакций: {e}")
+
+async def dispatch_pending_change_events():
+    async with AsyncSessionLocal() as db:
+        try:
+            while await dispatch_change_events(db, CHANGE_EVENTS_BATCH_SIZE) == CHANGE_EVENTS_BATCH_SIZE:
+                pass
+
+        except Exception as e:
+            await db.rollback()
+            print(f"Ошибка при рассылке событий изменений: {e}")
+
+async def purge_dispatched_change_events():
+    async with AsyncSessionLocal() as db:
+        try:
+            total = 0
+            while True:
+                deleted = await delete_dispatched_events(db, CHANGE_EVENTS_BATCH_SIZE)
+                total += deleted
+                if deleted < CHANGE_EVENTS_BATCH_SIZE:
+                    break
+
+            if total:
+                print(f"Удалено разосланных событий изменений: {total}")
+
+        except Exception as e:
+            await db.rollback()
+            print(f"Ошибка при удалении событий изменений: {e}")
+
+async def process_pending_deletion_jobs():
+    async with AsyncSessionLocal() as db:
+        try:
+            processed = await process_deletion_jobs(db)
+            if processed:
+                print(f"Выполнено задач удаления: {processed}")
+
+        except Exception as e:
+            await db.rollback()
+            print(f"Ошибка при выполнении задач удаления: {e}")
+
 
 def start_scheduler():
     scheduler.add_job(
@@ -126,6 +244,67 @@ def start_scheduler():
         replace_existing=True
     )
 
+    scheduler.add_job(
+        purge_expired_idempotency_keys,
+        'interval',
+        hours=1,
+        id='purge_expired_idempotency_keys',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        purge_expired_tombstones,
+        'cron',
+        hour=2,
+        minute=0,
+        id='purge_expired_tombstones',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        maintain_transaction_partitions,
+        'cron',
+        hour=1,
+        minute=0,
+        id='maintain_transaction_partitions',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        archive_old_transactions,
+        'cron',
+        day_of_week='sun',
+        hour=3,
+        minute=0,
+        id='archive_old_transactions',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        dispatch_pending_change_events,
+        'interval',
+        seconds=CHANGE_EVENTS_DISPATCH_SECONDS,
+        id='dispatch_pending_change_events',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        purge_dispatched_change_events,
+        'cron',
+        hour=4,
+        minute=0,
+        id='purge_dispatched_change_events',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        process_pending_deletion_jobs,
+        'interval',
+        seconds=DELETION_JOBS_POLL_SECONDS,
+        id='process_pending_deletion_jobs',
+        replace_existing=True
+    )
+
     scheduler.start()
 
 
@@ -58,6 +58,10 @@ class TransactionBase(BaseModel):
 class TransactionCreate(TransactionBase):
     group_ids: List[int] = Field(default=[], description="Список ID групп")
 
+class TransactionBatchCreate(BaseModel):
+    items: List[TransactionCreate] = Field(..., min_length=1, max_length=100,
+                                           description="Список транзакций для создания")
+
 class TransactionUpdate(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -71,18 +75,60 @@ class TransactionUpdate(BaseModel):
     is_recurring: Optional[bool] = None
     recurring_period_days: Optional[int] = None
 
+class TransactionBulkUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=100, description="Название транзакции")
+    type: Optional[TransactionType] = None
+    category: Optional[str] = Field(None, min_length=1, max_length=50, description="Категория")
+    amount: Optional[Decimal] = Field(None, gt=0, description="Сумма транзакции")
+    description: Optional[str] = Field(None, description="Описание")
+
 class TransactionResponse(TransactionBase):
     id: int = Field(..., description="ID транзакции")
     transaction_datetime: datetime = Field(..., description="Дата и время транзакции")
     user_id: int = Field(..., description="ID пользователя")
     groups: List[GroupResponse] = Field(default=[], description="Информация о группах")
+    updated_at: Optional[datetime] = Field(None, description="Дата и время последнего изменения")
+    version: Optional[int] = Field(None, description="Версия строки для синхронизации")
+
+class TransactionChanges(BaseModel):
+    changes: List[TransactionResponse] = Field(..., description="Созданные и измененные транзакции")
+    deleted: List[int] = Field(..., description="ID удаленных транзакций")
+    next_token: str = Field(..., description="Токен для следующего запроса изменений")
+    has_more: bool = Field(..., description="Есть еще изменения после next_token")
+
+class BudgetStatus(BaseModel):
+    category: str = Field(..., description="Категория")
+    month: datetime = Field(..., description="Месяц бюджета")
+    amount: Decimal = Field(..., description="Лимит на месяц")
+    spent: Decimal = Field(..., description="Потрачено за месяц")
+    remaining: Decimal = Field(..., description="Остаток бюджета")
+    exceeded: bool = Field(..., description="Бюджет превышен")
+
+class TransactionCreateResponse(TransactionResponse):
+    budget: Optional[BudgetStatus] = Field(None, description="Состояние бюджета категории после создания")
+
+class BudgetCreate(BaseModel):
+    category: str = Field(..., min_length=1, max_length=50, description="Категория")
+    amount: Decimal = Field(..., gt=0, description="Лимит расходов на месяц")
+
+class BudgetUpdate(BaseModel):
+    amount: Decimal = Field(..., gt=0, description="Лимит расходов на месяц")
+
+class BudgetResponse(BudgetStatus):
+    id: int = Field(..., description="ID бюджета")
 
 class TransactionFilters(BaseModel):
     name: Optional[str] = None
     type: Optional[TransactionType] = None
+    types: Optional[List[TransactionType]] = None
     category: Optional[str] = None
+    categories: Optional[List[str]] = None
     amount: Optional[Decimal] = None
+    amount_min: Optional[Decimal] = None
+    amount_max: Optional[Decimal] = None
     transaction_datetime: Optional[datetime] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
     user_id: Optional[int] = None
     group_ids: Optional[List[int]] = None
 
@@ -91,17 +137,29 @@ class TransactionFilters(BaseModel):
 async def get_transaction_filters(
     name: Optional[str] = Query(None),
     type: Optional[TransactionType] = Query(None),
+    types: Optional[List[TransactionType]] = Query(None, description="Список типов транзакций"),
     category: Optional[str] = Query(None),
+    categories: Optional[List[str]] = Query(None, description="Список категорий"),
     amount: Optional[Decimal] = Query(None),
+    amount_min: Optional[Decimal] = Query(None, description="Минимальная сумма (включительно)"),
+    amount_max: Optional[Decimal] = Query(None, description="Максимальная сумма (включительно)"),
     transaction_datetime: Optional[datetime] = Query(None),
+    date_from: Optional[datetime] = Query(None, description="Начало периода (включительно)"),
+    date_to: Optional[datetime] = Query(None, description="Конец периода (не включительно)"),
     group_ids: Optional[List[int]] = Query(None)
 ) -> TransactionFilters:
     return TransactionFilters(
         name=name,
         type=type,
+        types=types,
         category=category,
+        categories=categories,
         amount=amount,
+        amount_min=amount_min,
+        amount_max=amount_max,
         transaction_datetime=transaction_datetime,
+        date_from=date_from,
+        date_to=date_to,
         group_ids=group_ids
     )
 
@@ -109,10 +167,11 @@ T = TypeVar("T")
 
 class Page(BaseModel, Generic[T]):
     items: List[T]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    has_more: bool = False
 
 class PeriodForGroupBy(BaseModel):
     period: Literal["year", "month", "day"]
@@ -0,0 +1,133 @@
+from collections import OrderedDict
+from decimal import Decimal
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import User, Transaction, TransactionType, user_group_association, transaction_group_association
+from app.schemas import TransactionFilters
+from app.archive import load_archived_transactions
+import heapq
+import os
+
+SETTLEMENT_CACHE_MAX_GROUPS = int(os.getenv("SETTLEMENT_CACHE_MAX_GROUPS", "1024"))
+
+
+def paid_by_member_query(group_id: int):
+    paid = (
+        select(Transaction.user_id, func.sum(Transaction.amount).label("paid"))
+        .join(transaction_group_association, transaction_group_association.c.transaction_id == Transaction.id)
+        .where(
+            transaction_group_association.c.group_id == group_id,
+            Transaction.type == TransactionType.expense
+        )
+        .group_by(Transaction.user_id)
+        .subquery()
+    )
+    return (
+        select(User.id, User.first_name, User.last_name, func.coalesce(paid.c.paid, 0).label("paid"))
+        .join(user_group_association, user_group_association.c.user_id == User.id)
+        .outerjoin(paid, paid.c.user_id == User.id)
+        .where(user_group_association.c.group_id == group_id)
+        .order_by(User.id)
+    )
+
+def to_cents(amount) -> int:
+    return int(Decimal(amount) * 100)
+
+def from_cents(amount: int) -> Decimal:
+    return Decimal(amount) / 100
+
+def net_positions(paid: dict[int, int]) -> dict[int, tuple[int, int]]:
+    if not paid:
+        return {}
+
+    share, remainder = divmod(sum(paid.values()), len(paid))
+    positions = {}
+    for index, (user_id, amount) in enumerate(sorted(paid.items())):
+        member_share = share + 1 if index < remainder else share
+        positions[user_id] = (member_share, amount - member_share)
+    return positions
+
+def settle(net: dict[int, int]) -> list[tuple[int, int, int]]:
+    creditors = [(-amount, user_id) for user_id, amount in net.items() if amount > 0]
+    debtors = [(amount, user_id) for user_id, amount in net.items() if amount < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    transfers = []
+    while creditors and debtors:
+        credit, creditor = heapq.heappop(creditors)
+        debt, debtor = heapq.heappop(debtors)
+        amount = min(-credit, -debt)
+        transfers.append((debtor, creditor, amount))
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor))
+    return transfers
+
+async def compute_settlement(db: AsyncSession, group_id: int, version: int) -> dict:
+    result = await db.execute(paid_by_member_query(group_id))
+    members = result.all()
+    paid = {member.id: to_cents(member.paid) for member in members}
+
+    archived = await load_archived_transactions(
+        db, list(paid), TransactionFilters(type=TransactionType.expense), group_id
+    )
+    if archived is not None:
+        for row in archived.group_by("user_id").aggregate([("amount", "sum")]).to_pylist():
+            if row["user_id"] in paid:
+                paid[row["user_id"]] += to_cents(row["amount_sum"])
+
+    positions = net_positions(paid)
+    return {
+        "group_id": group_id,
+        "version": version,
+        "total_expense": from_cents(sum(paid.values())),
+        "members": [
+            {
+                "user_id": member.id,
+                "first_name": member.first_name,
+                "last_name": member.last_name,
+                "paid": from_cents(paid[member.id]),
+                "share": from_cents(positions[member.id][0]),
+                "net": from_cents(positions[member.id][1]),
+            }
+            for member in members
+        ],
+        "transfers": [
+            {"from_user_id": debtor, "to_user_id": creditor, "amount": from_cents(amount)}
+            for debtor, creditor, amount in settle({user_id: net for user_id, (_, net) in positions.items()})
+        ],
+    }
+
+
+class SettlementCache:
+    def __init__(self, max_groups: int = SETTLEMENT_CACHE_MAX_GROUPS):
+        self.max_groups = max_groups
+        self.groups: OrderedDict[int, tuple[int, dict]] = OrderedDict()
+
+    def get(self, group_id: int, version: int) -> dict | None:
+        cached = self.groups.get(group_id)
+        if cached is None or cached[0] != version:
+            return None
+        self.groups.move_to_end(group_id)
+        return cached[1]
+
+    def put(self, group_id: int, version: int, settlement: dict):
+        self.groups[group_id] = (version, settlement)
+        self.groups.move_to_end(group_id)
+        while len(self.groups) > self.max_groups:
+            self.groups.popitem(last=False)
+
+    async def settlement(self, db: AsyncSession, group_id: int, version: int) -> dict:
+        settlement = self.get(group_id, version)
+        if settlement is None:
+            settlement = await compute_settlement(db, group_id, version)
+            self.put(group_id, version, settlement)
+        return settlement
+
+    def clear(self):
+        self.groups.clear()
+
+
+settlement_cache = SettlementCache()
@@ -0,0 +1,325 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from fastapi import HTTPException
+from sqlalchemy import select, func, literal_column, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from app.models import Transaction, Category
+from app.schemas import TransactionFilters
+from app.archive import as_utc, load_archived_transactions, archived_statistics
+from app.partitions import month_start, add_months
+from app.utils import apply_filters
+
+ROLLING_WINDOW_DAYS = 30
+GROUPING_CATEGORY = 0b011
+GROUPING_PERIOD = 0b101
+GROUPING_DAY = 0b110
+GROUPING_PERIOD_DAY = 0b100
+GROUPING_MEMBER_CATEGORY = 0b01
+
+
+def distribution_query(period: str, window_days: int = ROLLING_WINDOW_DAYS):
+    category = aliased(Category)
+    period_truncated = func.date_trunc(literal_column(f"'{period}'"), Transaction.transaction_datetime)
+    day = func.date_trunc(literal_column("'day'"), Transaction.transaction_datetime)
+    grouping = func.grouping(category.name, period_truncated, day)
+    grouping_sets = [category.name, period_truncated] if period == "day" else [category.name, period_truncated, day]
+
+    return (
+        select(
+            grouping.label("grouping"),
+            category.name.label("category"),
+            period_truncated.label("period"),
+            day.label("day"),
+            func.count(Transaction.id).label("count"),
+            func.sum(Transaction.amount).label("total"),
+            func.avg(Transaction.amount).label("average"),
+            func.min(Transaction.amount).label("min"),
+            func.max(Transaction.amount).label("max"),
+            func.percentile_cont(0.5).within_group(Transaction.amount).label("median"),
+            func.percentile_cont(0.9).within_group(Transaction.amount).label("p90"),
+            func.sum(func.sum(Transaction.amount)).over(
+                partition_by=grouping,
+                order_by=func.extract("epoch", day) / 86400,
+                range_=(-(window_days - 1), 0)
+            ).label("rolling_total"),
+        )
+        .select_from(Transaction)
+        .join(category, category.id == Transaction.category_id)
+        .where(Transaction.type == "expense")
+        .group_by(func.grouping_sets(*grouping_sets))
+    )
+
+def member_statistics_query(period: str):
+    category = aliased(Category)
+    period_truncated = func.date_trunc(literal_column(f"'{period}'"), Transaction.transaction_datetime)
+
+    return (
+        select(
+            func.grouping(category.name, period_truncated).label("grouping"),
+            Transaction.user_id,
+            Transaction.type,
+            category.name.label("category"),
+            period_truncated.label("period"),
+            func.sum(Transaction.amount).label("amount"),
+            func.count(Transaction.id).label("count"),
+        )
+        .select_from(Transaction)
+        .join(category, category.id == Transaction.category_id)
+        .group_by(Transaction.user_id, Transaction.type, func.grouping_sets(category.name, period_truncated))
+    )
+
+def member_statistics_rows(rows) -> tuple[list, list]:
+    category_rows = []
+    period_rows = []
+    for row in rows:
+        if row.grouping == GROUPING_MEMBER_CATEGORY:
+            category_rows.append((row.user_id, row.type.value, row.category, row.amount, row.count))
+        else:
+            period_rows.append((row.user_id, row.type.value, row.period.isoformat(), row.amount, row.count))
+    return category_rows, period_rows
+
+def totals_from_member_rows(category_rows, period_rows) -> dict:
+    totals = {"income": Decimal(0), "expense": Decimal(0)}
+    count = 0
+    by_category = {}
+    by_period = {}
+
+    for _, transaction_type, category, amount, transactions in category_rows:
+        totals[transaction_type] += amount
+        count += transactions
+        if transaction_type == "expense":
+            by_category[category] = by_category.get(category, 0) + float(amount)
+    for _, transaction_type, period, amount, _ in period_rows:
+        if transaction_type == "expense":
+            by_period[period] = by_period.get(period, 0) + float(amount)
+
+    return {
+        "total_income": totals["income"],
+        "total_expense": totals["expense"],
+        "total_count": count,
+        "grouped_by_category_expense": [
+            {"category": category, "amount": amount} for category, amount in by_category.items()
+        ],
+        "grouped_by_period_expense": [
+            {"period": period, "amount": amount} for period, amount in by_period.items()
+        ],
+    }
+
+def empty_member_breakdown() -> dict:
+    return {
+        "total_income": Decimal(0), "total_expense": Decimal(0), "total_transactions": 0,
+        "by_category": {}, "by_period": {},
+    }
+
+def add_member_amount(breakdown: dict, key: str, transaction_type: str, amount, count: int):
+    item = breakdown.setdefault(key, {"income": 0.0, "expense": 0.0, "count": 0})
+    item[transaction_type] += float(amount)
+    item["count"] += count
+
+def member_statistics(category_rows, period_rows, users) -> list[dict]:
+    members = {
+        user.id: {"user_id": user.id, "first_name": user.first_name, "last_name": user.last_name}
+        for user in users
+    }
+    breakdowns = {}
+
+    for user_id, transaction_type, category, amount, count in category_rows:
+        member = breakdowns.setdefault(user_id, empty_member_breakdown())
+        member[f"total_{transaction_type}"] += amount
+        member["total_transactions"] += count
+        add_member_amount(member["by_category"], category, transaction_type, amount, count)
+    for user_id, transaction_type, period, amount, count in period_rows:
+        add_member_amount(breakdowns[user_id]["by_period"], period, transaction_type, amount, count)
+
+    result = []
+    for user_id in sorted(members.keys() | breakdowns.keys()):
+        member = members.get(user_id, {"user_id": user_id, "first_name": None, "last_name": None})
+        breakdown = breakdowns.get(user_id) or empty_member_breakdown()
+        result.append({
+            **member,
+            "balance": breakdown["total_income"] - breakdown["total_expense"],
+            "total_income": breakdown["total_income"],
+            "total_expense": breakdown["total_expense"],
+            "total_transactions": breakdown["total_transactions"],
+            "by_category": [
+                {"category": category, **amounts}
+                for category, amounts in sorted(breakdown["by_category"].items())
+            ],
+            "by_period": [
+                {"period": period, **amounts}
+                for period, amounts in sorted(breakdown["by_period"].items())
+            ],
+        })
+    return result
+
+def distribution_item(row) -> dict:
+    return {
+        "count": row.count,
+        "total": float(row.total),
+        "average": float(row.average),
+        "min": float(row.min),
+        "max": float(row.max),
+        "median": row.median,
+        "p90": row.p90,
+    }
+
+def distribution_result(rows, window_days: int = ROLLING_WINDOW_DAYS) -> dict:
+    by_category = []
+    by_period = []
+    rolling = []
+
+    for row in rows:
+        if row.grouping == GROUPING_CATEGORY:
+            by_category.append({"category": row.category, **distribution_item(row)})
+        if row.grouping in (GROUPING_PERIOD, GROUPING_PERIOD_DAY):
+            by_period.append({"period": row.period.isoformat(), **distribution_item(row)})
+        if row.grouping in (GROUPING_DAY, GROUPING_PERIOD_DAY):
+            rolling.append({
+                "day": row.day.isoformat(),
+                "total": float(row.total),
+                "rolling_total": float(row.rolling_total),
+                "rolling_average": float(row.rolling_total) / window_days,
+            })
+
+    return {
+        "window_days": window_days,
+        "by_category_expense": sorted(by_category, key=lambda item: item["category"]),
+        "by_period_expense": sorted(by_period, key=lambda item: item["period"]),
+        "rolling_expense": sorted(rolling, key=lambda item: item["day"]),
+    }
+
+def shift_window(start: datetime, end: datetime, compare: str) -> tuple[datetime, datetime]:
+    if compare == "year_ago":
+        if start == month_start(start) and end == month_start(end):
+            return add_months(start, -12), add_months(end, -12)
+        return shift_year(start), shift_year(end)
+
+    if start == month_start(start) and end == month_start(end):
+        months = (end.year - start.year) * 12 + end.month - start.month
+        return add_months(start, -months), start
+    return start - (end - start), start
+
+def shift_year(value: datetime) -> datetime:
+    if value.month == 2 and value.day == 29:
+        return value.replace(year=value.year - 1, day=28)
+    return value.replace(year=value.year - 1)
+
+def comparison_windows(filters: TransactionFilters, compare: str) -> dict:
+    start = filters.date_from or filters.transaction_datetime
+    if not start:
+        raise HTTPException(status_code=400, detail="Для сравнения периодов укажите date_from")
+
+    start = as_utc(start)
+    end = as_utc(filters.date_to) if filters.date_to else datetime.now(timezone.utc)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="date_from должен быть раньше date_to")
+
+    previous_start, previous_end = shift_window(start, end, compare)
+    return {"current": (start, end), "previous": (previous_start, previous_end)}
+
+def without_dates(filters: TransactionFilters) -> TransactionFilters:
+    return filters.model_copy(update={"transaction_datetime": None, "date_from": None, "date_to": None})
+
+def comparison_query(windows: dict):
+    category = aliased(Category)
+    in_window = {
+        key: and_(Transaction.transaction_datetime >= start, Transaction.transaction_datetime < end)
+        for key, (start, end) in windows.items()
+    }
+
+    columns = [func.grouping(category.name).label("grouping"), category.name.label("category")]
+    for key, condition in in_window.items():
+        columns += [
+            func.coalesce(func.sum(Transaction.amount).filter(
+                condition, Transaction.type == "income"), 0).label(f"{key}_income"),
+            func.coalesce(func.sum(Transaction.amount).filter(
+                condition, Transaction.type == "expense"), 0).label(f"{key}_expense"),
+            func.count(Transaction.id).filter(condition).label(f"{key}_count"),
+        ]
+
+    return (
+        select(*columns)
+        .select_from(Transaction)
+        .join(category, category.id == Transaction.category_id)
+        .where(or_(*in_window.values()))
+        .group_by(func.grouping_sets(category.name, literal_column("()")))
+        .having(or_(
+            func.grouping(category.name) == 1,
+            func.count(Transaction.id).filter(Transaction.type == "expense") > 0
+        ))
+    )
+
+def comparison_totals(income, expense, count) -> dict:
+    return {
+        "total_income": income,
+        "total_expense": expense,
+        "balance": income - expense,
+        "total_count": count,
+    }
+
+def comparison_result(rows, windows: dict, compare: str) -> dict:
+    totals = {key: comparison_totals(Decimal(0), Decimal(0), 0) for key in windows}
+    by_category = {}
+
+    for row in rows:
+        if row.grouping:
+            for key in windows:
+                totals[key] = comparison_totals(
+                    row._mapping[f"{key}_income"], row._mapping[f"{key}_expense"], row._mapping[f"{key}_count"]
+                )
+        else:
+            by_category[row.category] = {key: row._mapping[f"{key}_expense"] for key in windows}
+
+    return {"compare": compare, "windows": windows, "totals": totals, "by_category": by_category}
+
+async def merge_archived_comparison(db: AsyncSession, comparison: dict, user_ids: list[int],
+                                    filters: TransactionFilters, group_id: int | None = None):
+    for key, (start, end) in comparison["windows"].items():
+        window_filters = without_dates(filters).model_copy(update={"date_from": start, "date_to": end})
+        archived = await load_archived_transactions(db, user_ids, window_filters, group_id)
+        if archived is None:
+            continue
+
+        archived_stats = archived_statistics(archived, "month")
+        totals = comparison["totals"][key]
+        comparison["totals"][key] = comparison_totals(
+            totals["total_income"] + archived_stats["total_income"],
+            totals["total_expense"] + archived_stats["total_expense"],
+            totals["total_count"] + archived_stats["total_count"],
+        )
+        for category, amount in archived_stats["by_category"].items():
+            amounts = comparison["by_category"].setdefault(category, {name: Decimal(0) for name in comparison["windows"]})
+            amounts[key] += amount
+
+def comparison_response(comparison: dict) -> dict:
+    windows = comparison["windows"]
+    totals = comparison["totals"]
+
+    return {
+        "compare": comparison["compare"],
+        **{
+            key: {"date_from": start.isoformat(), "date_to": end.isoformat(), **totals[key]}
+            for key, (start, end) in windows.items()
+        },
+        "delta": {
+            name: totals["current"][name] - totals["previous"][name]
+            for name in ("total_income", "total_expense", "balance", "total_count")
+        },
+        "grouped_by_category_expense": [
+            {
+                "category": category,
+                "current": float(amounts["current"]),
+                "previous": float(amounts["previous"]),
+                "delta": float(amounts["current"] - amounts["previous"]),
+            }
+            for category, amounts in sorted(comparison["by_category"].items())
+        ],
+    }
+
+async def compare_statistics(db: AsyncSession, query, compare: str, windows: dict, filters: TransactionFilters,
+                             user_ids: list[int], group_id: int | None = None) -> dict:
+    result = await db.execute(apply_filters(query, without_dates(filters)))
+    comparison = comparison_result(result.all(), windows, compare)
+    await merge_archived_comparison(db, comparison, user_ids, filters, group_id)
+    return comparison_response(comparison)
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, delete, func, cast, String, BigInteger
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import User, TransactionTombstone
+import os
+import re
+
+TOMBSTONE_RETENTION = timedelta(days=int(os.getenv("TRANSACTION_TOMBSTONE_RETENTION_DAYS", "90")))
+TOMBSTONE_PURGE_BATCH_SIZE = 1000
+
+SYNC_TOKEN_RE = re.compile(r"^(?:(\d+)-)?(\d+)$")
+
+
+def parse_sync_token(token: str) -> tuple[int, int]:
+    match = SYNC_TOKEN_RE.match(token)
+    if not match:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный токен синхронизации"
+        )
+    return int(match.group(1) or 0), int(match.group(2))
+
+def sync_token(xact_id: int, version: int) -> str:
+    return f"{xact_id}-{version}"
+
+def check_sync_token(user: User, since: tuple[int, int]):
+    if since == (0, 0) or user.tombstones_purged_xact_id is None:
+        return
+    if since[0] <= user.tombstones_purged_xact_id:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Токен синхронизации устарел, требуется полная синхронизация с since=0"
+        )
+
+async def finished_xact_horizon(db: AsyncSession) -> int:
+    return await db.scalar(
+        select(cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), String), BigInteger))
+    )
+
+async def delete_expired_tombstones(db: AsyncSession, batch_size: int = TOMBSTONE_PURGE_BATCH_SIZE) -> int:
+    expired_ids = (
+        select(TransactionTombstone.transaction_id)
+        .where(TransactionTombstone.deleted_at <= datetime.now(timezone.utc) - TOMBSTONE_RETENTION)
+        .limit(batch_size)
+    )
+    purged = (
+        delete(TransactionTombstone)
+        .where(TransactionTombstone.transaction_id.in_(expired_ids))
+        .returning(TransactionTombstone.user_id, TransactionTombstone.xact_id)
+        .cte("purged")
+    )
+    marks = (
+        select(purged.c.user_id, func.max(purged.c.xact_id).label("xact_id"))
+        .group_by(purged.c.user_id)
+        .subquery("marks")
+    )
+    marked_users = (
+        update(User)
+        .where(User.id == marks.c.user_id)
+        .values(tombstones_purged_xact_id=func.greatest(User.tombstones_purged_xact_id, marks.c.xact_id))
+        .returning(User.id)
+        .cte("marked_users")
+    )
+    result = await db.execute(select(func.count()).select_from(purged).add_cte(marked_users))
+    await db.commit()
+    return result.scalar()
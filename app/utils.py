@@ -2,16 +2,15 @@ from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
 from app.schemas import TransactionFilters
-from app.models import Transaction, Group
+from app.models import Transaction, TransactionListEntry, Category, transaction_group_association, get_category_ids
 from fastapi import Query
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal
+from functools import lru_cache
 import os
 
-SECRET_KEY = os.getenv("SECRET_KEY")
-if not SECRET_KEY:
-    raise ValueError("SECRET_KEY environment variable is not set")
-
-if len(SECRET_KEY) < 32:
-    raise ValueError("SECRET_KEY must be at least 32 characters long")
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -21,6 +20,17 @@ pwd_context = CryptContext(
     deprecated="auto"
 )
 
+@lru_cache
+def get_secret_key() -> str:
+    secret_key = os.getenv("SECRET_KEY")
+    if not secret_key:
+        raise ValueError("SECRET_KEY environment variable is not set")
+
+    if len(secret_key) < 32:
+        raise ValueError("SECRET_KEY must be at least 32 characters long")
+
+    return secret_key
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -39,12 +49,12 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
         expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
 
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, get_secret_key(), algorithm=ALGORITHM)
     return encoded_jwt
 
 def decode_access_token(token: str) -> dict | None:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, get_secret_key(), algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             return None
@@ -54,27 +64,150 @@ def decode_access_token(token: str) -> dict | None:
         return None
 
 
+async def resolve_category_ids(db: AsyncSession, user_id: int, names) -> dict:
+    category_ids = await db.run_sync(
+        lambda session: get_category_ids(session.connection(), [(user_id, name) for name in names])
+    )
+    return {name: category_id for (_, name), category_id in category_ids.items()}
+
 def pagination_params(
     page: int = Query(1, ge=1, description="Номер страницы"),
-    size: int = Query(20, ge=1, le=100, description="Размер страницы")
+    size: int = Query(20, ge=1, le=100, description="Размер страницы"),
+    count: Literal["exact", "estimated", "none"] = Query(
+        "exact", description="Подсчет общего количества: точный, оценка планировщика или без подсчета"
+    )
 ):
-    return {"page": page, "size": size}
+    return {"page": page, "size": size, "count": count}
+
+async def estimate_count(db: AsyncSession, query: Query) -> int:
+    compiled = query.order_by(None).compile(
+        dialect=db.bind.dialect,
+        compile_kwargs={"literal_binds": True}
+    )
+    connection = await db.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+    plan = result.scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+async def paginate(db: AsyncSession, query: Query, count_query: Query, pagination: dict) -> dict:
+    page = pagination["page"]
+    size = pagination["size"]
+    count = pagination.get("count", "exact")
+    skip = (page - 1) * size
+
+    if count == "none":
+        result = await db.execute(query.offset(skip).limit(size + 1))
+        items = result.scalars().all()
+        return {
+            "items": items[:size],
+            "total": None,
+            "page": page,
+            "size": size,
+            "pages": None,
+            "has_more": len(items) > size,
+        }
+
+    if count == "estimated":
+        result = await db.execute(query.offset(skip).limit(size + 1))
+        rows = result.scalars().all()
+        items = rows[:size]
+        has_more = len(rows) > size
+        if not has_more and (items or page == 1):
+            total = skip + len(items)
+        else:
+            total = max(await estimate_count(db, query), skip + len(rows))
+    else:
+        result = await db.execute(query.offset(skip).limit(size))
+        items = result.scalars().all()
+        count_result = await db.execute(count_query)
+        total = count_result.scalar() or 0
+        has_more = page * size < total
+
+    pages = (total + size - 1) // size if total > 0 else 0
+
+    return {
+        "items": items,
+        "total": total,
+        "page": page,
+        "size": size,
+        "pages": pages,
+        "has_more": has_more,
+    }
+
+async def stream_json_list(db: AsyncSession, query: Query, schema, batch_size: int = STREAM_BATCH_SIZE):
+    result = await db.stream_scalars(query.execution_options(yield_per=batch_size))
+    separator = b"["
+    async for partition in result.partitions():
+        yield separator + b",".join(schema.model_validate(item).model_dump_json().encode() for item in partition)
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
 
 def apply_filters(query: Query, filters: TransactionFilters) -> Query:
     if filters.name:
         query = query.where(Transaction.name == filters.name)
     if filters.type:
         query = query.where(Transaction.type == filters.type)
+    if filters.types:
+        query = query.where(Transaction.type.in_(filters.types))
     if filters.category:
-        query = query.where(Transaction.category == filters.category)
+        query = query.where(Transaction.category_id.in_(
+            select(Category.id).where(Category.name == filters.category)
+        ))
+    if filters.categories:
+        query = query.where(Transaction.category_id.in_(
+            select(Category.id).where(Category.name.in_(filters.categories))
+        ))
     if filters.amount:
         query = query.where(Transaction.amount >= filters.amount)
+    if filters.amount_min is not None:
+        query = query.where(Transaction.amount >= filters.amount_min)
+    if filters.amount_max is not None:
+        query = query.where(Transaction.amount <= filters.amount_max)
     if filters.transaction_datetime:
         query = query.where(Transaction.transaction_datetime >= filters.transaction_datetime)
+    if filters.date_from:
+        query = query.where(Transaction.transaction_datetime >= filters.date_from)
+    if filters.date_to:
+        query = query.where(Transaction.transaction_datetime < filters.date_to)
     if filters.user_id:
         query = query.where(Transaction.user_id == filters.user_id)
     if filters.group_ids:
-        query = query.join(Transaction.groups).where(Group.id.in_(filters.group_ids)).distinct()
+        query = query.where(
+            exists().where(
+                transaction_group_association.c.transaction_id == Transaction.id,
+                transaction_group_association.c.group_id.in_(filters.group_ids)
+            )
+        )
 
     return query
 
+def apply_list_filters(query: Query, filters: TransactionFilters) -> Query:
+    entry = TransactionListEntry
+    if filters.name:
+        query = query.where(entry.name == filters.name)
+    if filters.type:
+        query = query.where(entry.type == filters.type)
+    if filters.types:
+        query = query.where(entry.type.in_(filters.types))
+    if filters.category:
+        query = query.where(entry.category == filters.category)
+    if filters.categories:
+        query = query.where(entry.category.in_(filters.categories))
+    if filters.amount:
+        query = query.where(entry.amount >= filters.amount)
+    if filters.amount_min is not None:
+        query = query.where(entry.amount >= filters.amount_min)
+    if filters.amount_max is not None:
+        query = query.where(entry.amount <= filters.amount_max)
+    if filters.transaction_datetime:
+        query = query.where(entry.transaction_datetime >= filters.transaction_datetime)
+    if filters.date_from:
+        query = query.where(entry.transaction_datetime >= filters.date_from)
+    if filters.date_to:
+        query = query.where(entry.transaction_datetime < filters.date_to)
+    if filters.user_id:
+        query = query.where(entry.user_id == filters.user_id)
+    if filters.group_ids:
+        query = query.where(entry.group_ids.overlap(filters.group_ids))
+
+    return query
@@ -0,0 +1,57 @@
+"""budgets
+
+Revision ID: 121ea60c67e7
+Revises: f1702b9ddf06
+Create Date: 2026-10-19 15:12:08.331954
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '121ea60c67e7'
+down_revision: Union[str, Sequence[str], None] = 'f1702b9ddf06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('budgets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_budgets_user_id_category_id', 'budgets', ['user_id', 'category_id'], unique=True)
+
+    op.create_table('budget_usage',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), server_default=sa.text('0'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'category_id', 'month')
+    )
+
+    op.execute("""
+        INSERT INTO budget_usage (user_id, category_id, month, amount)
+        SELECT user_id, category_id, date_trunc('month', transaction_datetime, 'UTC'), sum(amount)
+        FROM transactions
+        WHERE type = 'expense'
+        GROUP BY user_id, category_id, date_trunc('month', transaction_datetime, 'UTC')
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('budget_usage')
+    op.drop_index('ix_budgets_user_id_category_id', table_name='budgets')
+    op.drop_table('budgets')
@@ -0,0 +1,60 @@
+"""categories
+
+Revision ID: 180633c4e0f0
+Revises: f4c2dd737e3b
+Create Date: 2026-10-19 11:48:05.530271
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '180633c4e0f0'
+down_revision: Union[str, Sequence[str], None] = 'f4c2dd737e3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_categories_user_id_name', 'categories', ['user_id', 'name'], unique=True)
+
+    op.add_column('transactions', sa.Column('category_id', sa.Integer(), nullable=True))
+    op.execute(
+        "INSERT INTO categories (user_id, name) "
+        "SELECT DISTINCT user_id, category FROM transactions"
+    )
+    op.execute(
+        "UPDATE transactions SET category_id = categories.id "
+        "FROM categories "
+        "WHERE categories.user_id = transactions.user_id AND categories.name = transactions.category"
+    )
+    op.alter_column('transactions', 'category_id', nullable=False)
+    op.create_foreign_key('transactions_category_id_fkey', 'transactions', 'categories', ['category_id'], ['id'])
+    op.create_index('ix_transactions_user_id_category_id', 'transactions', ['user_id', 'category_id'], unique=False)
+    op.drop_column('transactions', 'category')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('transactions', sa.Column('category', sa.String(), nullable=True))
+    op.execute(
+        "UPDATE transactions SET category = categories.name "
+        "FROM categories WHERE categories.id = transactions.category_id"
+    )
+    op.alter_column('transactions', 'category', nullable=False)
+    op.drop_index('ix_transactions_user_id_category_id', table_name='transactions')
+    op.drop_constraint('transactions_category_id_fkey', 'transactions', type_='foreignkey')
+    op.drop_column('transactions', 'category_id')
+    op.drop_index('ix_categories_user_id_name', table_name='categories')
+    op.drop_table('categories')
@@ -0,0 +1,54 @@
+"""archive group ids
+
+Revision ID: 2e8b4f1c7a90
+Revises: 7b3e0d5a9c61
+Create Date: 2026-10-20 10:12:05.647318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import os
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e8b4f1c7a90'
+down_revision: Union[str, Sequence[str], None] = '7b3e0d5a9c61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('transaction_archives', sa.Column('group_ids', postgresql.ARRAY(sa.Integer()),
+                                                    server_default=sa.text("'{}'"), nullable=False))
+    op.create_index('ix_transaction_archives_group_ids', 'transaction_archives', ['group_ids'],
+                    unique=False, postgresql_using='gin')
+
+    connection = op.get_bind()
+    archives = connection.execute(sa.text("SELECT id, path FROM transaction_archives")).all()
+    if not archives:
+        return
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    for archive_id, path in archives:
+        if not os.path.exists(path):
+            print(f"Файл архива {path} не найден, group_ids не заполнены")
+            continue
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        group_ids = sorted(pc.unique(pc.list_flatten(table.column("group_ids"))).to_pylist())
+        connection.execute(
+            sa.text("UPDATE transaction_archives SET group_ids = :group_ids WHERE id = :id"),
+            {"group_ids": group_ids, "id": archive_id}
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transaction_archives_group_ids', table_name='transaction_archives',
+                  postgresql_using='gin')
+    op.drop_column('transaction_archives', 'group_ids')
@@ -0,0 +1,43 @@
+"""sync xact ids
+
+Revision ID: 4c7a2d9e1b58
+Revises: 9d41c6a2e7b5
+Create Date: 2026-10-20 14:05:12.381946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c7a2d9e1b58'
+down_revision: Union[str, Sequence[str], None] = '9d41c6a2e7b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CURRENT_XACT_ID = "pg_current_xact_id()::text::bigint"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('transactions', 'transaction_tombstones'):
+        op.add_column(table, sa.Column('xact_id', sa.BigInteger(), server_default=sa.text('0'), nullable=False))
+        op.alter_column(table, 'xact_id', server_default=sa.text(CURRENT_XACT_ID))
+    op.create_index('ix_transactions_user_id_xact_id_version', 'transactions',
+                    ['user_id', 'xact_id', 'version'], unique=False)
+    op.create_index('ix_transaction_tombstones_user_id_xact_id_version', 'transaction_tombstones',
+                    ['user_id', 'xact_id', 'version'], unique=False)
+    op.create_index('ix_transaction_tombstones_deleted_at', 'transaction_tombstones', ['deleted_at'], unique=False)
+    op.add_column('users', sa.Column('tombstones_purged_xact_id', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'tombstones_purged_xact_id')
+    op.drop_index('ix_transaction_tombstones_deleted_at', table_name='transaction_tombstones')
+    op.drop_index('ix_transaction_tombstones_user_id_xact_id_version', table_name='transaction_tombstones')
+    op.drop_index('ix_transactions_user_id_xact_id_version', table_name='transactions')
+    for table in ('transaction_tombstones', 'transactions'):
+        op.drop_column(table, 'xact_id')
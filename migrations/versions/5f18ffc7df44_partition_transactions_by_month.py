@@ -0,0 +1,124 @@
+"""partition transactions by month
+
+Revision ID: 5f18ffc7df44
+Revises: 180633c4e0f0
+Create Date: 2026-10-19 12:31:52.804417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f18ffc7df44'
+down_revision: Union[str, Sequence[str], None] = '180633c4e0f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_constraint('transaction_group_association_transaction_id_fkey',
+                       'transaction_group_association', type_='foreignkey')
+
+    op.rename_table('transactions', 'transactions_old')
+    op.execute("ALTER TABLE transactions_old RENAME CONSTRAINT transactions_pkey TO transactions_old_pkey")
+    op.drop_index('ix_transactions_id', table_name='transactions_old')
+    op.drop_index('ix_transactions_user_id_transaction_datetime', table_name='transactions_old')
+    op.drop_index('ix_transactions_user_id_category_id', table_name='transactions_old')
+
+    op.execute(
+        "CREATE TABLE transactions (LIKE transactions_old INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (transaction_datetime)"
+    )
+    op.create_primary_key('transactions_pkey', 'transactions', ['id', 'transaction_datetime'])
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id")
+
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month_start timestamptz;
+            last_month timestamptz := date_trunc('month', now(), 'UTC') + interval '{PARTITIONS_AHEAD} months';
+        BEGIN
+            SELECT COALESCE(date_trunc('month', min(transaction_datetime), 'UTC'), date_trunc('month', now(), 'UTC'))
+            INTO month_start FROM transactions_old;
+
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF transactions FOR VALUES FROM (%L) TO (%L)',
+                    'transactions_' || to_char(month_start AT TIME ZONE 'UTC', 'YYYY_MM'),
+                    month_start,
+                    month_start + interval '1 month'
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END $$;
+    """)
+    op.execute("CREATE TABLE transactions_default PARTITION OF transactions DEFAULT")
+
+    op.execute("INSERT INTO transactions SELECT * FROM transactions_old")
+    op.drop_table('transactions_old')
+
+    op.create_index('ix_transactions_id', 'transactions', ['id'], unique=False)
+    op.create_index('ix_transactions_user_id_transaction_datetime', 'transactions',
+                    ['user_id', 'transaction_datetime'], unique=False)
+    op.create_index('ix_transactions_user_id_category_id', 'transactions',
+                    ['user_id', 'category_id'], unique=False)
+    op.create_foreign_key('transactions_user_id_fkey', 'transactions', 'users',
+                          ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('transactions_category_id_fkey', 'transactions', 'categories',
+                          ['category_id'], ['id'])
+
+    # A foreign key to a partitioned table has to include the partition key,
+    # so links of deleted transactions are removed by a trigger instead.
+    # Rows moved between partitions by an UPDATE still exist when the
+    # AFTER DELETE trigger fires, so their links are kept.
+    op.execute("""
+        CREATE FUNCTION delete_transaction_group_links() RETURNS trigger AS $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM transactions WHERE id = OLD.id) THEN
+                DELETE FROM transaction_group_association WHERE transaction_id = OLD.id;
+            END IF;
+            RETURN OLD;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        "CREATE TRIGGER transactions_delete_group_links AFTER DELETE ON transactions "
+        "FOR EACH ROW EXECUTE FUNCTION delete_transaction_group_links()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER transactions_delete_group_links ON transactions")
+    op.execute("DROP FUNCTION delete_transaction_group_links()")
+
+    op.rename_table('transactions', 'transactions_partitioned')
+    op.execute("ALTER TABLE transactions_partitioned RENAME CONSTRAINT transactions_pkey TO transactions_partitioned_pkey")
+    op.drop_index('ix_transactions_id', table_name='transactions_partitioned')
+    op.drop_index('ix_transactions_user_id_transaction_datetime', table_name='transactions_partitioned')
+    op.drop_index('ix_transactions_user_id_category_id', table_name='transactions_partitioned')
+
+    op.execute("CREATE TABLE transactions (LIKE transactions_partitioned INCLUDING DEFAULTS)")
+    op.create_primary_key('transactions_pkey', 'transactions', ['id'])
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id")
+    op.execute("INSERT INTO transactions SELECT * FROM transactions_partitioned")
+    op.execute("DROP TABLE transactions_partitioned CASCADE")
+
+    op.create_index('ix_transactions_id', 'transactions', ['id'], unique=False)
+    op.create_index('ix_transactions_user_id_transaction_datetime', 'transactions',
+                    ['user_id', 'transaction_datetime'], unique=False)
+    op.create_index('ix_transactions_user_id_category_id', 'transactions',
+                    ['user_id', 'category_id'], unique=False)
+    op.create_foreign_key('transactions_user_id_fkey', 'transactions', 'users',
+                          ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('transactions_category_id_fkey', 'transactions', 'categories',
+                          ['category_id'], ['id'])
+    op.create_foreign_key('transaction_group_association_transaction_id_fkey',
+                          'transaction_group_association', 'transactions',
+                          ['transaction_id'], ['id'])
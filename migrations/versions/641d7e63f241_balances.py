@@ -0,0 +1,57 @@
+"""balances
+
+Revision ID: 641d7e63f241
+Revises: 121ea60c67e7
+Create Date: 2026-10-19 16:04:51.220937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '641d7e63f241'
+down_revision: Union[str, Sequence[str], None] = '121ea60c67e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('balances',
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('total_income', sa.Numeric(precision=14, scale=2), server_default=sa.text('0'), nullable=False),
+    sa.Column('total_expense', sa.Numeric(precision=14, scale=2), server_default=sa.text('0'), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'owner_id')
+    )
+
+    # Archived transactions live in Arrow files, run `python -m app.balances --fix`
+    # after upgrading to add them.
+    op.execute("""
+        INSERT INTO balances (kind, owner_id, total_income, total_expense, transaction_count)
+        SELECT 'user', user_id,
+               sum(CASE WHEN type = 'income' THEN amount ELSE 0 END),
+               sum(CASE WHEN type = 'expense' THEN amount ELSE 0 END),
+               count(*)
+        FROM transactions
+        GROUP BY user_id
+    """)
+    op.execute("""
+        INSERT INTO balances (kind, owner_id, total_income, total_expense, transaction_count)
+        SELECT 'group', links.group_id,
+               sum(CASE WHEN type = 'income' THEN amount ELSE 0 END),
+               sum(CASE WHEN type = 'expense' THEN amount ELSE 0 END),
+               count(*)
+        FROM transactions
+        JOIN transaction_group_association links ON links.transaction_id = transactions.id
+        GROUP BY links.group_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('balances')
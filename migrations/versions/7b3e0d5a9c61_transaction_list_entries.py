@@ -0,0 +1,82 @@
+"""transaction list entries
+
+Revision ID: 7b3e0d5a9c61
+Revises: c81d5f3e9a24
+Create Date: 2026-10-19 22:31:40.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e0d5a9c61'
+down_revision: Union[str, Sequence[str], None] = 'c81d5f3e9a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = """transaction_id, user_id, name, type, category, amount, description, is_recurring,
+           recurring_period_days, transaction_datetime, updated_at, version, group_ids, group_names"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('transaction_list_entries',
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('transaction_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('type', postgresql.ENUM('income', 'expense', name='transactiontype', create_type=False), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('is_recurring', sa.Boolean(), nullable=False),
+    sa.Column('recurring_period_days', sa.Integer(), nullable=True),
+    sa.Column('transaction_datetime', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('group_ids', postgresql.ARRAY(sa.Integer()), server_default=sa.text("'{}'"), nullable=False),
+    sa.Column('group_names', postgresql.ARRAY(sa.String()), server_default=sa.text("'{}'"), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'owner_id', 'transaction_id')
+    )
+
+    op.execute(f"""
+        INSERT INTO transaction_list_entries (kind, owner_id, {COLUMNS})
+        WITH entry_transactions AS (
+            SELECT transactions.id AS transaction_id, transactions.user_id, transactions.name, transactions.type,
+                   categories.name AS category, transactions.amount, transactions.description,
+                   transactions.is_recurring, transactions.recurring_period_days,
+                   transactions.transaction_datetime, transactions.updated_at, transactions.version,
+                   coalesce(entry_groups.group_ids, '{{}}') AS group_ids,
+                   coalesce(entry_groups.group_names, '{{}}') AS group_names
+            FROM transactions
+            JOIN categories ON categories.id = transactions.category_id
+            LEFT JOIN (
+                SELECT links.transaction_id,
+                       array_agg(links.group_id ORDER BY links.group_id) AS group_ids,
+                       array_agg(groups.name ORDER BY links.group_id) AS group_names
+                FROM transaction_group_association links
+                JOIN groups ON groups.id = links.group_id
+                GROUP BY links.transaction_id
+            ) entry_groups ON entry_groups.transaction_id = transactions.id
+        )
+        SELECT 'user', user_id, {COLUMNS} FROM entry_transactions
+        UNION ALL
+        SELECT 'group', unnest(group_ids), {COLUMNS} FROM entry_transactions
+    """)
+
+    op.create_index('ix_transaction_list_entries_scope', 'transaction_list_entries',
+                    ['kind', 'owner_id', 'transaction_datetime'], unique=False)
+    op.create_index('ix_transaction_list_entries_transaction_id', 'transaction_list_entries',
+                    ['transaction_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transaction_list_entries_transaction_id', table_name='transaction_list_entries')
+    op.drop_index('ix_transaction_list_entries_scope', table_name='transaction_list_entries')
+    op.drop_table('transaction_list_entries')
@@ -0,0 +1,43 @@
+"""change events
+
+Revision ID: 9c3e51a0b7d2
+Revises: 641d7e63f241
+Create Date: 2026-10-19 17:21:37.504118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e51a0b7d2'
+down_revision: Union[str, Sequence[str], None] = '641d7e63f241'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('change_events',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.String(length=20), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('group_ids', postgresql.ARRAY(sa.Integer()), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('dispatched_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_change_events_pending', 'change_events', ['id'], unique=False,
+                    postgresql_where=sa.text('dispatched_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_change_events_pending', table_name='change_events',
+                  postgresql_where=sa.text('dispatched_at IS NULL'))
+    op.drop_table('change_events')
@@ -0,0 +1,30 @@
+"""deletion job attempts
+
+Revision ID: 9d41c6a2e7b5
+Revises: 2e8b4f1c7a90
+Create Date: 2026-10-20 10:48:27.903115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d41c6a2e7b5'
+down_revision: Union[str, Sequence[str], None] = '2e8b4f1c7a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('deletion_jobs', sa.Column('attempts', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.add_column('deletion_jobs', sa.Column('run_after', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('deletion_jobs', 'run_after')
+    op.drop_column('deletion_jobs', 'attempts')
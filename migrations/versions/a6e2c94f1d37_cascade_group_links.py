@@ -0,0 +1,64 @@
+"""cascade group links
+
+Revision ID: a6e2c94f1d37
+Revises: f3a19c7d2b58
+Create Date: 2026-10-19 21:03:52.771940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6e2c94f1d37'
+down_revision: Union[str, Sequence[str], None] = 'f3a19c7d2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FOREIGN_KEYS = [
+    ('transaction_group_association_group_id_fkey', 'transaction_group_association', 'groups', 'group_id'),
+    ('user_group_association_group_id_fkey', 'user_group_association', 'groups', 'group_id'),
+    ('user_group_association_user_id_fkey', 'user_group_association', 'users', 'user_id'),
+]
+
+
+def replace_foreign_keys(ondelete: str | None) -> None:
+    for name, table, referent, column in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referent, [column], ['id'], ondelete=ondelete, postgresql_not_valid=True)
+
+    # Validate outside the DDL transaction so the scan holds only a SHARE UPDATE EXCLUSIVE lock.
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in FOREIGN_KEYS:
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('deletion_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('target_id', sa.Integer(), nullable=False),
+    sa.Column('requested_by', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=20), server_default=sa.text("'pending'"), nullable=False),
+    sa.Column('deleted_rows', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['requested_by'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_deletion_jobs_active', 'deletion_jobs', ['id'], unique=False,
+                    postgresql_where=sa.text("status IN ('pending', 'running')"))
+    replace_foreign_keys('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_deletion_jobs_active', table_name='deletion_jobs',
+                  postgresql_where=sa.text("status IN ('pending', 'running')"))
+    op.drop_table('deletion_jobs')
+    replace_foreign_keys(None)
@@ -0,0 +1,45 @@
+"""group events notify
+
+Revision ID: b84f2c6d1e93
+Revises: 9c3e51a0b7d2
+Create Date: 2026-10-19 18:02:44.917305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b84f2c6d1e93'
+down_revision: Union[str, Sequence[str], None] = '9c3e51a0b7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_group_events() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('group_events', json_build_object(
+                'id', NEW.id, 'entity', NEW.entity, 'entity_id', NEW.entity_id,
+                'action', NEW.action, 'user_id', NEW.user_id, 'group_ids', NEW.group_ids
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER change_events_notify_groups
+        AFTER INSERT ON change_events
+        FOR EACH ROW WHEN (cardinality(NEW.group_ids) > 0)
+        EXECUTE FUNCTION notify_group_events()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER change_events_notify_groups ON change_events")
+    op.execute("DROP FUNCTION notify_group_events()")
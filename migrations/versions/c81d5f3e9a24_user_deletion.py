@@ -0,0 +1,28 @@
+"""user deletion
+
+Revision ID: c81d5f3e9a24
+Revises: a6e2c94f1d37
+Create Date: 2026-10-19 21:48:09.315662
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81d5f3e9a24'
+down_revision: Union[str, Sequence[str], None] = 'a6e2c94f1d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'deleted_at')
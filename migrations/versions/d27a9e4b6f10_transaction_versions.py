@@ -0,0 +1,49 @@
+"""transaction versions
+
+Revision ID: d27a9e4b6f10
+Revises: b84f2c6d1e93
+Create Date: 2026-10-19 18:47:12.603114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd27a9e4b6f10'
+down_revision: Union[str, Sequence[str], None] = 'b84f2c6d1e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE SEQUENCE transaction_version_seq")
+    op.add_column('transactions', sa.Column('updated_at', sa.DateTime(timezone=True),
+                                            server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False))
+    op.add_column('transactions', sa.Column('version', sa.BigInteger(),
+                                            server_default=sa.text("nextval('transaction_version_seq')"),
+                                            nullable=False))
+    op.create_index('ix_transactions_user_id_version', 'transactions', ['user_id', 'version'], unique=False)
+
+    op.create_table('transaction_tombstones',
+    sa.Column('transaction_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), server_default=sa.text("nextval('transaction_version_seq')"), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('transaction_id')
+    )
+    op.create_index('ix_transaction_tombstones_user_id_version', 'transaction_tombstones', ['user_id', 'version'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transaction_tombstones_user_id_version', table_name='transaction_tombstones')
+    op.drop_table('transaction_tombstones')
+    op.drop_index('ix_transactions_user_id_version', table_name='transactions')
+    op.drop_column('transactions', 'version')
+    op.drop_column('transactions', 'updated_at')
+    op.execute("DROP SEQUENCE transaction_version_seq")
@@ -0,0 +1,32 @@
+"""transactions user datetime index
+
+Revision ID: d5abd9a08629
+Revises: e6f7a07cca8c
+Create Date: 2026-10-19 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5abd9a08629'
+down_revision: Union[str, Sequence[str], None] = 'e6f7a07cca8c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_transactions_user_id_transaction_datetime', 'transactions',
+                    ['user_id', 'transaction_datetime'], unique=False)
+    op.create_index('ix_transaction_group_association_group_id', 'transaction_group_association',
+                    ['group_id', 'transaction_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transaction_group_association_group_id', table_name='transaction_group_association')
+    op.drop_index('ix_transactions_user_id_transaction_datetime', table_name='transactions')
@@ -0,0 +1,42 @@
+"""transaction archives
+
+Revision ID: f1702b9ddf06
+Revises: 5f18ffc7df44
+Create Date: 2026-10-19 13:40:26.914053
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1702b9ddf06'
+down_revision: Union[str, Sequence[str], None] = '5f18ffc7df44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('transaction_archives',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('archived_before', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('min_datetime', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('max_datetime', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_transaction_archives_user_id_max_datetime', 'transaction_archives',
+                    ['user_id', 'max_datetime'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transaction_archives_user_id_max_datetime', table_name='transaction_archives')
+    op.drop_table('transaction_archives')
@@ -0,0 +1,52 @@
+"""group versions
+
+Revision ID: f3a19c7d2b58
+Revises: d27a9e4b6f10
+Create Date: 2026-10-19 20:14:36.208419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a19c7d2b58'
+down_revision: Union[str, Sequence[str], None] = 'd27a9e4b6f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('groups', sa.Column('version', sa.BigInteger(), server_default=sa.text('1'), nullable=False))
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_group_versions() RETURNS trigger AS $$
+        BEGIN
+            UPDATE groups SET version = groups.version + 1
+            FROM (
+                SELECT id FROM groups
+                WHERE id IN (SELECT unnest(group_ids) FROM inserted_events)
+                ORDER BY id
+                FOR UPDATE
+            ) locked
+            WHERE groups.id = locked.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER change_events_bump_group_versions
+        AFTER INSERT ON change_events
+        REFERENCING NEW TABLE AS inserted_events
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION bump_group_versions()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER change_events_bump_group_versions ON change_events")
+    op.execute("DROP FUNCTION bump_group_versions()")
+    op.drop_column('groups', 'version')
@@ -0,0 +1,233 @@
+"""
+Тесты кэша аналитики (Analytics Cache Tests)
+
+Кэш используется в эндпоинтах:
+- GET /api/auth/me/statistics - Статистика пользователя
+- GET /api/groups/{group_id}/statistics - Статистика группы
+"""
+import pytest
+from datetime import datetime, timezone
+from httpx import AsyncClient
+from app.analytics import AnalyticsCache, ScopeData, analytics_cache
+from app.models import Transaction, TransactionType
+from app.schemas import TransactionFilters
+
+
+async def add_transactions(db_session, user_id, items, groups=()):
+    for transaction_type, category, amount, when in items:
+        transaction = Transaction(
+            name="Test",
+            type=transaction_type,
+            category=category,
+            amount=amount,
+            transaction_datetime=when,
+            user_id=user_id
+        )
+        transaction.groups.extend(groups)
+        db_session.add(transaction)
+    await db_session.commit()
+
+
+ITEMS = [
+    (TransactionType.expense, "Food", 10.25, datetime(2026, 1, 5, tzinfo=timezone.utc)),
+    (TransactionType.expense, "Food", 15, datetime(2026, 2, 7, tzinfo=timezone.utc)),
+    (TransactionType.expense, "Transport", 5, datetime(2026, 2, 9, tzinfo=timezone.utc)),
+    (TransactionType.income, "Work", 100, datetime(2026, 2, 10, tzinfo=timezone.utc)),
+]
+
+
+def by_key(items, key):
+    return {item[key]: item["amount"] for item in items}
+
+
+class TestCachedStatistics:
+    """Тесты совпадения статистики из кэша и из SQL"""
+
+    @pytest.mark.parametrize("params", [
+        {},
+        {"period": "day"},
+        {"type": "expense"},
+        {"category": "Food"},
+        {"amount_min": 10, "amount_max": 15},
+        {"date_from": "2026-02-01T00:00:00Z", "date_to": "2026-02-09T00:00:00Z"},
+    ])
+    async def test_cache_matches_sql(
+        self, client: AsyncClient, auth_headers, test_user, db_session, monkeypatch, params
+    ):
+        """Кэш возвращает те же значения, что и SQL-запросы"""
+        await add_transactions(db_session, test_user.id, ITEMS)
+
+        monkeypatch.setattr(analytics_cache, "max_rows", 0)
+        sql_response = await client.get("/api/auth/me/statistics", params=params, headers=auth_headers)
+        monkeypatch.undo()
+        cached_response = await client.get("/api/auth/me/statistics", params=params, headers=auth_headers)
+
+        assert ("user", test_user.id) in analytics_cache.scopes
+        sql_data, cached_data = sql_response.json(), cached_response.json()
+        assert cached_data["total_count_of_transactions"] == sql_data["total_count_of_transactions"]
+        assert float(cached_data["balance"]) == float(sql_data["balance"])
+        assert float(cached_data["total_expense"]) == float(sql_data["total_expense"])
+        assert by_key(cached_data["grouped_by_category_expense"], "category") == \
+            by_key(sql_data["grouped_by_category_expense"], "category")
+        assert by_key(cached_data["grouped_by_period_expense"], "period") == \
+            by_key(sql_data["grouped_by_period_expense"], "period")
+
+    async def test_name_filter_uses_sql(self, client: AsyncClient, auth_headers, test_user, db_session):
+        """Фильтр по имени не поддерживается кэшем"""
+        await add_transactions(db_session, test_user.id, ITEMS)
+
+        response = await client.get("/api/auth/me/statistics", params={"name": "Test"}, headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["total_count_of_transactions"] == 4
+        assert ("user", test_user.id) not in analytics_cache.scopes
+
+    async def test_group_statistics_cached(
+        self, client: AsyncClient, auth_headers, test_user, test_group, db_session
+    ):
+        """Статистика группы берется из кэша группы"""
+        await add_transactions(db_session, test_user.id, ITEMS[:2], groups=[test_group])
+        await add_transactions(db_session, test_user.id, ITEMS[2:])
+
+        response = await client.get(f"/api/groups/{test_group.id}/statistics", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_transactions"] == 2
+        assert by_key(data["grouped_by_category_expense"], "category") == {"Food": 25.25}
+        assert ("group", test_group.id) in analytics_cache.scopes
+
+
+class TestCacheUpdates:
+    """Тесты обновления кэша при изменении транзакций"""
+
+    async def test_create_update_delete(self, client: AsyncClient, auth_headers, test_user, db_session):
+        """Создание, изменение и удаление транзакции отражаются в кэше"""
+        await add_transactions(db_session, test_user.id, ITEMS)
+        await client.get("/api/auth/me/statistics", headers=auth_headers)
+
+        response = await client.post(
+            "/api/transactions",
+            json={"name": "Cafe", "type": "expense", "category": "Food", "amount": 4.75},
+            headers=auth_headers
+        )
+        transaction_id = response.json()["id"]
+        data = (await client.get("/api/auth/me/statistics", headers=auth_headers)).json()
+        assert data["total_count_of_transactions"] == 5
+        assert by_key(data["grouped_by_category_expense"], "category")["Food"] == 30
+
+        await client.put(
+            f"/api/transactions/{transaction_id}",
+            json={"category": "Cafe", "amount": 6},
+            headers=auth_headers
+        )
+        data = (await client.get("/api/auth/me/statistics", headers=auth_headers)).json()
+        by_category = by_key(data["grouped_by_category_expense"], "category")
+        assert by_category["Food"] == 25.25
+        assert by_category["Cafe"] == 6
+
+        await client.delete(f"/api/transactions/{transaction_id}", headers=auth_headers)
+        data = (await client.get("/api/auth/me/statistics", headers=auth_headers)).json()
+        assert data["total_count_of_transactions"] == 4
+        assert "Cafe" not in by_key(data["grouped_by_category_expense"], "category")
+
+    async def test_bulk_delete_invalidates(self, client: AsyncClient, auth_headers, test_user, db_session):
+        """Массовое удаление сбрасывает кэш пользователя"""
+        await add_transactions(db_session, test_user.id, ITEMS)
+        await client.get("/api/auth/me/statistics", headers=auth_headers)
+
+        await client.request(
+            "DELETE", "/api/transactions/bulk", params={"category": "Food"}, headers=auth_headers
+        )
+
+        assert ("user", test_user.id) not in analytics_cache.scopes
+        data = (await client.get("/api/auth/me/statistics", headers=auth_headers)).json()
+        assert data["total_count_of_transactions"] == 2
+
+
+class TestAnalyticsCache:
+    """Тесты ограничений кэша"""
+
+    async def test_lru_eviction(self, db_session, test_user, test_user2):
+        """Самая давно использованная область вытесняется"""
+        cache = AnalyticsCache(max_scopes=1)
+        filters = TransactionFilters()
+
+        await cache.statistics(db_session, ("user", test_user.id), filters, "month")
+        await cache.statistics(db_session, ("user", test_user2.id), filters, "month")
+
+        assert list(cache.scopes) == [("user", test_user2.id)]
+
+    async def test_oversized_scope_not_cached(self, db_session, test_user):
+        """Слишком большая область не загружается в кэш"""
+        await add_transactions(db_session, test_user.id, ITEMS)
+        cache = AnalyticsCache(max_rows=3)
+
+        stats = await cache.statistics(db_session, ("user", test_user.id), TransactionFilters(), "month")
+
+        assert stats is None
+        assert not cache.scopes
+
+    async def test_expired_scope_reloaded(self, db_session, test_user):
+        """Устаревшая область перечитывается из базы"""
+        cache = AnalyticsCache(ttl=-1)
+        filters = TransactionFilters()
+
+        await cache.statistics(db_session, ("user", test_user.id), filters, "month")
+        version = await cache.scope_version(db_session, ("user", test_user.id))
+
+        assert cache.get(("user", test_user.id), version) is None
+
+
+class TestCacheVersions:
+    """Тесты проверки версии области при чтении из кэша"""
+
+    async def test_write_without_invalidation_reloads(self, db_session, test_user):
+        """Запись другого процесса видна без сброса кэша"""
+        cache = AnalyticsCache()
+        scope = ("user", test_user.id)
+        await add_transactions(db_session, test_user.id, ITEMS[:2])
+        await cache.statistics(db_session, scope, TransactionFilters(), "month")
+
+        await add_transactions(db_session, test_user.id, ITEMS[2:])
+        stats = await cache.statistics(db_session, scope, TransactionFilters(), "month")
+
+        assert stats["total_count"] == 4
+
+    async def test_delete_without_invalidation_reloads(self, db_session, test_user):
+        """Удаление другим процессом меняет версию области"""
+        cache = AnalyticsCache()
+        scope = ("user", test_user.id)
+        await add_transactions(db_session, test_user.id, ITEMS)
+        await cache.statistics(db_session, scope, TransactionFilters(), "month")
+
+        transaction = await db_session.get(Transaction, cache.scopes[scope].ids[0].item())
+        await db_session.delete(transaction)
+        await db_session.commit()
+        stats = await cache.statistics(db_session, scope, TransactionFilters(), "month")
+
+        assert stats["total_count"] == 3
+
+    async def test_group_write_without_invalidation_reloads(self, db_session, test_user, test_group):
+        """Запись в группу другим процессом меняет версию группы"""
+        cache = AnalyticsCache()
+        scope = ("group", test_group.id)
+        await add_transactions(db_session, test_user.id, ITEMS[:1], groups=[test_group])
+        await cache.statistics(db_session, scope, TransactionFilters(), "month")
+
+        await add_transactions(db_session, test_user.id, ITEMS[1:], groups=[test_group])
+        stats = await cache.statistics(db_session, scope, TransactionFilters(), "month")
+
+        assert stats["total_count"] == 4
+
+    async def test_entry_loaded_before_write_not_served(self, db_session, test_user):
+        """Область, прочитанная до записи и сохраненная после, перечитывается"""
+        cache = AnalyticsCache()
+        scope = ("user", test_user.id)
+        version = await cache.scope_version(db_session, scope)
+        cache.put(scope, ScopeData([], {}, version))
+
+        await add_transactions(db_session, test_user.id, ITEMS)
+        stats = await cache.statistics(db_session, scope, TransactionFilters(), "month")
+
+        assert stats["total_count"] == 4
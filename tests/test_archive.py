@@ -0,0 +1,228 @@
+"""
+Тесты архивации старых транзакций (Archive Tests)
+
+Архивные транзакции должны прозрачно попадать в:
+- GET /api/transactions - Список транзакций пользователя
+- GET /api/transactions/group/{group_id} - Список транзакций группы
+- GET /api/auth/me/statistics - Статистика пользователя
+"""
+import pytest
+from datetime import datetime, timezone
+from httpx import AsyncClient
+from app import archive
+from app.models import Transaction, TransactionType
+
+
+@pytest.fixture(autouse=True)
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+async def archived_user(db_session, test_user, test_group):
+    old = Transaction(
+        name="Old expense",
+        type=TransactionType.expense,
+        category="Food",
+        amount=40.00,
+        transaction_datetime=datetime(2020, 1, 10, tzinfo=timezone.utc),
+        user_id=test_user.id
+    )
+    old.groups.append(test_group)
+    db_session.add_all([
+        old,
+        Transaction(
+            name="Old income",
+            type=TransactionType.income,
+            category="Salary",
+            amount=100.00,
+            transaction_datetime=datetime(2020, 2, 10, tzinfo=timezone.utc),
+            user_id=test_user.id
+        ),
+        Transaction(
+            name="Recent expense",
+            type=TransactionType.expense,
+            category="Food",
+            amount=10.00,
+            user_id=test_user.id
+        ),
+    ])
+    await db_session.commit()
+
+    archived = await archive.archive_user_transactions(
+        db_session, test_user.id, datetime(2021, 1, 1, tzinfo=timezone.utc)
+    )
+    assert archived == 2
+    return test_user
+
+
+class TestArchiveJob:
+    """Тесты переноса транзакций в архив"""
+
+    async def test_archived_rows_removed_from_table(self, db_session, archived_user, archive_dir):
+        """Архивные строки удаляются из таблицы и записываются в файл"""
+        from sqlalchemy import select, func
+        from app.models import TransactionArchive
+
+        count = await db_session.execute(select(func.count(Transaction.id)))
+        assert count.scalar() == 1
+
+        result = await db_session.execute(select(TransactionArchive))
+        archives = result.scalars().all()
+        assert len(archives) == 1
+        assert archives[0].row_count == 2
+        assert list(archive_dir.rglob("*.arrow"))
+
+    async def test_recurring_transactions_are_not_archived(self, db_session, test_user):
+        """Регулярные транзакции не архивируются"""
+        db_session.add(Transaction(
+            name="Rent",
+            type=TransactionType.expense,
+            category="Home",
+            amount=500.00,
+            transaction_datetime=datetime(2020, 1, 1, tzinfo=timezone.utc),
+            is_recurring=True,
+            recurring_period_days=30,
+            user_id=test_user.id
+        ))
+        await db_session.commit()
+
+        archived = await archive.archive_user_transactions(
+            db_session, test_user.id, datetime(2021, 1, 1, tzinfo=timezone.utc)
+        )
+        assert archived == 0
+
+
+class TestArchivedReads:
+    """Тесты чтения архивных транзакций через API"""
+
+    async def test_list_includes_archived(self, client: AsyncClient, auth_headers, archived_user):
+        """Архивные транзакции объединяются с актуальными по дате"""
+        response = await client.get("/api/transactions", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 3
+        assert [item["name"] for item in data["items"]] == ["Recent expense", "Old income", "Old expense"]
+
+    async def test_list_pagination_across_archive(self, client: AsyncClient, auth_headers, archived_user):
+        """Страница, начинающаяся внутри архива"""
+        response = await client.get("/api/transactions?page=2&size=2", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["pages"] == 2
+        assert [item["name"] for item in data["items"]] == ["Old expense"]
+
+    async def test_list_skips_archive_for_recent_range(
+        self, client: AsyncClient, auth_headers, archived_user
+    ):
+        """Фильтр по недавнему периоду не затрагивает архив"""
+        response = await client.get(
+            "/api/transactions", params={"date_from": "2024-01-01T00:00:00Z"}, headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 1
+
+    async def test_group_list_includes_archived(
+        self, client: AsyncClient, auth_headers, archived_user, test_group
+    ):
+        """Архивные транзакции группы"""
+        response = await client.get(f"/api/transactions/group/{test_group.id}", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["groups"][0]["id"] == test_group.id
+
+    async def test_statistics_include_archived(self, client: AsyncClient, auth_headers, archived_user):
+        """Статистика учитывает архивные транзакции"""
+        response = await client.get("/api/auth/me/statistics", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_count_of_transactions"] == 3
+        assert float(data["total_income"]) == 100
+        assert float(data["total_expense"]) == 50
+        by_category = {item["category"]: item["amount"] for item in data["grouped_by_category_expense"]}
+        assert by_category == {"Food": 50}
+
+    async def test_list_merges_by_datetime(
+        self, client: AsyncClient, auth_headers, archived_user, db_session
+    ):
+        """Старая регулярная транзакция стоит среди архивных по дате"""
+        db_session.add(Transaction(
+            name="Rent",
+            type=TransactionType.expense,
+            category="Home",
+            amount=500.00,
+            transaction_datetime=datetime(2020, 1, 20, tzinfo=timezone.utc),
+            is_recurring=True,
+            recurring_period_days=30,
+            user_id=archived_user.id
+        ))
+        await db_session.commit()
+
+        response = await client.get("/api/transactions", headers=auth_headers)
+        assert [item["name"] for item in response.json()["items"]] == [
+            "Recent expense", "Old income", "Rent", "Old expense"
+        ]
+
+        for count in ("exact", "estimated", "none"):
+            response = await client.get(f"/api/transactions?page=2&size=2&count={count}", headers=auth_headers)
+            data = response.json()
+            assert [item["name"] for item in data["items"]] == ["Rent", "Old expense"]
+            assert data["has_more"] is False
+
+    async def test_full_live_page_skips_archive_files(
+        self, client: AsyncClient, auth_headers, archived_user, db_session, monkeypatch
+    ):
+        """Полная страница актуальных транзакций без подсчета не читает архив"""
+        db_session.add(Transaction(
+            name="Another recent",
+            type=TransactionType.expense,
+            category="Food",
+            amount=5.00,
+            user_id=archived_user.id
+        ))
+        await db_session.commit()
+
+        def fail(path):
+            raise AssertionError("архив не должен читаться")
+
+        monkeypatch.setattr(archive, "read_archive_file", fail)
+        response = await client.get("/api/transactions?size=1&count=none", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["has_more"] is True
+
+    async def test_group_list_keeps_former_member_rows(
+        self, client: AsyncClient, auth_headers, test_user2, test_group, db_session
+    ):
+        """Архивные транзакции вышедшего участника остаются в группе"""
+        from sqlalchemy import delete
+        from app.models import user_group_association
+
+        test_group.users.append(test_user2)
+        old = Transaction(
+            name="Former member expense",
+            type=TransactionType.expense,
+            category="Food",
+            amount=15.00,
+            transaction_datetime=datetime(2020, 3, 1, tzinfo=timezone.utc),
+            user_id=test_user2.id
+        )
+        old.groups.append(test_group)
+        db_session.add(old)
+        await db_session.commit()
+        await archive.archive_user_transactions(db_session, test_user2.id, datetime(2021, 1, 1, tzinfo=timezone.utc))
+        test_group.users.remove(test_user2)
+        await db_session.commit()
+
+        response = await client.get(f"/api/transactions/group/{test_group.id}", headers=auth_headers)
+
+        assert [item["name"] for item in response.json()["items"]] == ["Former member expense"]
+        stats = await client.get(f"/api/groups/{test_group.id}/statistics", headers=auth_headers)
+        assert float(stats.json()["total_expense"]) == 15
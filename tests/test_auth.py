@@ -7,6 +7,9 @@
 - GET /api/auth/me - Просмотр пользователя
 - PUT /api/auth/change-password - Смена пароля
 - POST /api/auth/refresh-token - Обновление токена
+- GET /api/auth/me/statistics - Статистика пользователя
+- GET /api/auth/me/statistics/distribution - Распределение расходов пользователя
+- DELETE /api/auth/me - Удаление аккаунта
 """
 import pytest
 from httpx import AsyncClient
@@ -280,3 +283,286 @@ class TestRefreshToken:
         )
 
         assert response.status_code == 401
+
+
+class TestUserStatistics:
+    """Тесты статистики пользователя GET /api/auth/me/statistics"""
+
+    async def test_statistics_empty(self, client: AsyncClient, auth_headers):
+        """Статистика пользователя без транзакций"""
+        response = await client.get("/api/auth/me/statistics", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_count_of_transactions"] == 0
+        assert data["grouped_by_category_expense"] == []
+
+    async def test_statistics_grouped_by_category(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Группировка расходов по категориям"""
+        from app.models import Transaction, TransactionType
+
+        for category, amount in [("Food", 10), ("Food", 15), ("Transport", 5)]:
+            db_session.add(Transaction(
+                name="Expense",
+                type=TransactionType.expense,
+                category=category,
+                amount=amount,
+                user_id=test_user.id
+            ))
+        db_session.add(Transaction(
+            name="Salary",
+            type=TransactionType.income,
+            category="Work",
+            amount=100,
+            user_id=test_user.id
+        ))
+        await db_session.commit()
+
+        response = await client.get("/api/auth/me/statistics", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_count_of_transactions"] == 4
+        assert float(data["balance"]) == 70
+        by_category = {item["category"]: item["amount"] for item in data["grouped_by_category_expense"]}
+        assert by_category == {"Food": 25, "Transport": 5}
+
+    async def test_statistics_compare_previous_month(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Сравнение календарного месяца с предыдущим"""
+        from datetime import datetime, timezone
+        from app.models import Transaction, TransactionType
+
+        for transaction_type, category, amount, month in [
+            (TransactionType.expense, "Food", 10, 9),
+            (TransactionType.income, "Work", 80, 9),
+            (TransactionType.expense, "Food", 25, 10),
+            (TransactionType.expense, "Taxi", 5, 10),
+            (TransactionType.income, "Work", 100, 10),
+        ]:
+            db_session.add(Transaction(
+                name="Test",
+                type=transaction_type,
+                category=category,
+                amount=amount,
+                transaction_datetime=datetime(2026, month, 5, tzinfo=timezone.utc),
+                user_id=test_user.id
+            ))
+        await db_session.commit()
+
+        response = await client.get(
+            "/api/auth/me/statistics",
+            params={"compare": "previous", "date_from": "2026-10-01T00:00:00Z", "date_to": "2026-11-01T00:00:00Z"},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        comparison = response.json()["comparison"]
+        assert comparison["previous"]["date_from"].startswith("2026-09-01")
+        assert comparison["previous"]["date_to"].startswith("2026-10-01")
+        assert float(comparison["current"]["total_expense"]) == 30
+        assert float(comparison["previous"]["total_expense"]) == 10
+        assert float(comparison["delta"]["balance"]) == 0
+        assert comparison["delta"]["total_count"] == 1
+        by_category = {item["category"]: item for item in comparison["grouped_by_category_expense"]}
+        assert set(by_category) == {"Food", "Taxi"}
+        assert by_category["Food"]["delta"] == 15
+
+    async def test_statistics_compare_year_ago(
+        self, client: AsyncClient, auth_headers, test_user
+    ):
+        """Сравнение с тем же периодом годом ранее"""
+        response = await client.get(
+            "/api/auth/me/statistics",
+            params={"compare": "year_ago", "date_from": "2024-02-29T00:00:00Z", "date_to": "2024-03-10T00:00:00Z"},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        previous = response.json()["comparison"]["previous"]
+        assert previous["date_from"].startswith("2023-02-28")
+        assert previous["date_to"].startswith("2023-03-10")
+        assert previous["total_count"] == 0
+
+    async def test_statistics_compare_without_date_from(self, client: AsyncClient, auth_headers):
+        """Сравнение без начала периода"""
+        response = await client.get(
+            "/api/auth/me/statistics", params={"compare": "previous"}, headers=auth_headers
+        )
+
+        assert response.status_code == 400
+
+    async def test_statistics_unauthorized(self, client: AsyncClient):
+        """Статистика без авторизации"""
+        response = await client.get("/api/auth/me/statistics")
+
+        assert response.status_code == 403
+
+
+class TestStatisticsDistribution:
+    """Тесты распределения расходов GET /api/auth/me/statistics/distribution"""
+
+    async def add_expenses(self, db_session, user_id, items):
+        from datetime import datetime, timezone
+        from app.models import Transaction, TransactionType
+
+        for category, amount, month, day in items:
+            db_session.add(Transaction(
+                name="Expense",
+                type=TransactionType.expense,
+                category=category,
+                amount=amount,
+                transaction_datetime=datetime(2026, month, day, tzinfo=timezone.utc),
+                user_id=user_id
+            ))
+        await db_session.commit()
+
+    async def test_distribution_percentiles(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Медиана, p90 и среднее по категориям и периодам"""
+        await self.add_expenses(db_session, test_user.id, [
+            ("Food", 10, 1, 1), ("Food", 20, 1, 2), ("Food", 30, 1, 20), ("Food", 40, 2, 14), ("Taxi", 5, 1, 3),
+        ])
+
+        response = await client.get(
+            "/api/auth/me/statistics/distribution", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        food = next(item for item in data["by_category_expense"] if item["category"] == "Food")
+        assert food["count"] == 4
+        assert food["median"] == 25
+        assert food["p90"] == 37
+        assert food["average"] == 25
+        january = data["by_period_expense"][0]
+        assert january["period"].startswith("2026-01-01")
+        assert january["count"] == 4
+        assert january["median"] == 15
+
+    async def test_distribution_rolling_window(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Скользящая сумма учитывает только дни внутри окна"""
+        await self.add_expenses(db_session, test_user.id, [
+            ("Food", 10, 1, 1), ("Food", 20, 1, 5), ("Food", 30, 1, 20),
+        ])
+
+        response = await client.get(
+            "/api/auth/me/statistics/distribution",
+            params={"window_days": 7, "period": "day"},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["rolling_total"] for item in data["rolling_expense"]] == [10, 30, 30]
+        assert data["rolling_expense"][1]["rolling_average"] == 30 / 7
+        assert len(data["by_period_expense"]) == 3
+
+    async def test_distribution_filtered(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Фильтры применяются к распределению"""
+        await self.add_expenses(db_session, test_user.id, [("Food", 10, 1, 1), ("Taxi", 5, 1, 3)])
+
+        response = await client.get(
+            "/api/auth/me/statistics/distribution",
+            params={"category": "Taxi"},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert [item["category"] for item in response.json()["by_category_expense"]] == ["Taxi"]
+
+    async def test_distribution_empty(self, client: AsyncClient, auth_headers):
+        """Распределение без транзакций"""
+        response = await client.get("/api/auth/me/statistics/distribution", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["by_category_expense"] == []
+        assert data["rolling_expense"] == []
+
+
+class TestDeleteAccount:
+    """Тесты удаления аккаунта DELETE /api/auth/me"""
+
+    async def test_delete_account_marks_user(
+        self, client: AsyncClient, test_user, auth_headers, db_session
+    ):
+        """Аккаунт сразу недоступен, данные удаляются задачей"""
+        from sqlalchemy import select
+        from app.models import DeletionJob
+
+        response = await client.delete("/api/auth/me", headers=auth_headers)
+
+        assert response.status_code == 202
+        assert (await client.get("/api/auth/me", headers=auth_headers)).status_code == 404
+        login = await client.post(
+            "/api/auth/login",
+            json={"login": "testuser", "password": "testpassword123"}
+        )
+        assert login.status_code == 401
+        job = await db_session.scalar(select(DeletionJob))
+        assert (job.kind, job.target_id, job.status) == ("user", test_user.id, "pending")
+
+    async def test_delete_account_purges_data(
+        self, client: AsyncClient, test_user, test_user2, auth_headers, auth_headers2, test_group, db_session
+    ):
+        """Фоновая задача удаляет транзакции, группы и пользователя по частям"""
+        from sqlalchemy import select, func
+        from app import deletions
+        from app.models import User, Group, Transaction, transaction_group_association, user_group_association
+
+        shared = (await client.post("/api/groups", json={"name": "Shared"}, headers=auth_headers2)).json()
+        await client.post(f"/api/groups/{shared['id']}/users/{test_user.id}", headers=auth_headers2)
+        batch = await client.post(
+            "/api/transactions/batch",
+            json={"items": [
+                {"name": f"Item {index}", "category": "Food", "amount": 10,
+                 "group_ids": [shared["id"], test_group.id]}
+                for index in range(5)
+            ] + [{"name": "Own", "category": "Food", "amount": 7, "group_ids": [shared["id"]]}]},
+            headers=auth_headers
+        )
+        assert batch.status_code == 201
+        await client.post(
+            "/api/transactions",
+            json={"name": "Other", "category": "Food", "amount": 3, "group_ids": [shared["id"]]},
+            headers=auth_headers2
+        )
+
+        response = await client.delete("/api/auth/me", headers=auth_headers)
+        assert response.status_code == 202
+        members = await client.get(f"/api/groups/{shared['id']}/users", headers=auth_headers2)
+        assert [member["id"] for member in members.json()] == [test_user2.id]
+
+        assert await deletions.process_deletion_jobs(db_session, chunk_size=2) == 1
+
+        db_session.expunge_all()
+        assert await db_session.get(User, test_user.id) is None
+        assert await db_session.get(Group, test_group.id) is None
+        assert await db_session.scalar(
+            select(func.count()).select_from(Transaction).where(Transaction.user_id == test_user.id)
+        ) == 0
+        links = await db_session.scalar(select(func.count()).select_from(transaction_group_association))
+        assert links == 1
+        memberships = await db_session.scalar(
+            select(func.count()).select_from(user_group_association)
+            .where(user_group_association.c.user_id == test_user.id)
+        )
+        assert memberships == 0
+        balance = (await client.get(f"/api/groups/{shared['id']}/balance", headers=auth_headers2)).json()
+        assert float(balance["total_expense"]) == 3
+        assert balance["transaction_count"] == 1
+
+    async def test_delete_account_unauthorized(self, client: AsyncClient):
+        """Удаление аккаунта без авторизации"""
+        response = await client.delete("/api/auth/me")
+
+        assert response.status_code in [401, 403]
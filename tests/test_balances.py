@@ -0,0 +1,202 @@
+"""
+Тесты материализованных балансов (Balances Tests)
+
+Эндпоинты:
+- GET /api/auth/me/balance - Баланс пользователя
+- GET /api/groups/{group_id}/balance - Баланс группы
+"""
+import pytest
+from datetime import datetime, timezone
+from httpx import AsyncClient
+from sqlalchemy import update
+from app import archive
+from app.balances import find_balance_drift, fix_balance_drift
+from app.models import Balance, Transaction, TransactionType
+
+
+class TestBalanceEndpoints:
+    """Тесты эндпоинтов баланса"""
+
+    async def test_user_balance_empty(self, client: AsyncClient, auth_headers, test_user):
+        """Баланс пользователя без транзакций"""
+        response = await client.get("/api/auth/me/balance", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["user_id"] == test_user.id
+        assert float(data["balance"]) == 0
+        assert data["transaction_count"] == 0
+
+    async def test_user_balance(self, client: AsyncClient, auth_headers):
+        """Баланс учитывает доходы и расходы"""
+        for transaction_type, amount in [("income", 100), ("expense", 30.5)]:
+            await client.post(
+                "/api/transactions",
+                json={"name": "Test", "type": transaction_type, "category": "Other", "amount": amount},
+                headers=auth_headers
+            )
+
+        response = await client.get("/api/auth/me/balance", headers=auth_headers)
+
+        data = response.json()
+        assert float(data["balance"]) == 69.5
+        assert float(data["total_expense"]) == 30.5
+        assert data["transaction_count"] == 2
+
+    async def test_group_balance(self, client: AsyncClient, auth_headers, test_group):
+        """Баланс группы учитывает только транзакции группы"""
+        await client.post(
+            "/api/transactions",
+            json={"name": "Shared", "category": "Food", "amount": 40, "group_ids": [test_group.id]},
+            headers=auth_headers
+        )
+        await client.post(
+            "/api/transactions",
+            json={"name": "Private", "category": "Food", "amount": 15},
+            headers=auth_headers
+        )
+
+        response = await client.get(f"/api/groups/{test_group.id}/balance", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["group_id"] == test_group.id
+        assert float(data["balance"]) == -40
+
+    async def test_group_balance_forbidden(self, client: AsyncClient, auth_headers2, test_group):
+        """Баланс чужой группы"""
+        response = await client.get(f"/api/groups/{test_group.id}/balance", headers=auth_headers2)
+
+        assert response.status_code == 403
+
+
+class TestBalanceMaintenance:
+    """Тесты поддержания балансов при изменении транзакций"""
+
+    async def test_no_drift_after_writes(
+        self, client: AsyncClient, auth_headers, test_user, test_group, db_session
+    ):
+        """Балансы совпадают с пересчетом после всех видов изменений"""
+        created = await client.post(
+            "/api/transactions",
+            json={"name": "Lunch", "category": "Food", "amount": 20, "group_ids": [test_group.id]},
+            headers=auth_headers
+        )
+        transaction_id = created.json()["id"]
+        await client.post(
+            "/api/transactions/batch",
+            json={"items": [
+                {"name": "Salary", "type": "income", "category": "Work", "amount": 500},
+                {"name": "Taxi", "category": "Transport", "amount": 12, "group_ids": [test_group.id]},
+            ]},
+            headers=auth_headers
+        )
+        assert await find_balance_drift(db_session) == []
+
+        await client.put(
+            f"/api/transactions/{transaction_id}",
+            json={"amount": 35, "group_ids": []},
+            headers=auth_headers
+        )
+        assert await find_balance_drift(db_session) == []
+
+        await client.patch(
+            "/api/transactions/bulk",
+            params={"category": "Transport"},
+            json={"type": "income"},
+            headers=auth_headers
+        )
+        assert await find_balance_drift(db_session) == []
+
+        await client.request(
+            "DELETE", "/api/transactions/bulk", params={"category": "Work"}, headers=auth_headers
+        )
+        await client.delete(f"/api/transactions/{transaction_id}", headers=auth_headers)
+        assert await find_balance_drift(db_session) == []
+
+        balance = (await client.get("/api/auth/me/balance", headers=auth_headers)).json()
+        assert float(balance["balance"]) == 12
+        assert balance["transaction_count"] == 1
+
+    async def test_group_delete_removes_balance(
+        self, client: AsyncClient, auth_headers, test_group, db_session
+    ):
+        """Удаление группы удаляет ее баланс"""
+        await client.post(
+            "/api/transactions",
+            json={"name": "Shared", "category": "Food", "amount": 40, "group_ids": [test_group.id]},
+            headers=auth_headers
+        )
+
+        await client.delete(f"/api/groups/{test_group.id}", headers=auth_headers)
+
+        assert await db_session.get(Balance, ("group", test_group.id)) is None
+        assert await find_balance_drift(db_session) == []
+
+    async def test_archived_transactions_kept(
+        self, client: AsyncClient, auth_headers, test_user, test_group, db_session, tmp_path, monkeypatch
+    ):
+        """Архивация не меняет баланс, а проверка учитывает архив"""
+        monkeypatch.setattr(archive, "ARCHIVE_DIR", str(tmp_path))
+        transaction = Transaction(
+            name="Old",
+            type=TransactionType.expense,
+            category="Food",
+            amount=70,
+            transaction_datetime=datetime(2020, 1, 1, tzinfo=timezone.utc),
+            user_id=test_user.id
+        )
+        transaction.groups.append(test_group)
+        db_session.add(transaction)
+        await db_session.commit()
+
+        await archive.archive_user_transactions(db_session, test_user.id, datetime(2021, 1, 1, tzinfo=timezone.utc))
+
+        balance = (await client.get(f"/api/groups/{test_group.id}/balance", headers=auth_headers)).json()
+        assert float(balance["balance"]) == -70
+        assert await find_balance_drift(db_session) == []
+
+    async def test_group_deleted_after_archiving(
+        self, client: AsyncClient, auth_headers, test_user, test_group, db_session, tmp_path, monkeypatch
+    ):
+        """Удаленная группа из архивных файлов не дает расхождений"""
+        monkeypatch.setattr(archive, "ARCHIVE_DIR", str(tmp_path))
+        transaction = Transaction(
+            name="Old",
+            type=TransactionType.expense,
+            category="Food",
+            amount=70,
+            transaction_datetime=datetime(2020, 1, 1, tzinfo=timezone.utc),
+            user_id=test_user.id
+        )
+        transaction.groups.append(test_group)
+        db_session.add(transaction)
+        await db_session.commit()
+        await archive.archive_user_transactions(db_session, test_user.id, datetime(2021, 1, 1, tzinfo=timezone.utc))
+
+        await client.delete(f"/api/groups/{test_group.id}", headers=auth_headers)
+
+        drift = await find_balance_drift(db_session)
+        assert drift == []
+        await fix_balance_drift(db_session, drift)
+        assert await db_session.get(Balance, ("group", test_group.id)) is None
+
+    async def test_drift_detected_and_fixed(self, client: AsyncClient, auth_headers, test_user, db_session):
+        """Проверка находит и исправляет расхождения"""
+        await client.post(
+            "/api/transactions",
+            json={"name": "Lunch", "category": "Food", "amount": 20},
+            headers=auth_headers
+        )
+        await db_session.execute(
+            update(Balance).where(Balance.kind == "user").values(total_expense=999)
+        )
+        await db_session.commit()
+
+        drift = await find_balance_drift(db_session)
+        assert len(drift) == 1
+        assert drift[0]["owner_id"] == test_user.id
+        assert float(drift[0]["expected"]["total_expense"]) == 20
+
+        await fix_balance_drift(db_session, drift)
+        assert await find_balance_drift(db_session) == []
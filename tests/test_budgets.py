@@ -0,0 +1,218 @@
+"""
+Тесты бюджетов (Budgets Tests)
+
+Эндпоинты:
+- GET /api/budgets - Бюджеты пользователя
+- POST /api/budgets - Создать бюджет
+- PUT /api/budgets/{budget_id} - Изменить бюджет
+- DELETE /api/budgets/{budget_id} - Удалить бюджет
+- POST /api/transactions - Создание транзакции возвращает состояние бюджета
+"""
+import pytest
+from datetime import datetime, timezone
+from httpx import AsyncClient
+from sqlalchemy import select, func, literal_column
+from app.models import BudgetUsage, Category, Transaction, TransactionType
+
+
+async def get_usage(db_session, user_id) -> dict:
+    result = await db_session.execute(
+        select(Category.name, BudgetUsage.month, BudgetUsage.amount)
+        .join(Category, Category.id == BudgetUsage.category_id)
+        .where(BudgetUsage.user_id == user_id, BudgetUsage.amount != 0)
+    )
+    return {(row.name, row.month): row.amount for row in result.all()}
+
+async def recompute_usage(db_session, user_id) -> dict:
+    month = func.date_trunc(literal_column("'month'"), Transaction.transaction_datetime, literal_column("'UTC'"))
+    result = await db_session.execute(
+        select(Category.name, month.label("month"), func.sum(Transaction.amount).label("amount"))
+        .join(Category, Category.id == Transaction.category_id)
+        .where(Transaction.user_id == user_id, Transaction.type == TransactionType.expense)
+        .group_by(Category.name, month)
+    )
+    return {(row.name, row.month): row.amount for row in result.all()}
+
+
+class TestBudgets:
+    """Тесты управления бюджетами"""
+
+    async def test_create_budget(self, client: AsyncClient, auth_headers):
+        """Создание бюджета категории"""
+        response = await client.post(
+            "/api/budgets", json={"category": "Food", "amount": 300}, headers=auth_headers
+        )
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data["category"] == "Food"
+        assert float(data["spent"]) == 0
+        assert float(data["remaining"]) == 300
+
+    async def test_create_budget_duplicate(self, client: AsyncClient, auth_headers):
+        """Повторный бюджет для той же категории"""
+        await client.post("/api/budgets", json={"category": "Food", "amount": 300}, headers=auth_headers)
+
+        response = await client.post(
+            "/api/budgets", json={"category": "Food", "amount": 100}, headers=auth_headers
+        )
+
+        assert response.status_code == 409
+
+    async def test_update_and_delete_budget(self, client: AsyncClient, auth_headers):
+        """Изменение и удаление бюджета"""
+        created = await client.post(
+            "/api/budgets", json={"category": "Food", "amount": 300}, headers=auth_headers
+        )
+        budget_id = created.json()["id"]
+
+        response = await client.put(f"/api/budgets/{budget_id}", json={"amount": 50}, headers=auth_headers)
+        assert response.status_code == 200
+        assert float(response.json()["amount"]) == 50
+
+        response = await client.delete(f"/api/budgets/{budget_id}", headers=auth_headers)
+        assert response.status_code == 200
+        assert (await client.get("/api/budgets", headers=auth_headers)).json() == []
+
+    async def test_budget_forbidden(self, client: AsyncClient, auth_headers, auth_headers2):
+        """Изменение чужого бюджета"""
+        created = await client.post(
+            "/api/budgets", json={"category": "Food", "amount": 300}, headers=auth_headers
+        )
+
+        response = await client.put(
+            f"/api/budgets/{created.json()['id']}", json={"amount": 1}, headers=auth_headers2
+        )
+
+        assert response.status_code == 403
+
+    async def test_budget_not_found(self, client: AsyncClient, auth_headers):
+        """Удаление несуществующего бюджета"""
+        response = await client.delete("/api/budgets/999", headers=auth_headers)
+
+        assert response.status_code == 404
+
+
+class TestBudgetUsage:
+    """Тесты счетчика расходов по бюджетам"""
+
+    async def test_create_reports_remaining(self, client: AsyncClient, auth_headers):
+        """Создание транзакции возвращает остаток бюджета"""
+        await client.post("/api/budgets", json={"category": "Food", "amount": 100}, headers=auth_headers)
+
+        first = await client.post(
+            "/api/transactions",
+            json={"name": "Lunch", "category": "Food", "amount": 60},
+            headers=auth_headers
+        )
+        second = await client.post(
+            "/api/transactions",
+            json={"name": "Dinner", "category": "Food", "amount": 50},
+            headers=auth_headers
+        )
+
+        assert first.status_code == 201
+        assert float(first.json()["budget"]["remaining"]) == 40
+        assert first.json()["budget"]["exceeded"] is False
+        assert float(second.json()["budget"]["spent"]) == 110
+        assert second.json()["budget"]["exceeded"] is True
+
+    async def test_create_without_budget(self, client: AsyncClient, auth_headers):
+        """Без бюджета поле budget пустое"""
+        response = await client.post(
+            "/api/transactions",
+            json={"name": "Lunch", "category": "Food", "amount": 60},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 201
+        assert response.json()["budget"] is None
+
+    async def test_income_not_counted(self, client: AsyncClient, auth_headers):
+        """Доходы не расходуют бюджет"""
+        await client.post("/api/budgets", json={"category": "Work", "amount": 100}, headers=auth_headers)
+
+        response = await client.post(
+            "/api/transactions",
+            json={"name": "Salary", "type": "income", "category": "Work", "amount": 500},
+            headers=auth_headers
+        )
+
+        assert float(response.json()["budget"]["spent"]) == 0
+
+    async def test_usage_follows_single_writes(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Счетчик совпадает с пересчетом после создания, изменения и удаления"""
+        created = await client.post(
+            "/api/transactions",
+            json={"name": "Lunch", "category": "Food", "amount": 60},
+            headers=auth_headers
+        )
+        transaction_id = created.json()["id"]
+        await client.post(
+            "/api/transactions",
+            json={"name": "Taxi", "category": "Transport", "amount": 15},
+            headers=auth_headers
+        )
+
+        await client.put(
+            f"/api/transactions/{transaction_id}",
+            json={"category": "Cafe", "amount": 45, "transaction_datetime": "2026-03-10T12:00:00Z"},
+            headers=auth_headers
+        )
+        assert await get_usage(db_session, test_user.id) == await recompute_usage(db_session, test_user.id)
+
+        await client.put(f"/api/transactions/{transaction_id}", json={"type": "income"}, headers=auth_headers)
+        assert await get_usage(db_session, test_user.id) == await recompute_usage(db_session, test_user.id)
+
+        await client.delete(f"/api/transactions/{transaction_id}", headers=auth_headers)
+        usage = await get_usage(db_session, test_user.id)
+        assert usage == await recompute_usage(db_session, test_user.id)
+        assert [name for name, _ in usage] == ["Transport"]
+
+    async def test_usage_follows_set_based_writes(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Счетчик совпадает с пересчетом после пакетных и массовых операций"""
+        items = [
+            {"name": "Lunch", "category": "Food", "amount": 10},
+            {"name": "Dinner", "category": "Food", "amount": 20},
+            {"name": "Taxi", "category": "Transport", "amount": 5},
+        ]
+        response = await client.post("/api/transactions/batch", json={"items": items}, headers=auth_headers)
+        assert response.status_code == 201
+        assert await get_usage(db_session, test_user.id) == await recompute_usage(db_session, test_user.id)
+
+        response = await client.patch(
+            "/api/transactions/bulk",
+            params={"category": "Food"},
+            json={"category": "Cafe", "amount": 7},
+            headers=auth_headers
+        )
+        assert response.json()["affected"] == 2
+        assert await get_usage(db_session, test_user.id) == await recompute_usage(db_session, test_user.id)
+
+        response = await client.request(
+            "DELETE", "/api/transactions/bulk", params={"category": "Cafe"}, headers=auth_headers
+        )
+        assert response.json()["affected"] == 2
+        usage = await get_usage(db_session, test_user.id)
+        assert usage == await recompute_usage(db_session, test_user.id)
+        assert [name for name, _ in usage] == ["Transport"]
+
+    async def test_usage_keyed_by_utc_month(self, test_user, db_session):
+        """Транзакции попадают в месяц по UTC"""
+        db_session.add(Transaction(
+            name="Late",
+            type=TransactionType.expense,
+            category="Food",
+            amount=12,
+            transaction_datetime=datetime(2026, 4, 30, 23, 30, tzinfo=timezone.utc),
+            user_id=test_user.id
+        ))
+        await db_session.commit()
+
+        usage = await get_usage(db_session, test_user.id)
+
+        assert list(usage) == [("Food", datetime(2026, 4, 1, tzinfo=timezone.utc))]
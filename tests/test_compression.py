@@ -0,0 +1,113 @@
+"""
+Тесты сжатия и потоковой отдачи ответов (Compression Tests)
+
+Эндпоинты:
+- GET /api/transactions - Сжатие больших страниц
+- GET /api/transactions/recurring - Потоковая отдача списка регулярных транзакций
+"""
+import pytest
+from httpx import AsyncClient
+from app.compression import choose_encoding
+
+
+async def create_transactions(client: AsyncClient, auth_headers, count: int, **fields):
+    await client.post(
+        "/api/transactions/batch",
+        json={"items": [
+            {"name": f"Transaction {index}", "category": "Food", "amount": index + 1, **fields}
+            for index in range(count)
+        ]},
+        headers=auth_headers
+    )
+
+
+class TestChooseEncoding:
+    """Тесты выбора алгоритма сжатия по Accept-Encoding"""
+
+    @pytest.mark.parametrize("header,expected", [
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0.5, gzip;q=0.8", "gzip"),
+        ("gzip;q=0, br;q=0", None),
+        ("*", "br"),
+        ("identity", None),
+        ("", None),
+    ])
+    def test_choose_encoding(self, header, expected):
+        """Выбирается поддерживаемый алгоритм с наибольшим приоритетом"""
+        assert choose_encoding(header) == expected
+
+
+class TestCompressionMiddleware:
+    """Тесты middleware сжатия ответов"""
+
+    @pytest.mark.parametrize("encoding", ["gzip", "br"])
+    async def test_large_response_compressed(self, client: AsyncClient, auth_headers, encoding):
+        """Большой ответ сжимается выбранным алгоритмом"""
+        await create_transactions(client, auth_headers, 50)
+
+        response = await client.get(
+            "/api/transactions", params={"size": 50},
+            headers={**auth_headers, "Accept-Encoding": encoding}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == encoding
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert len(response.json()["items"]) == 50
+
+    async def test_small_response_not_compressed(self, client: AsyncClient):
+        """Ответ меньше порога отдается без сжатия"""
+        response = await client.get("/health", headers={"Accept-Encoding": "gzip, br"})
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+
+    async def test_identity(self, client: AsyncClient, auth_headers):
+        """Без Accept-Encoding ответ не сжимается"""
+        await create_transactions(client, auth_headers, 50)
+
+        response = await client.get(
+            "/api/transactions", params={"size": 50},
+            headers={**auth_headers, "Accept-Encoding": "identity"}
+        )
+
+        assert "content-encoding" not in response.headers
+
+
+class TestStreamingList:
+    """Тесты потоковой отдачи списка GET /api/transactions/recurring"""
+
+    async def test_recurring_streamed(self, client: AsyncClient, auth_headers):
+        """Регулярные транзакции отдаются одним JSON-массивом"""
+        await create_transactions(client, auth_headers, 3, is_recurring=True, recurring_period_days=30)
+        await create_transactions(client, auth_headers, 2)
+
+        response = await client.get("/api/transactions/recurring", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        data = response.json()
+        assert len(data) == 3
+        assert all(item["is_recurring"] for item in data)
+        assert data[0]["category"] == "Food"
+
+    async def test_recurring_empty(self, client: AsyncClient, auth_headers):
+        """Пустой список регулярных транзакций"""
+        response = await client.get("/api/transactions/recurring", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json() == []
+
+    async def test_recurring_compressed_stream(self, client: AsyncClient, auth_headers):
+        """Потоковый ответ сжимается по частям"""
+        await create_transactions(client, auth_headers, 20, is_recurring=True, recurring_period_days=30)
+
+        response = await client.get(
+            "/api/transactions/recurring", headers={**auth_headers, "Accept-Encoding": "gzip"}
+        )
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert len(response.json()) == 20
@@ -0,0 +1,300 @@
+"""
+Тесты журнала событий изменений (Change Events Tests)
+
+События пишутся в таблицу change_events в той же транзакции, что и изменения:
+- POST /api/transactions, POST /api/transactions/batch
+- PUT /api/transactions/{transaction_id}, PATCH /api/transactions/bulk
+- DELETE /api/transactions/{transaction_id}, DELETE /api/transactions/bulk
+- POST/PUT/DELETE /api/groups, POST/DELETE /api/groups/{group_id}/users/{user_id}
+
+Эндпоинты:
+- GET /api/groups/{group_id}/events - Поток событий группы (SSE)
+"""
+import asyncio
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta, timezone
+from httpx import AsyncClient
+from sqlalchemy import select, update
+from app import events
+from app.events import dispatch_change_events, delete_dispatched_events, subscribe, unsubscribe
+from app.group_events import GroupEventHub, get_missed_events
+from app.models import ChangeEvent
+
+
+async def get_events(db_session, entity: str = "transaction") -> list[tuple]:
+    result = await db_session.execute(
+        select(ChangeEvent).where(ChangeEvent.entity == entity).order_by(ChangeEvent.id)
+    )
+    return [
+        (change_event.action, change_event.entity_id, sorted(change_event.group_ids or []))
+        for change_event in result.scalars().all()
+    ]
+
+
+@pytest.fixture
+def received():
+    batches = []
+
+    async def handler(change_events):
+        batches.append([(change_event.entity, change_event.action) for change_event in change_events])
+
+    subscribe(handler)
+    yield batches
+    unsubscribe(handler)
+
+
+class TestTransactionEvents:
+    """Тесты событий изменения транзакций"""
+
+    async def test_create_update_delete(
+        self, client: AsyncClient, auth_headers, test_user, test_group, db_session
+    ):
+        """Создание, изменение и удаление транзакции пишут события"""
+        created = await client.post(
+            "/api/transactions",
+            json={"name": "Test", "category": "Food", "amount": 10, "group_ids": [test_group.id]},
+            headers=auth_headers
+        )
+        transaction_id = created.json()["id"]
+        await client.put(
+            f"/api/transactions/{transaction_id}",
+            json={"amount": 20, "group_ids": []},
+            headers=auth_headers
+        )
+        await client.delete(f"/api/transactions/{transaction_id}", headers=auth_headers)
+
+        assert await get_events(db_session) == [
+            ("created", transaction_id, [test_group.id]),
+            ("updated", transaction_id, [test_group.id]),
+            ("deleted", transaction_id, []),
+        ]
+
+    async def test_event_user(self, client: AsyncClient, auth_headers, test_user, db_session):
+        """Событие содержит владельца транзакции"""
+        await client.post(
+            "/api/transactions",
+            json={"name": "Test", "category": "Food", "amount": 10},
+            headers=auth_headers
+        )
+
+        result = await db_session.execute(select(ChangeEvent))
+        change_event = result.scalars().one()
+        assert change_event.user_id == test_user.id
+        assert change_event.dispatched_at is None
+
+    async def test_batch_and_bulk(
+        self, client: AsyncClient, auth_headers, test_user, test_group, db_session
+    ):
+        """Пакетное создание и массовые изменения пишут события на каждую транзакцию"""
+        response = await client.post(
+            "/api/transactions/batch",
+            json={"items": [
+                {"name": "First", "category": "Food", "amount": 10, "group_ids": [test_group.id]},
+                {"name": "Second", "category": "Food", "amount": 20},
+            ]},
+            headers=auth_headers
+        )
+        first_id, second_id = [item["id"] for item in response.json()]
+
+        await client.patch(
+            "/api/transactions/bulk",
+            params={"ids": [first_id]},
+            json={"amount": 15},
+            headers=auth_headers
+        )
+        await client.delete("/api/transactions/bulk", params={"ids": [first_id, second_id]}, headers=auth_headers)
+
+        change_events = await get_events(db_session)
+        assert change_events[:3] == [
+            ("created", first_id, [test_group.id]),
+            ("created", second_id, []),
+            ("updated", first_id, [test_group.id]),
+        ]
+        assert sorted(change_events[3:]) == [
+            ("deleted", first_id, [test_group.id]),
+            ("deleted", second_id, []),
+        ]
+
+    async def test_no_event_on_failed_request(self, client: AsyncClient, auth_headers, db_session):
+        """Отклоненный запрос не пишет событий"""
+        response = await client.delete("/api/transactions/999999", headers=auth_headers)
+
+        assert response.status_code == 404
+        assert await get_events(db_session) == []
+
+
+class TestGroupEvents:
+    """Тесты событий изменения групп"""
+
+    async def test_group_lifecycle(
+        self, client: AsyncClient, auth_headers, test_user, test_user2, db_session
+    ):
+        """Создание, изменение, состав и удаление группы пишут события"""
+        created = await client.post("/api/groups", json={"name": "Trip"}, headers=auth_headers)
+        group_id = created.json()["id"]
+        await client.put(f"/api/groups/{group_id}", json={"name": "Trip 2"}, headers=auth_headers)
+        await client.post(f"/api/groups/{group_id}/users/{test_user2.id}", headers=auth_headers)
+        await client.delete(f"/api/groups/{group_id}/users/{test_user2.id}", headers=auth_headers)
+        await client.delete(f"/api/groups/{group_id}", headers=auth_headers)
+
+        assert [action for action, _, _ in await get_events(db_session, "group")] == [
+            "created", "updated", "member_added", "member_removed", "deleted"
+        ]
+
+
+class TestDispatch:
+    """Тесты рассылки событий подписчикам"""
+
+    async def test_dispatch_marks_events(
+        self, client: AsyncClient, auth_headers, test_user, db_session, received
+    ):
+        """Рассылка передает события подписчикам и отмечает их отправленными"""
+        for amount in [10, 20, 30]:
+            await client.post(
+                "/api/transactions",
+                json={"name": "Test", "category": "Food", "amount": amount},
+                headers=auth_headers
+            )
+
+        assert await dispatch_change_events(db_session, batch_size=2) == 2
+        assert await dispatch_change_events(db_session, batch_size=2) == 1
+        assert await dispatch_change_events(db_session, batch_size=2) == 0
+
+        assert received == [[("transaction", "created")] * 2, [("transaction", "created")]]
+        result = await db_session.execute(select(ChangeEvent).where(ChangeEvent.dispatched_at.is_(None)))
+        assert result.scalars().all() == []
+
+    async def test_failing_subscriber(
+        self, client: AsyncClient, auth_headers, test_user, db_session, received
+    ):
+        """Ошибка одного подписчика не мешает остальным"""
+        def failing(change_events):
+            raise RuntimeError("boom")
+
+        subscribe(failing)
+        try:
+            await client.post(
+                "/api/transactions",
+                json={"name": "Test", "category": "Food", "amount": 10},
+                headers=auth_headers
+            )
+            assert await dispatch_change_events(db_session) == 1
+        finally:
+            unsubscribe(failing)
+
+        assert received == [[("transaction", "created")]]
+
+    async def test_purge_dispatched(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Удаляются только давно отправленные события"""
+        for amount in [10, 20]:
+            await client.post(
+                "/api/transactions",
+                json={"name": "Test", "category": "Food", "amount": amount},
+                headers=auth_headers
+            )
+        await dispatch_change_events(db_session)
+        old = datetime.now(timezone.utc) - events.CHANGE_EVENTS_RETENTION - timedelta(hours=1)
+        first_id = (await db_session.execute(select(ChangeEvent.id).order_by(ChangeEvent.id))).scalars().first()
+        await db_session.execute(update(ChangeEvent).where(ChangeEvent.id == first_id).values(dispatched_at=old))
+        await db_session.commit()
+
+        assert await delete_dispatched_events(db_session) == 1
+        result = await db_session.execute(select(ChangeEvent))
+        assert len(result.scalars().all()) == 1
+
+
+@pytest_asyncio.fixture
+async def hub(db_session):
+    group_event_hub = GroupEventHub(queue_size=2)
+    yield group_event_hub
+    await group_event_hub.close()
+
+
+class ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+async def read_stream(stream, count: int) -> list[str]:
+    return [await asyncio.wait_for(anext(stream), timeout=5) for _ in range(count)]
+
+
+class TestGroupEventStream:
+    """Тесты потока событий группы"""
+
+    async def test_stream_not_found(self, client: AsyncClient, auth_headers):
+        """Поток событий несуществующей группы"""
+        response = await client.get("/api/groups/999999/events", headers=auth_headers)
+
+        assert response.status_code == 404
+
+    async def test_stream_forbidden(self, client: AsyncClient, auth_headers2, test_group):
+        """Поток событий чужой группы"""
+        response = await client.get(f"/api/groups/{test_group.id}/events", headers=auth_headers2)
+
+        assert response.status_code == 403
+
+    async def test_notify_group_transactions(
+        self, client: AsyncClient, auth_headers, test_group, hub
+    ):
+        """Слушатель получает только события своей группы после коммита"""
+        queue = await hub.subscribe(test_group.id)
+        await client.post(
+            "/api/transactions",
+            json={"name": "Private", "category": "Food", "amount": 5},
+            headers=auth_headers
+        )
+        created = await client.post(
+            "/api/transactions",
+            json={"name": "Shared", "category": "Food", "amount": 10, "group_ids": [test_group.id]},
+            headers=auth_headers
+        )
+
+        payload = await asyncio.wait_for(queue.get(), timeout=5)
+        assert payload["entity"] == "transaction"
+        assert payload["action"] == "created"
+        assert payload["entity_id"] == created.json()["id"]
+        assert queue.empty()
+
+    async def test_stream_replays_missed_events(
+        self, client: AsyncClient, auth_headers, test_group, db_session, hub
+    ):
+        """Поток досылает пропущенные события по Last-Event-ID без дублей"""
+        for amount in [10, 20]:
+            await client.post(
+                "/api/transactions",
+                json={"name": "Shared", "category": "Food", "amount": amount, "group_ids": [test_group.id]},
+                headers=auth_headers
+            )
+        first_id, second_id = (await db_session.execute(
+            select(ChangeEvent.id).order_by(ChangeEvent.id)
+        )).scalars().all()
+
+        queue = await hub.subscribe(test_group.id)
+        missed = await get_missed_events(db_session, test_group.id, first_id)
+        hub.publish(missed[0])
+        hub.publish({**missed[0], "id": second_id + 1})
+        stream = hub.stream(ConnectedRequest(), test_group.id, queue, missed)
+
+        chunks = await read_stream(stream, 3)
+        await stream.aclose()
+
+        assert chunks[0].startswith("retry:")
+        assert chunks[1].startswith(f"id: {second_id}\nevent: transaction.created\n")
+        assert chunks[2].startswith(f"id: {second_id + 1}\n")
+        assert test_group.id not in hub.queues
+
+    async def test_slow_client_disconnected(self, test_group, hub):
+        """Переполненная очередь медленного клиента закрывает поток"""
+        queue = await hub.subscribe(test_group.id)
+        for event_id in range(1, 4):
+            hub.publish({"id": event_id, "entity": "transaction", "action": "created", "group_ids": [test_group.id]})
+
+        assert test_group.id not in hub.queues
+        stream = hub.stream(ConnectedRequest(), test_group.id, queue, [])
+        chunks = [chunk async for chunk in stream]
+        assert len(chunks) == 2
+        assert chunks[1].startswith("id: 2\n")
@@ -6,11 +6,15 @@
 - POST /api/groups - Создать группу
 - PUT /api/groups/{group_id} - Редактировать группу
 - DELETE /api/groups/{group_id} - Удалить группу
+- GET /api/groups/deletions/{job_id} - Статус фонового удаления группы
 - GET /api/groups/{group_id} - Посмотреть группу
 - POST /api/groups/{group_id}/users/{user_id} - Добавить пользователя в группу
 - DELETE /api/groups/{group_id}/users/{user_id} - Удалить пользователя из группы
 - GET /api/groups/{group_id}/users - Список пользователей группы
 - GET /api/transactions/group/{group_id}/stats - Аналитика по расходам в группе
+- GET /api/groups/{group_id}/statistics - Статистика группы с разбивкой по участникам
+- GET /api/groups/{group_id}/statistics/distribution - Распределение расходов группы
+- GET /api/groups/{group_id}/settlement - Взаиморасчеты участников группы
 """
 import pytest
 from httpx import AsyncClient
@@ -171,6 +175,131 @@ class TestDeleteGroup:
         )
         assert get_response.status_code == 404
 
+    async def create_group_transactions(self, client: AsyncClient, auth_headers, test_group, count: int):
+        await client.post(
+            "/api/transactions/batch",
+            json={"items": [
+                {"name": f"Item {index}", "category": "Food", "amount": 10, "group_ids": [test_group.id]}
+                for index in range(count)
+            ]},
+            headers=auth_headers
+        )
+
+    async def test_delete_group_keeps_transactions(
+        self, client: AsyncClient, auth_headers, test_group, db_session
+    ):
+        """Удаление группы удаляет связи, но не транзакции участников"""
+        from sqlalchemy import select, func
+        from app.models import transaction_group_association, user_group_association
+
+        await self.create_group_transactions(client, auth_headers, test_group, 3)
+
+        response = await client.delete(f"/api/groups/{test_group.id}", headers=auth_headers)
+
+        assert response.status_code == 200
+        for table in (transaction_group_association, user_group_association):
+            count = await db_session.scalar(select(func.count()).select_from(table))
+            assert count == 0
+        transactions = await client.get("/api/transactions", headers=auth_headers)
+        assert transactions.json()["total"] == 3
+
+    async def test_delete_group_bumps_transaction_versions(
+        self, client: AsyncClient, auth_headers, test_group, db_session
+    ):
+        """Отвязанные от группы транзакции получают новую версию и событие updated"""
+        from sqlalchemy import select
+        from app.models import Transaction, ChangeEvent
+
+        await self.create_group_transactions(client, auth_headers, test_group, 3)
+        result = await db_session.execute(select(Transaction.id, Transaction.version))
+        versions = dict(result.all())
+        token = (await client.get("/api/transactions/changes", headers=auth_headers)).json()["next_token"]
+
+        response = await client.delete(f"/api/groups/{test_group.id}", headers=auth_headers)
+
+        assert response.status_code == 200
+        result = await db_session.execute(select(Transaction.id, Transaction.version))
+        assert all(version > versions[transaction_id] for transaction_id, version in result.all())
+        events = await db_session.execute(
+            select(ChangeEvent.entity_id, ChangeEvent.group_ids).where(ChangeEvent.action == "updated")
+        )
+        assert sorted(events.all()) == [(transaction_id, [test_group.id]) for transaction_id in sorted(versions)]
+
+        changes = await client.get("/api/transactions/changes", params={"since": token},
+                                   headers=auth_headers)
+        assert {item["id"] for item in changes.json()["changes"]} == set(versions)
+
+    async def test_delete_large_group_in_background(
+        self, client: AsyncClient, auth_headers, auth_headers2, test_group, db_session, monkeypatch
+    ):
+        """Большая группа удаляется фоновой задачей по частям"""
+        from sqlalchemy import select, func
+        from app import deletions
+        from app.models import ChangeEvent
+
+        monkeypatch.setattr(deletions, "GROUP_DELETE_SYNC_LIMIT", 2)
+        await self.create_group_transactions(client, auth_headers, test_group, 5)
+
+        response = await client.delete(f"/api/groups/{test_group.id}", headers=auth_headers)
+
+        assert response.status_code == 202
+        status_url = response.json()["status_url"]
+        assert response.headers["location"] == status_url
+        assert (await client.get(f"/api/groups/{test_group.id}", headers=auth_headers)).status_code == 403
+        assert (await client.get("/api/groups", headers=auth_headers)).json() == []
+        job = (await client.get(status_url, headers=auth_headers)).json()
+        assert job["status"] == "pending"
+        assert (await client.get(status_url, headers=auth_headers2)).status_code == 403
+
+        assert await deletions.process_deletion_jobs(db_session, chunk_size=2) == 1
+
+        job = (await client.get(status_url, headers=auth_headers)).json()
+        assert job["status"] == "done"
+        assert job["deleted_links"] == 5
+        events = await db_session.scalar(
+            select(func.count()).select_from(ChangeEvent).where(ChangeEvent.action == "updated")
+        )
+        assert events == 5
+        assert job["finished_at"] is not None
+        assert (await client.get(f"/api/groups/{test_group.id}", headers=auth_headers)).status_code == 404
+        transactions = await client.get("/api/transactions", headers=auth_headers)
+        assert transactions.json()["total"] == 5
+
+    async def test_failed_deletion_job_retried_then_failed(
+        self, client: AsyncClient, auth_headers, test_user, test_group, db_session, monkeypatch
+    ):
+        """Ошибка задачи не блокирует очередь, после исчерпания попыток задача помечается failed"""
+        from sqlalchemy import select
+        from app import deletions
+        from app.models import DeletionJob
+
+        async def broken(db, job, chunk_size):
+            raise RuntimeError("broken")
+
+        monkeypatch.setitem(deletions.DELETION_RUNNERS, "broken", broken)
+        monkeypatch.setattr(deletions, "DELETION_JOB_MAX_ATTEMPTS", 2)
+        failing = DeletionJob(kind="broken", target_id=0, requested_by=test_user.id)
+        db_session.add(failing)
+        db_session.add(DeletionJob(kind="group", target_id=test_group.id, requested_by=test_user.id))
+        await db_session.commit()
+
+        assert await deletions.process_deletion_jobs(db_session) == 1
+        await db_session.refresh(failing)
+        assert (failing.status, failing.attempts, failing.error) == ("pending", 1, "broken")
+        assert failing.run_after > failing.updated_at
+        assert await deletions.process_deletion_jobs(db_session) == 0
+
+        await db_session.refresh(failing)
+        failing.run_after = failing.updated_at
+        await db_session.commit()
+        assert await deletions.process_deletion_jobs(db_session) == 0
+        await db_session.refresh(failing)
+        assert (failing.status, failing.attempts) == ("failed", 2)
+        assert failing.finished_at is not None
+        assert await deletions.process_deletion_jobs(db_session) == 0
+        statuses = (await db_session.execute(select(DeletionJob.status).order_by(DeletionJob.id))).scalars().all()
+        assert statuses == ["failed", "done"]
+
     async def test_delete_group_not_found(self, client: AsyncClient, auth_headers):
         """Удаление несуществующей группы"""
         response = await client.delete(
@@ -475,3 +604,239 @@ class TestGroupAnalytics:
         )
 
         assert response.status_code == 403
+
+
+class TestGroupStatisticsComparison:
+    """Тесты сравнения периодов в статистике группы"""
+
+    async def test_compare_previous_window(
+        self, client: AsyncClient, auth_headers, test_user, test_group, db_session
+    ):
+        """Предыдущее окно той же длины учитывает только транзакции группы"""
+        from datetime import datetime, timezone
+        from app.models import Transaction, TransactionType
+
+        for amount, day, groups in [(10, 3, [test_group]), (20, 12, [test_group]), (50, 12, [])]:
+            transaction = Transaction(
+                name="Expense",
+                type=TransactionType.expense,
+                category="Food",
+                amount=amount,
+                transaction_datetime=datetime(2026, 10, day, tzinfo=timezone.utc),
+                user_id=test_user.id
+            )
+            transaction.groups.extend(groups)
+            db_session.add(transaction)
+        await db_session.commit()
+
+        response = await client.get(
+            f"/api/groups/{test_group.id}/statistics",
+            params={"compare": "previous", "date_from": "2026-10-10T00:00:00Z", "date_to": "2026-10-17T00:00:00Z"},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        comparison = response.json()["comparison"]
+        assert comparison["previous"]["date_from"].startswith("2026-10-03")
+        assert float(comparison["current"]["total_expense"]) == 20
+        assert float(comparison["previous"]["total_expense"]) == 10
+        assert float(comparison["delta"]["total_expense"]) == 10
+
+
+class TestGroupStatisticsByMember:
+    """Тесты разбивки статистики группы по участникам"""
+
+    async def create_member_transactions(self, db_session, test_group, test_user, test_user2):
+        from datetime import datetime, timezone
+        from app.models import Transaction, TransactionType
+
+        test_group.users.append(test_user2)
+        for user, transaction_type, category, amount, month in [
+            (test_user, TransactionType.expense, "Food", 30, 9),
+            (test_user, TransactionType.expense, "Taxi", 20, 10),
+            (test_user, TransactionType.income, "Salary", 100, 10),
+            (test_user2, TransactionType.expense, "Food", 50, 10),
+        ]:
+            transaction = Transaction(
+                name="Item",
+                type=transaction_type,
+                category=category,
+                amount=amount,
+                transaction_datetime=datetime(2026, month, 5, tzinfo=timezone.utc),
+                user_id=user.id
+            )
+            transaction.groups.append(test_group)
+            db_session.add(transaction)
+        await db_session.commit()
+
+    @pytest.mark.parametrize("params", [{}, {"name": "Item"}])
+    async def test_by_member(
+        self, client: AsyncClient, auth_headers, test_user, test_user2, test_group, db_session, params
+    ):
+        """Доходы, расходы и количество по категориям и периодам для каждого участника"""
+        await self.create_member_transactions(db_session, test_group, test_user, test_user2)
+
+        response = await client.get(
+            f"/api/groups/{test_group.id}/statistics", params=params, headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert float(data["total_expense"]) == 100
+        first, second = data["by_member"]
+        assert first["user_id"] == test_user.id
+        assert float(first["total_income"]) == 100
+        assert float(first["total_expense"]) == 50
+        assert first["total_transactions"] == 3
+        assert first["by_category"] == [
+            {"category": "Food", "income": 0, "expense": 30, "count": 1},
+            {"category": "Salary", "income": 100, "expense": 0, "count": 1},
+            {"category": "Taxi", "income": 0, "expense": 20, "count": 1},
+        ]
+        assert [item["period"][:7] for item in first["by_period"]] == ["2026-09", "2026-10"]
+        assert first["by_period"][1]["income"] == 100
+        assert first["by_period"][1]["count"] == 2
+        assert second["user_id"] == test_user2.id
+        assert float(second["total_expense"]) == 50
+        assert second["by_category"] == [{"category": "Food", "income": 0, "expense": 50, "count": 1}]
+
+    async def test_member_without_transactions(self, client: AsyncClient, auth_headers, test_user, test_group):
+        """Участник без транзакций присутствует с нулевыми суммами"""
+        response = await client.get(f"/api/groups/{test_group.id}/statistics", headers=auth_headers)
+
+        assert response.status_code == 200
+        member = response.json()["by_member"][0]
+        assert member["user_id"] == test_user.id
+        assert member["total_transactions"] == 0
+        assert member["by_category"] == []
+
+
+class TestGroupSettlement:
+    """Тесты взаиморасчетов группы GET /api/groups/{group_id}/settlement"""
+
+    def test_settle_minimal_transfers(self):
+        """Жадный алгоритм закрывает все долги не более чем n - 1 переводом"""
+        from app.settlement import settle
+
+        net = {1: 5000, 2: -1000, 3: -4000, 4: 2500, 5: -2500}
+        transfers = settle(net)
+
+        assert len(transfers) <= len(net) - 1
+        for debtor, creditor, amount in transfers:
+            net[debtor] += amount
+            net[creditor] -= amount
+        assert set(net.values()) == {0}
+
+    def test_shares_split_remainder(self):
+        """Остаток от деления расходов распределяется по копейке"""
+        from app.settlement import net_positions
+
+        positions = net_positions({1: 100, 2: 0, 3: 0})
+
+        assert positions == {1: (34, 66), 2: (33, -33), 3: (33, -33)}
+
+    async def add_member(self, db_session, test_group, login: str):
+        from app.utils import hash_password
+
+        user = User(first_name=login, last_name="User", login=login, password=hash_password("password123"))
+        test_group.users.append(user)
+        await db_session.commit()
+        return user
+
+    async def create_expenses(self, client: AsyncClient, test_group, expenses):
+        for headers, amount in expenses:
+            await client.post(
+                "/api/transactions",
+                json={"name": "Dinner", "category": "Food", "amount": amount, "group_ids": [test_group.id]},
+                headers=headers
+            )
+
+    async def test_settlement(
+        self, client: AsyncClient, auth_headers, auth_headers2, test_user, test_user2, test_group, db_session
+    ):
+        """Расходы делятся поровну, должники переводят кредиторам"""
+        test_group.users.append(test_user2)
+        third = await self.add_member(db_session, test_group, "third")
+        await self.create_expenses(client, test_group, [(auth_headers, 90), (auth_headers2, 30)])
+
+        response = await client.get(f"/api/groups/{test_group.id}/settlement", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert float(data["total_expense"]) == 120
+        assert [(member["user_id"], float(member["share"]), float(member["net"])) for member in data["members"]] == [
+            (test_user.id, 40, 50), (test_user2.id, 40, -10), (third.id, 40, -40)
+        ]
+        assert [(item["from_user_id"], item["to_user_id"], float(item["amount"])) for item in data["transfers"]] == [
+            (third.id, test_user.id, 40), (test_user2.id, test_user.id, 10)
+        ]
+
+    async def test_settlement_cached_per_version(
+        self, client: AsyncClient, auth_headers, test_user, test_group, db_session
+    ):
+        """Результат кэшируется до изменения версии группы"""
+        from app.settlement import settlement_cache
+
+        member = await self.add_member(db_session, test_group, "member")
+        await self.create_expenses(client, test_group, [(auth_headers, 10)])
+        first = (await client.get(f"/api/groups/{test_group.id}/settlement", headers=auth_headers)).json()
+        assert settlement_cache.get(test_group.id, first["version"]) == first
+
+        await self.create_expenses(client, test_group, [(auth_headers, 30)])
+        second = (await client.get(f"/api/groups/{test_group.id}/settlement", headers=auth_headers)).json()
+
+        assert second["version"] > first["version"]
+        assert second["transfers"] == [{"from_user_id": member.id, "to_user_id": test_user.id, "amount": 20.0}]
+
+    async def test_settlement_forbidden(self, client: AsyncClient, auth_headers2, test_group):
+        """Взаиморасчеты чужой группы"""
+        response = await client.get(f"/api/groups/{test_group.id}/settlement", headers=auth_headers2)
+
+        assert response.status_code == 403
+
+    async def test_settlement_not_found(self, client: AsyncClient, auth_headers):
+        """Взаиморасчеты несуществующей группы"""
+        response = await client.get("/api/groups/99999/settlement", headers=auth_headers)
+
+        assert response.status_code == 404
+
+
+class TestGroupStatisticsDistribution:
+    """Тесты распределения расходов группы"""
+
+    async def test_distribution_only_group_transactions(
+        self, client: AsyncClient, auth_headers, test_user, test_group, db_session
+    ):
+        """Учитываются только транзакции группы"""
+        from app.models import Transaction, TransactionType
+
+        for amount, groups in [(10, [test_group]), (30, [test_group]), (100, [])]:
+            transaction = Transaction(
+                name="Expense",
+                type=TransactionType.expense,
+                category="Food",
+                amount=amount,
+                user_id=test_user.id
+            )
+            transaction.groups.extend(groups)
+            db_session.add(transaction)
+        await db_session.commit()
+
+        response = await client.get(
+            f"/api/groups/{test_group.id}/statistics/distribution", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        food = response.json()["by_category_expense"][0]
+        assert food["count"] == 2
+        assert food["median"] == 20
+
+    async def test_distribution_forbidden(
+        self, client: AsyncClient, auth_headers2, test_group
+    ):
+        """Распределение чужой группы"""
+        response = await client.get(
+            f"/api/groups/{test_group.id}/statistics/distribution", headers=auth_headers2
+        )
+
+        assert response.status_code == 403
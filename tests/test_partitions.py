@@ -0,0 +1,168 @@
+"""
+Тесты обслуживания секций таблицы транзакций (Partitions Tests)
+"""
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy import select, delete, update, func, text
+from app.models import (User, Group, Transaction, TransactionType, transaction_group_association, Balance,
+                        BudgetUsage, TransactionTombstone, TransactionListEntry, ChangeEvent)
+from app.partitions import (month_start, add_months, partition_name, partition_month,
+                            is_partitioned, get_partitions, create_future_partitions, detach_old_partitions)
+from app.utils import hash_password
+
+
+async def create_grouped_transaction(session, when: datetime) -> Transaction:
+    user = User(first_name="Test", last_name="User", login=f"user_{when:%Y%m%d%H%M%S%f}",
+                password=hash_password("testpassword123"))
+    session.add(user)
+    await session.flush()
+
+    group = Group(name="Test Group", owner_id=user.id)
+    group.users.append(user)
+    transaction = Transaction(
+        name="Test Transaction",
+        type=TransactionType.expense,
+        category="Food",
+        amount=100,
+        user_id=user.id,
+        transaction_datetime=when
+    )
+    transaction.groups.append(group)
+    session.add_all([group, transaction])
+    await session.commit()
+    return transaction
+
+
+async def count_links(session, transaction_id: int) -> int:
+    result = await session.execute(
+        select(func.count())
+        .select_from(transaction_group_association)
+        .where(transaction_group_association.c.transaction_id == transaction_id)
+    )
+    return result.scalar()
+
+
+class TestPartitionHelpers:
+    """Тесты вспомогательных функций секционирования"""
+
+    def test_month_start(self):
+        """Начало месяца в UTC"""
+        value = datetime(2026, 10, 19, 15, 30, tzinfo=timezone.utc)
+        assert month_start(value) == datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+    def test_add_months_across_years(self):
+        """Сдвиг на несколько месяцев через границу года"""
+        start = datetime(2026, 11, 1, tzinfo=timezone.utc)
+        assert add_months(start, 3) == datetime(2027, 2, 1, tzinfo=timezone.utc)
+        assert add_months(start, -11) == datetime(2025, 12, 1, tzinfo=timezone.utc)
+
+    def test_partition_name_roundtrip(self):
+        """Имя секции и обратный разбор месяца"""
+        month = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        assert partition_name(month) == "transactions_2026_03"
+        assert partition_month("transactions_2026_03") == month
+        assert partition_month("transactions_default") is None
+
+
+class TestPartitionMaintenance:
+    """Тесты проверки секционирования таблицы"""
+
+    async def test_plain_table_is_not_partitioned(self, db_session):
+        """Таблица, созданная через metadata, не секционирована"""
+        assert await is_partitioned(db_session) is False
+
+
+class TestMigratedSchema:
+    """Тесты на схеме, созданной миграциями Alembic"""
+
+    async def test_migrated_table_is_partitioned(self, migrated_session):
+        """После миграций таблица транзакций секционирована"""
+        assert await is_partitioned(migrated_session) is True
+        now = datetime.now(timezone.utc)
+        assert partition_name(month_start(now)) in await get_partitions(migrated_session)
+
+    async def test_delete_transaction_removes_links(self, migrated_session):
+        """Удаление транзакции удаляет её связи с группами триггером"""
+        transaction = await create_grouped_transaction(migrated_session, datetime.now(timezone.utc))
+        assert await count_links(migrated_session, transaction.id) == 1
+
+        await migrated_session.execute(delete(Transaction).where(Transaction.id == transaction.id))
+        await migrated_session.commit()
+
+        assert await count_links(migrated_session, transaction.id) == 0
+
+    async def test_move_between_partitions_keeps_links(self, migrated_session):
+        """Перенос транзакции в другую секцию сохраняет связи с группами"""
+        now = datetime.now(timezone.utc)
+        transaction = await create_grouped_transaction(migrated_session, now)
+
+        await migrated_session.execute(
+            update(Transaction)
+            .where(Transaction.id == transaction.id)
+            .values(transaction_datetime=add_months(month_start(now), 1))
+        )
+        await migrated_session.commit()
+
+        assert await count_links(migrated_session, transaction.id) == 1
+
+    async def test_create_future_partitions(self, migrated_session):
+        """Создаются только недостающие секции, повторный вызов ничего не создаёт"""
+        now = datetime.now(timezone.utc)
+        existing = await get_partitions(migrated_session)
+
+        created = await create_future_partitions(migrated_session, now, months_ahead=5)
+
+        expected = [partition_name(add_months(month_start(now), offset)) for offset in range(6)]
+        assert created == [name for name in expected if name not in existing]
+        assert set(expected) <= set(await get_partitions(migrated_session))
+        assert await create_future_partitions(migrated_session, now, months_ahead=5) == []
+
+    async def test_detach_old_partitions_retires_rows(self, migrated_session):
+        """Отсоединение старой секции вычитает её транзакции из агрегатов"""
+        now = datetime.now(timezone.utc)
+        old_month = add_months(month_start(now), -24)
+        name = partition_name(old_month)
+        await migrated_session.execute(text(
+            f"CREATE TABLE {name} PARTITION OF transactions "
+            f"FOR VALUES FROM ('{old_month.isoformat()}') TO ('{add_months(old_month, 1).isoformat()}')"
+        ))
+        await migrated_session.commit()
+
+        old = await create_grouped_transaction(migrated_session, old_month.replace(day=15))
+        user_id, group_id = old.user_id, old.groups[0].id
+        recent = Transaction(name="Recent", type=TransactionType.income, category="Salary", amount=500,
+                             user_id=user_id, transaction_datetime=now)
+        migrated_session.add(recent)
+        await migrated_session.commit()
+
+        detached = await detach_old_partitions(migrated_session, now, 12)
+
+        assert detached == [name]
+        assert name not in await get_partitions(migrated_session)
+        assert (await migrated_session.execute(text(f"SELECT count(*) FROM {name}"))).scalar() == 1
+        assert await count_links(migrated_session, old.id) == 0
+
+        balances = {
+            (balance.kind, balance.owner_id): balance
+            for balance in (await migrated_session.execute(select(Balance))).scalars().all()
+        }
+        assert balances[("user", user_id)].transaction_count == 1
+        assert balances[("user", user_id)].total_income == 500
+        assert balances[("user", user_id)].total_expense == 0
+        assert balances[("group", group_id)].transaction_count == 0
+
+        usage = await migrated_session.execute(
+            select(BudgetUsage.amount).where(BudgetUsage.user_id == user_id, BudgetUsage.month == old_month)
+        )
+        assert usage.scalar() == 0
+        assert await migrated_session.get(TransactionTombstone, old.id) is not None
+
+        entries = await migrated_session.execute(
+            select(TransactionListEntry.transaction_id).where(TransactionListEntry.user_id == user_id)
+        )
+        assert entries.scalars().all() == [recent.id]
+
+        events = await migrated_session.execute(
+            select(ChangeEvent.action, ChangeEvent.group_ids).where(ChangeEvent.entity_id == old.id)
+        )
+        assert ("deleted", [group_id]) in events.all()
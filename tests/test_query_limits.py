@@ -0,0 +1,143 @@
+"""
+Тесты ограничения времени запросов к БД (Query Limits Tests)
+
+- SET LOCAL statement_timeout по классу маршрута в сессии из get_db
+- 503 при превышении statement_timeout
+- Отмена запроса при отключении клиента
+- GET /metrics - Счетчики тайм-аутов и отмен
+"""
+import asyncio
+import time
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from starlette.requests import Request
+from app.query_limits import (CancelOnDisconnectMiddleware, statement_timeout, statement_timeout_handler,
+                              is_statement_timeout, query_metrics, reset_metrics)
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    reset_metrics()
+    yield
+    reset_metrics()
+
+
+def make_request(method: str, path: str) -> Request:
+    return Request({"type": "http", "method": method, "path": path, "headers": [], "query_string": b""})
+
+
+class TestStatementTimeout:
+    """Тесты statement_timeout"""
+
+    @pytest.mark.parametrize("method,path,expected", [
+        ("GET", "/api/auth/me/statistics", 15000),
+        ("GET", "/api/transactions", 5000),
+        ("POST", "/api/transactions", 10000),
+        ("GET", "/health", None),
+    ])
+    def test_timeout_by_route_class(self, method, path, expected):
+        """Тайм-аут выбирается по классу маршрута"""
+        assert statement_timeout(method, path) == expected
+
+    async def test_timeout_applied_per_transaction(self, db_session):
+        """Тайм-аут устанавливается в каждой транзакции сессии"""
+        db_session.info["statement_timeout"] = 50
+        await db_session.rollback()
+
+        for _ in range(2):
+            result = await db_session.execute(text("SHOW statement_timeout"))
+            assert result.scalar() == "50ms"
+            await db_session.commit()
+
+        with pytest.raises(DBAPIError) as error:
+            await db_session.execute(text("SELECT pg_sleep(1)"))
+        await db_session.rollback()
+        db_session.info.pop("statement_timeout")
+
+        assert is_statement_timeout(error.value)
+
+    async def test_timeout_reported_as_503(self, db_session):
+        """Превышение тайм-аута возвращает 503 и учитывается в метриках"""
+        db_session.info["statement_timeout"] = 10
+        await db_session.rollback()
+        with pytest.raises(DBAPIError) as error:
+            await db_session.execute(text("SELECT pg_sleep(1)"))
+        await db_session.rollback()
+        db_session.info.pop("statement_timeout")
+
+        response = await statement_timeout_handler(make_request("GET", "/api/auth/me/statistics"), error.value)
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+        assert query_metrics["statement_timeouts"]["statistics"] == 1
+
+    async def test_metrics_endpoint(self, client: AsyncClient):
+        """Метрики доступны через GET /metrics"""
+        query_metrics["statement_timeouts"]["reads"] += 2
+
+        response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.json()["statement_timeouts"] == {"reads": 2}
+
+
+class TestCancelOnDisconnect:
+    """Тесты отмены обработки при отключении клиента"""
+
+    async def run_with_disconnect(self, app, delay: float = 0.05):
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(delay)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            pass
+
+        scope = {"type": "http", "method": "GET", "path": "/api/auth/me/statistics", "headers": []}
+        started = time.monotonic()
+        await CancelOnDisconnectMiddleware(app)(scope, receive, send)
+        return time.monotonic() - started
+
+    async def test_handler_cancelled(self):
+        """Обработчик отменяется, если клиент отключился до ответа"""
+        cancelled = asyncio.Event()
+
+        async def slow_app(scope, receive, send):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        elapsed = await self.run_with_disconnect(slow_app)
+
+        assert elapsed < 1
+        assert cancelled.is_set()
+        assert query_metrics["cancelled_on_disconnect"]["statistics"] == 1
+
+    async def test_query_cancelled_on_server(self, db_session):
+        """Запрос к БД прерывается на сервере после отключения клиента"""
+        async def query_app(scope, receive, send):
+            await db_session.execute(text("SELECT pg_sleep(10)"))
+
+        elapsed = await self.run_with_disconnect(query_app, delay=0.2)
+        await db_session.rollback()
+
+        async with db_session.bind.connect() as connection:
+            result = await connection.execute(text(
+                "SELECT count(*) FROM pg_stat_activity WHERE query = 'SELECT pg_sleep(10)' AND state = 'active'"
+            ))
+            assert result.scalar() == 0
+        assert elapsed < 5
+
+    async def test_completed_response_not_cancelled(self, client: AsyncClient):
+        """Обычный запрос не считается отмененным"""
+        response = await client.get("/health")
+
+        assert response.status_code == 200
+        assert query_metrics["cancelled_on_disconnect"] == {}
@@ -0,0 +1,130 @@
+"""
+Тесты ограничения частоты запросов (Rate Limit Tests)
+
+Классы маршрутов: auth, reads, statistics, writes
+- GET /api/auth/me/statistics - statistics
+- GET /api/transactions - reads
+- POST /api/auth/login - auth
+"""
+import pytest
+from httpx import AsyncClient
+from app.rate_limit import RateLimiter, RouteLimit, rate_limiter
+from app.route_classes import route_class
+
+
+@pytest.fixture
+def strict_statistics(monkeypatch):
+    monkeypatch.setitem(rate_limiter.limits, "statistics", RouteLimit(per_minute=6, burst=2, concurrency=2))
+
+
+class TestRouteClass:
+    """Тесты определения класса маршрута"""
+
+    @pytest.mark.parametrize("method,path,expected", [
+        ("POST", "/api/auth/login", "auth"),
+        ("GET", "/api/auth/me", "reads"),
+        ("GET", "/api/auth/me/statistics", "statistics"),
+        ("GET", "/api/groups/1/statistics/distribution", "statistics"),
+        ("GET", "/api/transactions", "reads"),
+        ("POST", "/api/transactions", "writes"),
+        ("DELETE", "/api/groups/1", "writes"),
+        ("GET", "/health", None),
+    ])
+    def test_route_class(self, method, path, expected):
+        """Маршрут относится к нужному классу ограничений"""
+        assert route_class(method, path) == expected
+
+
+class TestRateLimiter:
+    """Тесты токен-бакета и ограничений параллельности"""
+
+    def test_concurrency_cap(self):
+        """Параллельные запросы сверх лимита отклоняются до освобождения"""
+        limit = RouteLimit(per_minute=600, burst=10, concurrency=1)
+        limiter = RateLimiter({"reads": limit})
+        bucket = ("reads", "user:1")
+
+        assert limiter.acquire(bucket, limit, stream=False) is None
+        assert limiter.acquire(bucket, limit, stream=False) == (429, 1.0)
+        assert limiter.acquire(("reads", "user:2"), limit, stream=False) is None
+
+        limiter.release(bucket)
+        assert limiter.acquire(bucket, limit, stream=False) is None
+
+    def test_retry_after(self):
+        """Время до повтора равно времени пополнения одного токена"""
+        limit = RouteLimit(per_minute=6, burst=1, concurrency=5)
+        limiter = RateLimiter({"reads": limit})
+        bucket = ("reads", "user:1")
+
+        assert limiter.acquire(bucket, limit, stream=False) is None
+        limiter.release(bucket)
+        status_code, retry_after = limiter.acquire(bucket, limit, stream=False)
+
+        assert status_code == 429
+        assert 9 < retry_after <= 10
+
+    def test_global_in_flight(self):
+        """Общий лимит одновременных запросов сбрасывает нагрузку"""
+        limit = RouteLimit(per_minute=600, burst=10, concurrency=5)
+        limiter = RateLimiter({"reads": limit}, max_in_flight=1)
+
+        assert limiter.acquire(("reads", "user:1"), limit, stream=False) is None
+        assert limiter.acquire(("reads", "user:2"), limit, stream=False) == (503, 1.0)
+
+
+class TestRateLimitMiddleware:
+    """Тесты ответа 429 при превышении лимитов"""
+
+    async def test_statistics_limited(self, client: AsyncClient, auth_headers, strict_statistics):
+        """Превышение лимита статистики возвращает 429 с Retry-After"""
+        for _ in range(2):
+            response = await client.get("/api/auth/me/statistics", headers=auth_headers)
+            assert response.status_code == 200
+
+        response = await client.get("/api/auth/me/statistics", headers=auth_headers)
+
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "10"
+        assert response.json()["detail"] == "Слишком много запросов, повторите позже"
+
+    async def test_limits_per_user_and_class(
+        self, client: AsyncClient, auth_headers, auth_headers2, strict_statistics
+    ):
+        """Лимит считается отдельно для пользователя и класса маршрутов"""
+        for _ in range(3):
+            await client.get("/api/auth/me/statistics", headers=auth_headers)
+
+        response = await client.get("/api/auth/me/statistics", headers=auth_headers2)
+        assert response.status_code == 200
+
+        response = await client.get("/api/transactions", headers=auth_headers)
+        assert response.status_code == 200
+
+    async def test_auth_limited_by_client(self, client: AsyncClient, test_user, monkeypatch):
+        """Запросы аутентификации ограничиваются по адресу клиента"""
+        monkeypatch.setitem(rate_limiter.limits, "auth", RouteLimit(per_minute=1, burst=1, concurrency=1))
+        credentials = {"login": "testuser", "password": "wrong"}
+
+        first = await client.post("/api/auth/login", json=credentials)
+        second = await client.post("/api/auth/login", json=credentials)
+
+        assert first.status_code == 401
+        assert second.status_code == 429
+
+    async def test_overload(self, client: AsyncClient, auth_headers, monkeypatch):
+        """При исчерпании общего лимита возвращается 503"""
+        monkeypatch.setattr(rate_limiter, "max_in_flight", 0)
+
+        response = await client.get("/api/transactions", headers=auth_headers)
+
+        assert response.status_code == 503
+        assert "retry-after" in response.headers
+
+    async def test_health_not_limited(self, client: AsyncClient, monkeypatch):
+        """Проверка здоровья не ограничивается"""
+        monkeypatch.setattr(rate_limiter, "max_in_flight", 0)
+
+        response = await client.get("/health")
+
+        assert response.status_code == 200
@@ -0,0 +1,103 @@
+"""
+Тесты времени запуска приложения (Startup Tests)
+
+- Импорт app.main без переменных окружения и без подключения к БД
+- Ленивое создание движка БД и планировщика
+- Бюджет времени импорта (python -X importtime)
+"""
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+IMPORT_TIME_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", "2000"))
+
+
+def run_python(code: str, *options: str, **env) -> subprocess.CompletedProcess:
+    environment = {
+        key: value for key, value in os.environ.items()
+        if key not in ("DATABASE_URL", "SECRET_KEY", "SCHEDULER_ENABLED")
+    }
+    environment.update(env)
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        capture_output=True, text=True, env=environment, timeout=60,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+def loaded_modules(module: str, *names: str) -> dict:
+    result = run_python(
+        f"import json, sys, {module}; print(json.dumps({{name: name in sys.modules for name in {list(names)}}}))"
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def import_time_ms(module: str) -> float:
+    result = run_python(f"import {module}", "-X", "importtime")
+    assert result.returncode == 0, result.stderr
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and line.split("|")[-1].strip() == module:
+            return int(line.split("|")[1]) / 1000
+    pytest.fail(f"{module} не найден в выводе -X importtime")
+
+
+class TestLazyStartup:
+    """Тесты ленивой инициализации"""
+
+    def test_import_without_settings(self):
+        """app.main импортируется без DATABASE_URL и SECRET_KEY"""
+        result = run_python(
+            "from app.database import get_engine; import app.main; print(get_engine.cache_info().currsize)"
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip().splitlines()[-1] == "0"
+
+    def test_heavy_modules_not_loaded(self):
+        """Планировщик и pyarrow не загружаются при импорте приложения"""
+        modules = loaded_modules("app.main", "apscheduler", "app.scheduler", "pyarrow")
+
+        assert modules == {"apscheduler": False, "app.scheduler": False, "pyarrow": False}
+
+    def test_scheduler_enabled_by_default(self):
+        """Без SCHEDULER_ENABLED планировщик включен"""
+        result = run_python("import app.main; print(app.main.SCHEDULER_ENABLED)")
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip().splitlines()[-1] == "True"
+
+    async def test_analytics_subscribed_without_scheduler(self, monkeypatch):
+        """Кэш аналитики подписывается на события при старте даже без планировщика"""
+        from app import main
+        from app.analytics import analytics_cache
+        from app.events import subscribers
+
+        monkeypatch.setattr(main, "SCHEDULER_ENABLED", False)
+        async with main.lifespan(main.app):
+            assert analytics_cache.change_events_dispatched in subscribers
+
+        assert analytics_cache.change_events_dispatched not in subscribers
+
+    def test_models_without_web_stack(self):
+        """Модели (используются Alembic) не тянут FastAPI"""
+        modules = loaded_modules("app.models", "fastapi", "app.query_limits")
+
+        assert modules == {"fastapi": False, "app.query_limits": False}
+
+    def test_engine_requires_database_url(self):
+        """Отсутствие DATABASE_URL обнаруживается при создании движка"""
+        result = run_python("from app.database import get_engine; get_engine()")
+
+        assert result.returncode != 0
+        assert "DATABASE_URL environment variable is not set" in result.stderr
+
+
+class TestImportTime:
+    """Тесты бюджета времени импорта"""
+
+    def test_app_import_within_budget(self):
+        """Импорт app.main укладывается в бюджет IMPORT_TIME_BUDGET_MS"""
+        elapsed = min(import_time_ms("app.main") for _ in range(3))
+
+        assert elapsed < IMPORT_TIME_BUDGET_MS, f"app.main импортируется {elapsed:.0f} мс"
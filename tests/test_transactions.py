@@ -4,13 +4,18 @@
 Эндпоинты:
 - GET /api/transactions - Получить список транзакций
 - POST /api/transactions - Создать транзакцию
+- POST /api/transactions/batch - Создать несколько транзакций
 - PUT /api/transactions/{id} - Редактировать транзакцию
 - DELETE /api/transactions/{id} - Удалить транзакцию
+- PATCH /api/transactions/bulk - Массово обновить транзакции
+- DELETE /api/transactions/bulk - Массово удалить транзакции
 - GET /api/transactions/{id} - Получить транзакцию по ID
+- GET /api/transactions/changes - Получить изменения транзакций после токена
 """
 import pytest
 from httpx import AsyncClient
 from decimal import Decimal
+from app.sync import parse_sync_token
 
 
 class TestGetTransactions:
@@ -76,6 +81,118 @@ class TestGetTransactions:
         data2 = response2.json()
         assert len(data2["items"]) == 10
 
+    async def test_get_transactions_without_count(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Пагинация без подсчета общего количества"""
+        from app.models import Transaction, TransactionType
+
+        for i in range(15):
+            db_session.add(Transaction(
+                name=f"Transaction {i}",
+                type=TransactionType.expense,
+                category="Test",
+                amount=10.00,
+                user_id=test_user.id
+            ))
+        await db_session.commit()
+
+        response = await client.get(
+            "/api/transactions?page=1&size=10&count=none",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) == 10
+        assert data["total"] is None
+        assert data["pages"] is None
+        assert data["has_more"] is True
+
+        response2 = await client.get(
+            "/api/transactions?page=2&size=10&count=none",
+            headers=auth_headers
+        )
+        data2 = response2.json()
+        assert len(data2["items"]) == 5
+        assert data2["has_more"] is False
+
+    async def test_get_transactions_estimated_count(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Пагинация с оценкой общего количества"""
+        from app.models import Transaction, TransactionType
+
+        for i in range(15):
+            db_session.add(Transaction(
+                name=f"Transaction {i}",
+                type=TransactionType.expense,
+                category="Test",
+                amount=10.00,
+                user_id=test_user.id
+            ))
+        await db_session.commit()
+
+        response = await client.get(
+            "/api/transactions?page=1&size=10&count=estimated",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) == 10
+        assert data["total"] >= 10
+        assert data["pages"] >= 1
+
+        response2 = await client.get(
+            "/api/transactions?page=2&size=10&count=estimated&category=Test",
+            headers=auth_headers
+        )
+        data2 = response2.json()
+        assert len(data2["items"]) == 5
+        assert data2["total"] == 15
+
+    async def test_get_transactions_estimate_below_count(
+        self, client: AsyncClient, auth_headers, test_user, db_session, monkeypatch
+    ):
+        """Заниженная оценка планировщика не обрывает пагинацию"""
+        from app import utils
+        from app.models import Transaction, TransactionType
+
+        for i in range(6):
+            db_session.add(Transaction(
+                name=f"Transaction {i}",
+                type=TransactionType.expense,
+                category="Test",
+                amount=10.00,
+                user_id=test_user.id
+            ))
+        await db_session.commit()
+
+        async def low_estimate(db, query):
+            return 1
+
+        monkeypatch.setattr(utils, "estimate_count", low_estimate)
+
+        response = await client.get("/api/transactions?page=1&size=1&count=estimated", headers=auth_headers)
+
+        data = response.json()
+        assert len(data["items"]) == 1
+        assert data["has_more"] is True
+        assert data["total"] >= 2
+        assert data["pages"] >= 2
+
+        last = (await client.get("/api/transactions?page=6&size=1&count=estimated", headers=auth_headers)).json()
+        assert len(last["items"]) == 1
+        assert last["has_more"] is False
+        assert last["total"] == 6
+
+    async def test_get_transactions_invalid_count(self, client: AsyncClient, auth_headers):
+        """Недопустимая стратегия подсчета"""
+        response = await client.get("/api/transactions?count=fast", headers=auth_headers)
+
+        assert response.status_code == 422
+
     async def test_get_transactions_filter_by_type(
         self, client: AsyncClient, auth_headers, test_user, db_session
     ):
@@ -142,6 +259,123 @@ class TestGetTransactions:
         for item in data["items"]:
             assert item["category"] == "Food"
 
+    async def test_get_transactions_filter_by_categories(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Фильтрация транзакций по нескольким категориям"""
+        from app.models import Transaction, TransactionType
+
+        for category in ["Food", "Transport", "Health"]:
+            db_session.add(Transaction(
+                name=f"{category} expense",
+                type=TransactionType.expense,
+                category=category,
+                amount=10.00,
+                user_id=test_user.id
+            ))
+        await db_session.commit()
+
+        response = await client.get(
+            "/api/transactions?categories=Food&categories=Health",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert {item["category"] for item in data["items"]} == {"Food", "Health"}
+
+    async def test_get_transactions_filter_by_amount_range(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Фильтрация транзакций по диапазону сумм"""
+        from app.models import Transaction, TransactionType
+
+        for amount in [5.00, 50.00, 500.00]:
+            db_session.add(Transaction(
+                name=f"Expense {amount}",
+                type=TransactionType.expense,
+                category="Test",
+                amount=amount,
+                user_id=test_user.id
+            ))
+        await db_session.commit()
+
+        response = await client.get(
+            "/api/transactions?amount_min=10&amount_max=100",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert float(data["items"][0]["amount"]) == 50.00
+
+    async def test_get_transactions_filter_by_date_range(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Фильтрация транзакций по диапазону дат"""
+        from datetime import datetime, timezone
+        from app.models import Transaction, TransactionType
+
+        for month in [1, 2, 3]:
+            db_session.add(Transaction(
+                name=f"Expense {month}",
+                type=TransactionType.expense,
+                category="Test",
+                amount=10.00,
+                transaction_datetime=datetime(2025, month, 15, tzinfo=timezone.utc),
+                user_id=test_user.id
+            ))
+        await db_session.commit()
+
+        response = await client.get(
+            "/api/transactions",
+            params={"date_from": "2025-02-01T00:00:00Z", "date_to": "2025-03-15T00:00:00Z"},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["name"] == "Expense 2"
+
+    async def test_get_transactions_filter_by_types(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Фильтрация транзакций по нескольким типам"""
+        from app.models import Transaction, TransactionType
+
+        db_session.add_all([
+            Transaction(name="Income", type=TransactionType.income, category="Salary",
+                        amount=1000.00, user_id=test_user.id),
+            Transaction(name="Expense", type=TransactionType.expense, category="Food",
+                        amount=50.00, user_id=test_user.id),
+        ])
+        await db_session.commit()
+
+        response = await client.get(
+            "/api/transactions?types=income&types=expense",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 2
+
+    async def test_get_transactions_filter_by_group_ids(
+        self, client: AsyncClient, auth_headers, test_transaction, test_transaction_with_group, test_group
+    ):
+        """Фильтрация транзакций по группам"""
+        response = await client.get(
+            f"/api/transactions?group_ids={test_group.id}",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["id"] == test_transaction_with_group.id
+
     async def test_get_transactions_unauthorized(self, client: AsyncClient):
         """Получение транзакций без авторизации"""
         response = await client.get("/api/transactions")
@@ -178,6 +412,25 @@ class TestCreateTransaction:
         assert "id" in data
         assert "transaction_datetime" in data
 
+    async def test_create_transaction_reuses_category(
+        self, client: AsyncClient, auth_headers, db_session
+    ):
+        """Транзакции с одинаковой категорией ссылаются на одну запись категории"""
+        from sqlalchemy import select
+        from app.models import Category
+
+        for name in ["Lunch", "Dinner"]:
+            response = await client.post(
+                "/api/transactions",
+                headers=auth_headers,
+                json={"name": name, "category": "Food", "amount": 10}
+            )
+            assert response.status_code == 201
+            assert response.json()["category"] == "Food"
+
+        result = await db_session.execute(select(Category).where(Category.name == "Food"))
+        assert len(result.scalars().all()) == 1
+
     async def test_create_transaction_income(
         self, client: AsyncClient, auth_headers
     ):
@@ -281,6 +534,240 @@ class TestCreateTransaction:
         assert response.status_code == 403
 
 
+class TestCreateTransactionsBatch:
+    """Тесты пакетного создания транзакций POST /api/transactions/batch"""
+
+    async def test_create_batch_success(self, client: AsyncClient, auth_headers):
+        """Успешное создание нескольких транзакций с сохранением порядка"""
+        response = await client.post(
+            "/api/transactions/batch",
+            headers=auth_headers,
+            json={"items": [
+                {"name": f"Offline {i}", "type": "expense", "category": "Food", "amount": 10 + i}
+                for i in range(5)
+            ]}
+        )
+
+        assert response.status_code == 201
+        data = response.json()
+        assert [item["name"] for item in data] == [f"Offline {i}" for i in range(5)]
+        assert [float(item["amount"]) for item in data] == [10, 11, 12, 13, 14]
+
+        list_response = await client.get("/api/transactions", headers=auth_headers)
+        assert list_response.json()["total"] == 5
+
+    async def test_create_batch_with_groups(
+        self, client: AsyncClient, auth_headers, test_group
+    ):
+        """Пакетное создание транзакций с привязкой к группе"""
+        response = await client.post(
+            "/api/transactions/batch",
+            headers=auth_headers,
+            json={"items": [
+                {"name": "Shared", "category": "Shared", "amount": 100, "group_ids": [test_group.id]},
+                {"name": "Personal", "category": "Food", "amount": 50},
+            ]}
+        )
+
+        assert response.status_code == 201
+        data = response.json()
+        assert [g["id"] for g in data[0]["groups"]] == [test_group.id]
+        assert data[1]["groups"] == []
+
+    async def test_create_batch_forbidden_group(
+        self, client: AsyncClient, auth_headers2, test_group
+    ):
+        """Пакетное создание транзакций в чужой группе"""
+        response = await client.post(
+            "/api/transactions/batch",
+            headers=auth_headers2,
+            json={"items": [
+                {"name": "Personal", "category": "Food", "amount": 50},
+                {"name": "Shared", "category": "Shared", "amount": 100, "group_ids": [test_group.id]},
+            ]}
+        )
+
+        assert response.status_code == 403
+
+        list_response = await client.get("/api/transactions", headers=auth_headers2)
+        assert list_response.json()["total"] == 0
+
+    async def test_create_batch_recurring_without_period(
+        self, client: AsyncClient, auth_headers
+    ):
+        """Регулярная транзакция в пакете без периода"""
+        response = await client.post(
+            "/api/transactions/batch",
+            headers=auth_headers,
+            json={"items": [
+                {"name": "Rent", "category": "Home", "amount": 500, "is_recurring": True},
+            ]}
+        )
+
+        assert response.status_code == 400
+
+    async def test_create_batch_too_large(self, client: AsyncClient, auth_headers):
+        """Слишком большой пакет транзакций"""
+        response = await client.post(
+            "/api/transactions/batch",
+            headers=auth_headers,
+            json={"items": [
+                {"name": f"T {i}", "category": "Test", "amount": 1} for i in range(101)
+            ]}
+        )
+
+        assert response.status_code == 422
+
+    async def test_create_batch_empty(self, client: AsyncClient, auth_headers):
+        """Пустой пакет транзакций"""
+        response = await client.post(
+            "/api/transactions/batch",
+            headers=auth_headers,
+            json={"items": []}
+        )
+
+        assert response.status_code == 422
+
+    async def test_create_batch_unauthorized(self, client: AsyncClient):
+        """Пакетное создание транзакций без авторизации"""
+        response = await client.post(
+            "/api/transactions/batch",
+            json={"items": [{"name": "T", "category": "Test", "amount": 1}]}
+        )
+
+        assert response.status_code == 403
+
+
+class TestIdempotency:
+    """Тесты заголовка Idempotency-Key при создании транзакций"""
+
+    async def test_create_retry_returns_stored_response(
+        self, client: AsyncClient, auth_headers
+    ):
+        """Повторный запрос с тем же ключом не создает дубликат"""
+        headers = {**auth_headers, "Idempotency-Key": "retry-1"}
+        payload = {"name": "Coffee", "type": "expense", "category": "Food", "amount": 3.5}
+
+        first = await client.post("/api/transactions", headers=headers, json=payload)
+        second = await client.post("/api/transactions", headers=headers, json=payload)
+
+        assert first.status_code == 201
+        assert second.status_code == 201
+        assert second.json() == first.json()
+
+        list_response = await client.get("/api/transactions", headers=auth_headers)
+        assert list_response.json()["total"] == 1
+
+    async def test_create_key_reused_with_other_payload(
+        self, client: AsyncClient, auth_headers
+    ):
+        """Повторное использование ключа с другим телом запроса"""
+        headers = {**auth_headers, "Idempotency-Key": "retry-2"}
+
+        first = await client.post(
+            "/api/transactions", headers=headers,
+            json={"name": "Coffee", "category": "Food", "amount": 3.5}
+        )
+        second = await client.post(
+            "/api/transactions", headers=headers,
+            json={"name": "Tea", "category": "Food", "amount": 2.5}
+        )
+
+        assert first.status_code == 201
+        assert second.status_code == 422
+
+    async def test_key_is_scoped_to_user(
+        self, client: AsyncClient, auth_headers, auth_headers2
+    ):
+        """Одинаковые ключи разных пользователей не конфликтуют"""
+        payload = {"name": "Coffee", "category": "Food", "amount": 3.5}
+
+        first = await client.post(
+            "/api/transactions", headers={**auth_headers, "Idempotency-Key": "shared"}, json=payload
+        )
+        second = await client.post(
+            "/api/transactions", headers={**auth_headers2, "Idempotency-Key": "shared"}, json=payload
+        )
+
+        assert first.status_code == 201
+        assert second.status_code == 201
+        assert second.json()["id"] != first.json()["id"]
+
+    async def test_batch_retry_returns_stored_response(
+        self, client: AsyncClient, auth_headers
+    ):
+        """Повторный пакетный запрос с тем же ключом"""
+        headers = {**auth_headers, "Idempotency-Key": "batch-1"}
+        payload = {"items": [
+            {"name": f"Offline {i}", "category": "Food", "amount": 1 + i} for i in range(3)
+        ]}
+
+        first = await client.post("/api/transactions/batch", headers=headers, json=payload)
+        second = await client.post("/api/transactions/batch", headers=headers, json=payload)
+
+        assert first.status_code == 201
+        assert second.status_code == 201
+        assert second.json() == first.json()
+
+        list_response = await client.get("/api/transactions", headers=auth_headers)
+        assert list_response.json()["total"] == 3
+
+    async def test_batch_invalidates_analytics_after_commit(
+        self, client: AsyncClient, auth_headers, monkeypatch
+    ):
+        """Кэш аналитики сбрасывается только после фиксации пакета с ключом"""
+        from app.routes import transactions as transactions_routes
+        calls = []
+        commit_with_key = transactions_routes.commit_with_key
+        invalidate = transactions_routes.analytics_cache.invalidate
+
+        async def recording_commit(*args, **kwargs):
+            calls.append("commit")
+            return await commit_with_key(*args, **kwargs)
+
+        def recording_invalidate(*scopes):
+            calls.append("invalidate")
+            invalidate(*scopes)
+
+        monkeypatch.setattr(transactions_routes, "commit_with_key", recording_commit)
+        monkeypatch.setattr(transactions_routes.analytics_cache, "invalidate", recording_invalidate)
+
+        headers = {**auth_headers, "Idempotency-Key": "batch-2"}
+        payload = {"items": [{"name": "Offline", "category": "Food", "amount": 1}]}
+        first = await client.post("/api/transactions/batch", headers=headers, json=payload)
+        second = await client.post("/api/transactions/batch", headers=headers, json=payload)
+
+        assert first.status_code == 201
+        assert second.status_code == 201
+        assert calls == ["commit", "invalidate"]
+
+    async def test_delete_expired_keys(self, db_session, test_user):
+        """Удаление устаревших ключей пакетами"""
+        from datetime import datetime, timedelta, timezone
+        from sqlalchemy import select, func
+        from app.idempotency import delete_expired_keys
+        from app.models import IdempotencyKey
+
+        now = datetime.now(timezone.utc)
+        for i in range(5):
+            db_session.add(IdempotencyKey(
+                user_id=test_user.id,
+                key=f"key-{i}",
+                request_hash="0" * 64,
+                status_code=201,
+                response_body={},
+                expires_at=now - timedelta(hours=1) if i < 3 else now + timedelta(hours=1),
+            ))
+        await db_session.commit()
+
+        assert await delete_expired_keys(db_session, batch_size=2) == 2
+        assert await delete_expired_keys(db_session, batch_size=2) == 1
+        assert await delete_expired_keys(db_session, batch_size=2) == 0
+
+        remaining = await db_session.execute(select(func.count(IdempotencyKey.id)))
+        assert remaining.scalar() == 2
+
+
 class TestGetTransaction:
     """Тесты получения транзакции по ID GET /api/transactions/{id}"""
 
@@ -519,6 +1006,279 @@ class TestDeleteTransaction:
         assert response.status_code == 403
 
 
+class TestBulkTransactions:
+    """Тесты массовых операций PATCH/DELETE /api/transactions/bulk"""
+
+    async def test_bulk_update_by_filters(
+        self, client: AsyncClient, auth_headers, test_user, db_session
+    ):
+        """Массовое изменение категории по фильтру"""
+        from app.models import Transaction, TransactionType
+
+        for category in ["Food", "Food", "Transport"]:
+            db_session.add(Transaction(
+                name="Expense",
+                type=TransactionType.expense,
+                category=category,
+                amount=10.00,
+                user_id=test_user.id
+            ))
+        await db_session.commit()
+
+        response = await client.patch(
+            "/api/transactions/bulk?category=Food",
+            headers=auth_headers,
+            json={"category": "Groceries"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["affected"] == 2
+
+        list_response = await client.get(
+            "/api/transactions?category=Groceries",
+            headers=auth_headers
+        )
+        assert list_response.json()["total"] == 2
+
+    async def test_bulk_update_other_user(
+        self, client: AsyncClient, auth_headers2, test_transaction
+    ):
+        """Массовое изменение не затрагивает чужие транзакции"""
+        response = await client.patch(
+            f"/api/transactions/bulk?ids={test_transaction.id}",
+            headers=auth_headers2,
+            json={"name": "Hacked"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["affected"] == 0
+
+    async def test_bulk_update_without_fields(
+        self, client: AsyncClient, auth_headers, test_transaction
+    ):
+        """Массовое изменение без полей для обновления"""
+        response = await client.patch(
+            f"/api/transactions/bulk?ids={test_transaction.id}",
+            headers=auth_headers,
+            json={}
+        )
+
+        assert response.status_code == 400
+
+    async def test_bulk_delete_by_ids(
+        self, client: AsyncClient, auth_headers, test_transaction, test_transaction_with_group
+    ):
+        """Массовое удаление по списку ids вместе со связями с группами"""
+        response = await client.delete(
+            f"/api/transactions/bulk?ids={test_transaction.id}&ids={test_transaction_with_group.id}",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["affected"] == 2
+
+        list_response = await client.get("/api/transactions", headers=auth_headers)
+        assert list_response.json()["total"] == 0
+
+    async def test_bulk_delete_by_group_filter(
+        self, client: AsyncClient, auth_headers, test_transaction, test_transaction_with_group, test_group
+    ):
+        """Массовое удаление транзакций группы"""
+        response = await client.delete(
+            f"/api/transactions/bulk?group_ids={test_group.id}",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["affected"] == 1
+
+        list_response = await client.get("/api/transactions", headers=auth_headers)
+        data = list_response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["id"] == test_transaction.id
+
+    async def test_bulk_delete_without_conditions(
+        self, client: AsyncClient, auth_headers, test_transaction
+    ):
+        """Массовое удаление без фильтров запрещено"""
+        response = await client.delete("/api/transactions/bulk", headers=auth_headers)
+
+        assert response.status_code == 400
+
+    async def test_bulk_delete_unauthorized(self, client: AsyncClient):
+        """Массовое удаление без авторизации"""
+        response = await client.delete("/api/transactions/bulk?ids=1")
+
+        assert response.status_code == 403
+
+
+class TestTransactionChanges:
+    """Тесты синхронизации изменений GET /api/transactions/changes"""
+
+    async def create(self, client: AsyncClient, auth_headers, amount: int, **fields) -> dict:
+        response = await client.post(
+            "/api/transactions",
+            json={"name": "Test", "category": "Food", "amount": amount, **fields},
+            headers=auth_headers
+        )
+        return response.json()
+
+    async def test_full_sync(self, client: AsyncClient, auth_headers):
+        """Токен 0 возвращает все транзакции по возрастанию версии"""
+        first = await self.create(client, auth_headers, 10)
+        second = await self.create(client, auth_headers, 20)
+
+        response = await client.get("/api/transactions/changes", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["id"] for item in data["changes"]] == [first["id"], second["id"]]
+        assert data["deleted"] == []
+        assert data["next_token"].endswith(f"-{second['version']}")
+        assert data["has_more"] is False
+
+    async def test_incremental_sync(self, client: AsyncClient, auth_headers, test_group):
+        """После токена возвращаются только измененные и удаленные транзакции"""
+        kept = await self.create(client, auth_headers, 10)
+        changed = await self.create(client, auth_headers, 20)
+        removed = await self.create(client, auth_headers, 30)
+        token = (await client.get("/api/transactions/changes", headers=auth_headers)).json()["next_token"]
+
+        await client.put(f"/api/transactions/{changed['id']}", json={"amount": 25}, headers=auth_headers)
+        await client.delete(f"/api/transactions/{removed['id']}", headers=auth_headers)
+
+        response = await client.get("/api/transactions/changes", params={"since": token}, headers=auth_headers)
+
+        data = response.json()
+        assert [item["id"] for item in data["changes"]] == [changed["id"]]
+        assert float(data["changes"][0]["amount"]) == 25
+        assert data["changes"][0]["version"] > changed["version"]
+        assert data["deleted"] == [removed["id"]]
+        assert parse_sync_token(data["next_token"]) > parse_sync_token(token)
+        assert kept["id"] not in [item["id"] for item in data["changes"]]
+
+        response = await client.get(
+            "/api/transactions/changes", params={"since": data["next_token"]}, headers=auth_headers
+        )
+        assert response.json()["changes"] == []
+        assert response.json()["deleted"] == []
+
+    async def test_group_change_bumps_version(self, client: AsyncClient, auth_headers, test_group):
+        """Изменение только групп транзакции тоже меняет версию"""
+        created = await self.create(client, auth_headers, 10)
+
+        response = await client.put(
+            f"/api/transactions/{created['id']}", json={"group_ids": [test_group.id]}, headers=auth_headers
+        )
+
+        assert response.json()["version"] > created["version"]
+
+    async def test_bulk_changes(self, client: AsyncClient, auth_headers):
+        """Массовые изменения и удаления попадают в синхронизацию"""
+        first = await self.create(client, auth_headers, 10)
+        second = await self.create(client, auth_headers, 20)
+        token = (await client.get("/api/transactions/changes", headers=auth_headers)).json()["next_token"]
+
+        await client.patch(
+            "/api/transactions/bulk", params={"ids": [first["id"]]}, json={"amount": 15}, headers=auth_headers
+        )
+        await client.delete("/api/transactions/bulk", params={"ids": [second["id"]]}, headers=auth_headers)
+
+        response = await client.get("/api/transactions/changes", params={"since": token}, headers=auth_headers)
+
+        data = response.json()
+        assert [item["id"] for item in data["changes"]] == [first["id"]]
+        assert data["deleted"] == [second["id"]]
+
+    async def test_pagination(self, client: AsyncClient, auth_headers):
+        """Лимит делит изменения на страницы по токену"""
+        created = [await self.create(client, auth_headers, amount) for amount in [10, 20, 30]]
+
+        response = await client.get("/api/transactions/changes", params={"limit": 2}, headers=auth_headers)
+        data = response.json()
+        assert [item["id"] for item in data["changes"]] == [created[0]["id"], created[1]["id"]]
+        assert data["has_more"] is True
+
+        response = await client.get(
+            "/api/transactions/changes", params={"since": data["next_token"], "limit": 2}, headers=auth_headers
+        )
+        data = response.json()
+        assert [item["id"] for item in data["changes"]] == [created[2]["id"]]
+        assert data["has_more"] is False
+
+    async def test_other_user_changes(self, client: AsyncClient, auth_headers, auth_headers2):
+        """Изменения других пользователей не возвращаются"""
+        await self.create(client, auth_headers, 10)
+
+        response = await client.get("/api/transactions/changes", headers=auth_headers2)
+
+        assert response.json()["changes"] == []
+
+    async def test_changes_unauthorized(self, client: AsyncClient):
+        """Изменения без авторизации"""
+        response = await client.get("/api/transactions/changes")
+
+        assert response.status_code == 403
+
+    async def test_invalid_token(self, client: AsyncClient, auth_headers):
+        """Некорректный токен отклоняется"""
+        response = await client.get("/api/transactions/changes", params={"since": "abc"}, headers=auth_headers)
+
+        assert response.status_code == 400
+
+    async def test_in_flight_writer_not_skipped(self, client: AsyncClient, auth_headers, test_user):
+        """Транзакция с меньшей версией, зафиксированная позже, не теряется"""
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        from app.models import Transaction
+        from tests.conftest import TEST_DATABASE_URL
+
+        engine = create_async_engine(TEST_DATABASE_URL)
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as writer:
+                slow = Transaction(name="Slow", category="Slow", amount=5, type="expense", user_id=test_user.id)
+                writer.add(slow)
+                await writer.flush()
+
+                fast = await self.create(client, auth_headers, 10)
+                assert fast["version"] > slow.version
+
+                data = (await client.get("/api/transactions/changes", headers=auth_headers)).json()
+                assert data["changes"] == []
+                token = data["next_token"]
+
+                await writer.commit()
+        finally:
+            await engine.dispose()
+
+        data = (await client.get("/api/transactions/changes", params={"since": token}, headers=auth_headers)).json()
+        assert [item["id"] for item in data["changes"]] == [slow.id, fast["id"]]
+
+    async def test_expired_tombstones_require_resync(self, client: AsyncClient, auth_headers, db_session):
+        """После удаления старых отметок устаревший токен требует полной синхронизации"""
+        from datetime import datetime, timedelta, timezone
+        from sqlalchemy import update
+        from app.models import TransactionTombstone
+        from app.sync import delete_expired_tombstones, TOMBSTONE_RETENTION
+
+        kept = await self.create(client, auth_headers, 10)
+        removed = await self.create(client, auth_headers, 20)
+        token = (await client.get("/api/transactions/changes", headers=auth_headers)).json()["next_token"]
+        await client.delete(f"/api/transactions/{removed['id']}", headers=auth_headers)
+        await db_session.execute(
+            update(TransactionTombstone)
+            .values(deleted_at=datetime.now(timezone.utc) - TOMBSTONE_RETENTION - timedelta(days=1))
+        )
+        await db_session.commit()
+
+        assert await delete_expired_tombstones(db_session) == 1
+
+        response = await client.get("/api/transactions/changes", params={"since": token}, headers=auth_headers)
+        assert response.status_code == 410
+        response = await client.get("/api/transactions/changes", headers=auth_headers)
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()["changes"]] == [kept["id"]]
+
+
 class TestGetGroupTransactions:
     """Тесты получения транзакций группы GET /api/transactions/group/{group_id}"""
 
@@ -580,3 +1340,75 @@ class TestGetGroupTransactions:
         )
 
         assert response.status_code == 403
+
+
+class TestTransactionListEntries:
+    """Тесты проекции списков транзакций transaction_list_entries"""
+
+    async def list_entries(self, db_session) -> list[tuple]:
+        from sqlalchemy import select
+        from app.models import TransactionListEntry
+
+        result = await db_session.execute(
+            select(TransactionListEntry.__table__).order_by("kind", "owner_id", "transaction_id")
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def expected_entries(self, db_session) -> list[tuple]:
+        from sqlalchemy import select
+        from app.models import Transaction, transaction_list_rows
+
+        rows = transaction_list_rows(select(Transaction.id)).subquery()
+        result = await db_session.execute(select(rows).order_by(rows.c.kind, rows.c.owner_id, rows.c.transaction_id))
+        return [tuple(row) for row in result.all()]
+
+    async def test_entries_follow_writes(
+        self, client: AsyncClient, auth_headers, test_user, test_group, db_session
+    ):
+        """Проекция совпадает с транзакциями после создания, изменения и удаления"""
+        created = await client.post(
+            "/api/transactions/batch",
+            json={"items": [
+                {"name": f"Item {index}", "category": "Food", "amount": 10, "group_ids": [test_group.id]}
+                for index in range(3)
+            ]},
+            headers=auth_headers
+        )
+        ids = [item["id"] for item in created.json()]
+        await client.put(f"/api/transactions/{ids[0]}", json={"group_ids": []}, headers=auth_headers)
+        await client.patch(f"/api/transactions/bulk?ids={ids[1]}", json={"category": "Transport"},
+                           headers=auth_headers)
+        await client.delete(f"/api/transactions/{ids[2]}", headers=auth_headers)
+        await client.post(
+            "/api/transactions",
+            json={"name": "Single", "category": "Food", "amount": 5, "group_ids": [test_group.id]},
+            headers=auth_headers
+        )
+
+        assert await self.list_entries(db_session) == await self.expected_entries(db_session)
+
+    async def test_group_rename_and_delete(
+        self, client: AsyncClient, auth_headers, test_group, test_transaction_with_group, db_session
+    ):
+        """Переименование и удаление группы обновляют списки транзакций"""
+        await client.put(f"/api/groups/{test_group.id}", json={"name": "Renamed"}, headers=auth_headers)
+
+        response = await client.get(f"/api/transactions/group/{test_group.id}", headers=auth_headers)
+        assert [group["name"] for group in response.json()["items"][0]["groups"]] == ["Renamed"]
+
+        await client.delete(f"/api/groups/{test_group.id}", headers=auth_headers)
+
+        response = await client.get("/api/transactions", headers=auth_headers)
+        assert response.json()["items"][0]["groups"] == []
+        assert await self.list_entries(db_session) == await self.expected_entries(db_session)
+
+    async def test_bulk_delete_removes_entries(
+        self, client: AsyncClient, auth_headers, test_transaction_with_group, test_group, db_session
+    ):
+        """Массовое удаление убирает транзакции из списков пользователя и группы"""
+        await client.delete(f"/api/transactions/bulk?ids={test_transaction_with_group.id}", headers=auth_headers)
+
+        assert (await client.get("/api/transactions", headers=auth_headers)).json()["total"] == 0
+        response = await client.get(f"/api/transactions/group/{test_group.id}", headers=auth_headers)
+        assert response.json()["total"] == 0
+        assert await self.list_entries(db_session) == []